@@ -0,0 +1,223 @@
+"""
+Response compression with a cache of compressed hot responses.
+
+CompressionMiddleware negotiates brotli (preferred) or gzip from
+Accept-Encoding for responses of at least COMPRESSION_MIN_SIZE bytes.
+Streamed bodies (NDJSON) are compressed chunk by chunk.
+
+Responses that declare the catalog version they were built from
+(X-Catalog-Version) only change with the catalog, so their compressed bytes
+are kept in an in-process LRU keyed by (encoding, body digest) and tagged with
+that version. The same /albums or /map/points body is then compressed once per
+catalog version instead of once per request; entries of older versions are
+dropped as soon as a newer version is seen.
+"""
+import gzip
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSION_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+# Dynamic responses favour speed; the cache makes repeat requests free anyway
+BROTLI_QUALITY = 5
+COMPRESSION_CACHE_MAX_BYTES = 128 * 1024 * 1024
+CATALOG_VERSION_HEADER = "x-catalog-version"
+
+# Already compressed or not worth compressing
+_SKIP_MEDIA_PREFIXES = ("image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    wildcard = accepted.get("*", 0.0)
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CompressionCache:
+    """Byte-bounded LRU of compressed bodies for the current catalog version."""
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.version: Optional[int] = None
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def get_or_compress(self, body: bytes, encoding: str, version: int) -> bytes:
+        if self.version is None or version > self.version:
+            self.clear()
+            self.version = version
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        compressed = compress(body, encoding)
+        # Bodies built from an older version (a request racing a catalog update) are not kept
+        if version == self.version and len(compressed) <= self.max_bytes:
+            self._entries[key] = compressed
+            self.size += len(compressed)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+        return compressed
+
+
+compression_cache = CompressionCache()
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            # wbits 16+: gzip container
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        self._brotli = encoding == "br"
+
+    def chunk(self, data: bytes) -> bytes:
+        # Flush every chunk so NDJSON lines reach the client as they are produced
+        if self._brotli:
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli:
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE, cache: CompressionCache = compression_cache):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, encoding, self.minimum_size, self.cache, scope["method"] == "GET")
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int, cache: CompressionCache, cacheable: bool):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.cache = cache
+        self.cacheable = cacheable
+        self.start: Optional[Message] = None
+        self.stream: Optional[_StreamCompressor] = None
+        self.passthrough = False
+
+    def _skip(self, headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers or "content-range" in headers:
+            return True
+        if self.start["status"] < 200 or self.start["status"] in (204, 304):
+            return True
+        return headers.get("content-type", "").startswith(_SKIP_MEDIA_PREFIXES)
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = self._skip(MutableHeaders(raw=message["headers"]))
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.passthrough:
+            if self.start is not None:
+                await self._send(self.start)
+                self.start = None
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is None and not more_body:
+            await self._send_whole(body)
+            return
+
+        if self.stream is None:
+            self.stream = _StreamCompressor(self.encoding)
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            del headers["content-length"]
+            await self._send(self.start)
+            self.start = None
+
+        data = self.stream.chunk(body) if body else b""
+        if not more_body:
+            data += self.stream.finish()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    async def _send_whole(self, body: bytes):
+        headers = MutableHeaders(raw=self.start["headers"])
+        if len(body) < self.minimum_size:
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        version = headers.get(CATALOG_VERSION_HEADER)
+        if self.cacheable and self.start["status"] == 200 and version and version.isdigit():
+            compressed = self.cache.get_or_compress(body, self.encoding, int(version))
+        else:
+            compressed = compress(body, self.encoding)
+
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        headers.add_vary_header("Accept-Encoding")
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": compressed})
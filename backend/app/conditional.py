@@ -0,0 +1,100 @@
+"""
+Conditional GETs keyed by the catalog version.
+
+Catalog read endpoints only change when the catalog version changes, so the
+version is their validator: ETag W/"catalog-<version>-<format>" and
+Last-Modified from the newest change. The version comes from memory
+(services/catalog_version.py), so a matching If-None-Match / If-Modified-Since is
+answered with 304 before any query runs.
+
+Usage in a route:
+
+    async def route(..., cache: CatalogConditional = Depends(catalog_conditional)):
+        if cache.not_modified:
+            return cache.not_modified_response()
+        ...
+        cache.set_headers(response)
+"""
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+from .services.catalog_version import current_catalog_version
+from .services.columnar import accepts_columnar
+from .services.streaming import accepts_ndjson
+
+# Clients and CDNs may store responses but must revalidate them
+CATALOG_CACHE_CONTROL = "public, no-cache"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, changed_at: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have second precision
+    return changed_at.replace(microsecond=0) <= since
+
+
+class CatalogConditional:
+    def __init__(self, version: int, changed_at: Optional[datetime], variant: str, request: Request):
+        self.version = version
+        self.changed_at = changed_at
+        self.etag = f'W/"catalog-{version}-{variant}"'
+        self.last_modified = format_datetime(changed_at, usegmt=True) if changed_at else None
+
+        if_none_match = request.headers.get("if-none-match")
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_none_match:
+            # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+            self.not_modified = _etag_matches(if_none_match, self.etag)
+        elif if_modified_since and changed_at:
+            self.not_modified = _not_modified_since(if_modified_since, changed_at)
+        else:
+            self.not_modified = False
+
+    def headers(self) -> dict:
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": CATALOG_CACHE_CONTROL,
+            "X-Catalog-Version": str(self.version),
+        }
+        if self.last_modified:
+            headers["Last-Modified"] = self.last_modified
+        return headers
+
+    def set_headers(self, response: Response) -> Response:
+        response.headers.update(self.headers())
+        return response
+
+    def json_response(self, body, headers: Optional[dict] = None) -> Response:
+        """Response for an already encoded JSON body, with the validators set."""
+        return self.set_headers(Response(content=body, media_type="application/json", headers=headers))
+
+    def not_modified_response(self) -> Response:
+        return Response(status_code=304, headers={**self.headers(), "Vary": "Accept"})
+
+
+async def catalog_conditional(request: Request) -> CatalogConditional:
+    """Dependency: validators for the current catalog version and the requested format."""
+    accept = request.headers.get("accept")
+    if accepts_columnar(accept):
+        variant = "columnar"
+    elif accepts_ndjson(accept):
+        variant = "ndjson"
+    else:
+        variant = "json"
+    version, changed_at = await current_catalog_version()
+    return CatalogConditional(version, changed_at, variant, request)
@@ -1,8 +1,16 @@
-﻿from fastapi import FastAPI
+﻿import asyncio
+
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import engine, Base
-from .routers import health, albums, artists, users, research
+from .compression import CompressionMiddleware
+from .database import engine, Base, AsyncSessionLocal
+from .routers import health, albums, artists, users, research, facets, catalog
+from .services import catalog_version
+from .services import facets as facets_service
+from .services import suggest as suggest_service
+from .services import invalidation
+from .services import map_indexes
 
 app = FastAPI(title="Sonic Topography API")
 
@@ -21,14 +29,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli; compressed bodies of catalog-versioned responses are cached
+app.add_middleware(CompressionMiddleware)
+
 @app.on_event("startup")
 async def startup():
     # Simple table creation for MVP
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+    # In-memory cluster/heatmap indexes for zoomed-out map views; reloaded
+    # before a new catalog version is published
+    try:
+        async with AsyncSessionLocal() as db:
+            await map_indexes.load_map_indexes(db)
+    except Exception as e:
+        print(f"Map index load error: {e}")
+
+    # In-memory facet counts; reloaded when the catalog version moves
+    try:
+        async with AsyncSessionLocal() as db:
+            await facets_service.load_facet_index(db)
+    except Exception as e:
+        print(f"Facet index load error: {e}")
+
+    # In-memory prefix index for /search/suggest; patched from the change log
+    try:
+        async with AsyncSessionLocal() as db:
+            await suggest_service.load_suggest_index(db)
+    except Exception as e:
+        print(f"Suggest index load error: {e}")
+
+    # Catalog version in memory for conditional GETs (ETag / Last-Modified)
+    asyncio.create_task(catalog_version.catalog_version_refresh_loop())
+
+    # Precise cache eviction published by import/enrich scripts
+    asyncio.create_task(invalidation.invalidation_listener())
+
 app.include_router(health.router)
 app.include_router(albums.router)
 app.include_router(artists.router)
 app.include_router(users.router)
 app.include_router(research.router)
+app.include_router(facets.router)
+app.include_router(catalog.router)
@@ -15,11 +15,15 @@
     Boolean,
     Enum as SAEnum,
     SmallInteger,
+    DDL,
+    event,
+    Computed,
 )
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from .database import Base
+from .services.normalization import choseong_key, normalize_key
 import uuid
 
 
@@ -64,6 +68,9 @@ class Creator(Base):
     kind = Column(CreatorKind, nullable=False, server_default="person")
     primary_role_tag = Column(String, nullable=True)
     country_code = Column(String, nullable=True)  # ?뙇 ?꾪떚?ㅽ듃 異쒖떊 援?? (ISO 2-letter code)
+    # Matching keys (services/normalization.py), kept in sync by set_name_keys below
+    name_key = Column(String, nullable=True)
+    name_initials = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -71,6 +78,15 @@ class Creator(Base):
     album_credits = relationship("AlbumCredit", back_populates="creator")
     track_credits = relationship("TrackCredit", back_populates="creator")
 
+    __table_args__ = (
+        # Typo-tolerant artist lookup (pg_trgm % and ILIKE)
+        Index("idx_creators_display_name_trgm", "display_name",
+              postgresql_using="gin", postgresql_ops={"display_name": "gin_trgm_ops"}),
+        # Equality and prefix (LIKE 'x%') matching on the normalized keys
+        Index("idx_creators_name_key", "name_key", postgresql_ops={"name_key": "varchar_pattern_ops"}),
+        Index("idx_creators_name_initials", "name_initials", postgresql_ops={"name_initials": "varchar_pattern_ops"}),
+    )
+
 class CreatorSpotifyProfile(Base):
     __tablename__ = "creator_spotify_profile"
 
@@ -88,6 +104,11 @@ class CreatorSpotifyProfile(Base):
 
     creator = relationship("Creator", back_populates="spotify_profile")
 
+ALBUM_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(primary_artist_display, '')), 'B')"
+)
+
 class AlbumGroup(Base):
     __tablename__ = "album_groups"
 
@@ -101,8 +122,19 @@ class AlbumGroup(Base):
     popularity = Column(Float, default=0.0)
     cover_url = Column(String, nullable=True)
     is_anchor = Column(Boolean, nullable=False, server_default="false")
+    # Matching keys (services/normalization.py), kept in sync by set_name_keys below
+    title_key = Column(String, nullable=True)
+    artist_key = Column(String, nullable=True)
+    title_initials = Column(String, nullable=True)
+    artist_initials = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Full-text search document: title (weight A) over artist (weight B).
+    # 'simple' config: titles are multilingual, so no stemming or stop words
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(ALBUM_SEARCH_VECTOR_SQL, persisted=True),
+    ))
 
     releases = relationship("Release", back_populates="album_group")
     album_credits = relationship("AlbumCredit", back_populates="album_group")
@@ -110,6 +142,23 @@ class AlbumGroup(Base):
     album_awards = relationship("AlbumAward", back_populates="album_group")
     map_node = relationship("MapNode", back_populates="album_group", uselist=False)
 
+    __table_args__ = (
+        # Keyset pagination of /albums (created_at desc, album_group_id desc)
+        Index("idx_album_groups_created_at_id", "created_at", "album_group_id"),
+        # Ranked search (repositories/albums.py)
+        Index("idx_album_groups_search_vector", "search_vector", postgresql_using="gin"),
+        # Typo-tolerant search (pg_trgm %>) and case-insensitive discography lookup (ILIKE)
+        Index("idx_album_groups_title_trgm", "title",
+              postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("idx_album_groups_artist_trgm", "primary_artist_display",
+              postgresql_using="gin", postgresql_ops={"primary_artist_display": "gin_trgm_ops"}),
+        # Equality and prefix (LIKE 'x%') matching on the normalized keys
+        Index("idx_album_groups_title_key", "title_key", postgresql_ops={"title_key": "varchar_pattern_ops"}),
+        Index("idx_album_groups_artist_key", "artist_key", postgresql_ops={"artist_key": "varchar_pattern_ops"}),
+        Index("idx_album_groups_title_initials", "title_initials", postgresql_ops={"title_initials": "varchar_pattern_ops"}),
+        Index("idx_album_groups_artist_initials", "artist_initials", postgresql_ops={"artist_initials": "varchar_pattern_ops"}),
+    )
+
 class Label(Base):
     __tablename__ = "labels"
 
@@ -155,6 +204,11 @@ class Track(Base):
     release = relationship("Release", back_populates="tracks")
     track_credits = relationship("TrackCredit", back_populates="track")
 
+    __table_args__ = (
+        # Typo-tolerant track search (pg_trgm %>)
+        Index("idx_tracks_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+    )
+
 class Role(Base):
     __tablename__ = "roles"
 
@@ -287,10 +341,18 @@ class MapNode(Base):
     x = Column(Float, nullable=False)
     y = Column(Float, nullable=False)
     size = Column(Float, nullable=False)
+    min_zoom = Column(SmallInteger, nullable=False, server_default="0")  # LOD: first zoom level showing this node
+    vibe = Column(Float, nullable=True)  # Importer's genre vibe: y before the layout spread (services/layout.py)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     album_group = relationship("AlbumGroup", back_populates="map_node")
 
+    __table_args__ = (
+        # Viewport (bounding-box) queries on /map/points and tile rebuilds
+        Index("idx_map_nodes_xy", "x", "y"),
+        Index("idx_map_nodes_min_zoom", "min_zoom"),
+    )
+
 
 class AlbumDetailsCache(Base):
     __tablename__ = "album_details_cache"
@@ -408,3 +470,126 @@ class UserEvent(Base):
     )
 
 
+
+
+# ========================================
+# Derived Map Data (rebuilt from map_nodes)
+# ========================================
+
+class MapTile(Base):
+    """Precomputed quadtree tile over map_nodes (see services/tiles.py)."""
+    __tablename__ = "map_tiles"
+
+    z = Column(SmallInteger, primary_key=True)
+    x = Column(Integer, primary_key=True)
+    y = Column(Integer, primary_key=True)
+    point_count = Column(Integer, nullable=False, server_default="0")
+    points = Column(JSONB, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class AlbumFacetCube(Base):
+    """Album counts by period x genre x region x country x vibe bucket (see services/facets.py)."""
+    __tablename__ = "album_facet_cube"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    granularity = Column(SmallInteger, nullable=False)  # 1, 5 or 10 years
+    period_start = Column(Integer, nullable=False)
+    primary_genre = Column(String, nullable=False)
+    region = Column(String, nullable=False)
+    country_code = Column(String, nullable=True)
+    vibe_bucket = Column(SmallInteger, nullable=False)  # floor(map_nodes.y * 10)
+    album_count = Column(Integer, nullable=False)
+    year_sum = Column(Float, nullable=False)
+    vibe_sum = Column(Float, nullable=False)
+    popularity_sum = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("idx_album_facet_cube_period", "granularity", "period_start"),
+    )
+
+
+# ========================================
+# Catalog Change Log (delta sync)
+# ========================================
+
+# "refresh" rows (album_group_id "*") only bump the version, for catalog data
+# without a trigger (creators, credits, awards) written by the import scripts
+CatalogChangeType = SAEnum("upsert", "delete", "refresh", name="catalog_change_type")
+
+class CatalogChange(Base):
+    """
+    Append-only log of album changes, written by triggers on album_groups and
+    map_nodes so direct SQL writers (import/dedupe scripts) are captured too.
+    The highest id is the catalog version.
+    """
+    __tablename__ = "catalog_changes"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    album_group_id = Column(String, nullable=False)
+    change_type = Column(CatalogChangeType, nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("idx_catalog_changes_changed_at", "changed_at"),
+    )
+
+CATALOG_CHANGE_TRIGGER_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION log_catalog_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO catalog_changes (album_group_id, change_type) VALUES (OLD.album_group_id, 'delete');
+            RETURN OLD;
+        END IF;
+        INSERT INTO catalog_changes (album_group_id, change_type) VALUES (NEW.album_group_id, 'upsert');
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_album_groups_catalog_change
+    AFTER INSERT OR UPDATE OR DELETE ON album_groups
+    FOR EACH ROW EXECUTE FUNCTION log_catalog_change()
+    """,
+    # min_zoom is derived and not part of the synced payload
+    """
+    CREATE OR REPLACE TRIGGER trg_map_nodes_catalog_change
+    AFTER INSERT OR DELETE OR UPDATE OF x, y, size ON map_nodes
+    FOR EACH ROW EXECUTE FUNCTION log_catalog_change()
+    """,
+]
+
+# ========================================
+# Normalized matching keys
+# ========================================
+
+# (source column, key column, initials column) per table
+NAME_KEY_COLUMNS = {
+    "album_groups": (("title", "title_key", "title_initials"), ("primary_artist_display", "artist_key", "artist_initials")),
+    "creators": (("display_name", "name_key", "name_initials"),),
+}
+
+
+def set_name_keys(target):
+    """Recompute the matching keys of an AlbumGroup or Creator from its names."""
+    for source, key, initials in NAME_KEY_COLUMNS[target.__tablename__]:
+        value = getattr(target, source)
+        setattr(target, key, normalize_key(value) or None)
+        setattr(target, initials, choseong_key(value) or None)
+
+
+# ORM writes keep the keys current; Core writes are caught up by
+# services/search.refresh_name_keys (part of refresh_derived_data)
+for _model in (AlbumGroup, Creator):
+    event.listen(_model, "before_insert", lambda mapper, connection, target: set_name_keys(target))
+    event.listen(_model, "before_update", lambda mapper, connection, target: set_name_keys(target))
+
+# Trigram operator classes of the *_trgm indexes
+event.listen(
+    Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+# Runs after every create_all, once album_groups/map_nodes/catalog_changes all exist
+for _ddl in CATALOG_CHANGE_TRIGGER_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_ddl).execute_if(dialect="postgresql"))
@@ -1,12 +1,52 @@
-from typing import List, Tuple
-from sqlalchemy import select, text
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import cast, false, func, select, text, tuple_
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSQUERY
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import AlbumGroup, MapNode, Release, Track, AlbumCredit, TrackCredit, Creator, Role, CulturalAsset, AssetLink, AlbumLink, AlbumAward, CreatorLink, CreatorRelation, CreatorSpotifyProfile
+from ..services.normalization import is_choseong_query, normalize_key
 
 
-async def get_map_points_grid(db: AsyncSession, year_from: int, year_to: int):
-    stmt = text("""
+# Text search configuration of album_groups.search_vector (see models.py)
+SEARCH_CONFIG = "simple"
+
+
+# Viewport filter: (x_min, x_max, y_min, y_max) in map_nodes coordinates
+BBox = Tuple[float, float, float, float]
+
+
+def _bbox_filter(bbox: Optional[BBox]):
+    if bbox is None:
+        return []
+    x1, x2, y1, y2 = bbox
+    return [MapNode.x >= x1, MapNode.x <= x2, MapNode.y >= y1, MapNode.y <= y2]
+
+
+# Keyset position for /albums: (created_at, album_group_id) of the last row seen
+AlbumKey = Tuple[datetime, str]
+
+
+def _after_filter(after: Optional[AlbumKey]):
+    if after is None:
+        return []
+    return [tuple_(AlbumGroup.created_at, AlbumGroup.album_group_id) < tuple_(*after)]
+
+
+def _lod_filter(lod_level: Optional[int]):
+    if lod_level is None:
+        return []
+    return [MapNode.min_zoom <= lod_level]
+
+
+async def get_map_points_grid(db: AsyncSession, year_from: int, year_to: int, bbox: Optional[BBox] = None):
+    params = {"y1": year_from, "y2": year_to}
+    bbox_sql = ""
+    if bbox is not None:
+        bbox_sql = "AND mn.x BETWEEN :bx1 AND :bx2 AND mn.y BETWEEN :by1 AND :by2"
+        params.update(bx1=bbox[0], bx2=bbox[1], by1=bbox[2], by2=bbox[3])
+    stmt = text(f"""
         SELECT 
             avg(ag.original_year) as x, 
             avg(mn.y) as y, 
@@ -15,50 +55,253 @@ async def get_map_points_grid(db: AsyncSession, year_from: int, year_to: int):
         FROM album_groups ag
         JOIN map_nodes mn ON ag.album_group_id = mn.album_group_id
         WHERE ag.original_year BETWEEN :y1 AND :y2
+        {bbox_sql}
         GROUP BY floor(ag.original_year / 5), floor(mn.y * 10)
     """)
-    result = await db.execute(stmt, {"y1": year_from, "y2": year_to})
+    result = await db.execute(stmt, params)
     return result
 
 
-async def get_album_groups_with_nodes(db: AsyncSession, year_from: int, year_to: int, limit: int):
+async def get_album_groups_with_nodes(
+    db: AsyncSession, year_from: int, year_to: int, limit: int,
+    bbox: Optional[BBox] = None, lod_level: Optional[int] = None
+):
     stmt = (
         select(AlbumGroup, MapNode)
         .join(MapNode, AlbumGroup.album_group_id == MapNode.album_group_id)
-        .where(AlbumGroup.original_year >= year_from, AlbumGroup.original_year <= year_to)
-        .order_by(AlbumGroup.created_at.desc())
+        .where(AlbumGroup.original_year >= year_from, AlbumGroup.original_year <= year_to, *_bbox_filter(bbox))
+        .where(*_lod_filter(lod_level))
+        .order_by(AlbumGroup.popularity.desc().nulls_last(), AlbumGroup.album_group_id)
         .limit(limit)
     )
     result = await db.execute(stmt)
     return result
 
 
-async def get_all_albums(db: AsyncSession, limit: int, offset: int):
-    stmt = (
-        select(AlbumGroup, MapNode)
+# Rows streamed through a server-side cursor are fetched in chunks of this size
+STREAM_YIELD_PER = 1000
+
+
+def _map_point_rows_stmt(
+    year_from: int, year_to: int, limit: int,
+    bbox: Optional[BBox] = None, lod_level: Optional[int] = None
+):
+    return (
+        select(
+            AlbumGroup.album_group_id,
+            AlbumGroup.title,
+            AlbumGroup.original_year,
+            AlbumGroup.country_code,
+            AlbumGroup.popularity,
+            MapNode.x,
+            MapNode.y,
+            MapNode.size,
+        )
+        .join(MapNode, AlbumGroup.album_group_id == MapNode.album_group_id)
+        .where(AlbumGroup.original_year >= year_from, AlbumGroup.original_year <= year_to, *_bbox_filter(bbox))
+        .where(*_lod_filter(lod_level))
+        .order_by(AlbumGroup.popularity.desc().nulls_last(), AlbumGroup.album_group_id)
+        .limit(limit)
+    )
+
+
+async def get_map_point_rows(
+    db: AsyncSession, year_from: int, year_to: int, limit: int,
+    bbox: Optional[BBox] = None, lod_level: Optional[int] = None
+):
+    result = await db.execute(_map_point_rows_stmt(year_from, year_to, limit, bbox, lod_level))
+    return result
+
+
+async def stream_map_point_rows(
+    db: AsyncSession, year_from: int, year_to: int, limit: int,
+    bbox: Optional[BBox] = None, lod_level: Optional[int] = None
+):
+    stmt = _map_point_rows_stmt(year_from, year_to, limit, bbox, lod_level)
+    return await db.stream(stmt.execution_options(yield_per=STREAM_YIELD_PER))
+
+
+def _album_row_columns():
+    return (
+        AlbumGroup.album_group_id,
+        AlbumGroup.title,
+        AlbumGroup.primary_artist_display,
+        AlbumGroup.original_year,
+        AlbumGroup.primary_genre,
+        AlbumGroup.country_code,
+        AlbumGroup.cover_url,
+        AlbumGroup.popularity,
+        AlbumGroup.earliest_release_date,
+        AlbumGroup.created_at,
+    )
+
+
+# Newest first; album_group_id breaks ties so keyset pages are stable
+# (served by idx_album_groups_created_at_id)
+_ALBUM_LIST_ORDER = (AlbumGroup.created_at.desc(), AlbumGroup.album_group_id.desc())
+
+
+# Columns behind each projectable album field (fields= on /albums, /search, /albums/{id})
+ALBUM_FIELD_COLUMNS = {
+    "id": (AlbumGroup.album_group_id,),
+    "title": (AlbumGroup.title,),
+    "artist_name": (AlbumGroup.primary_artist_display,),
+    "year": (AlbumGroup.original_year,),
+    "genre": (AlbumGroup.primary_genre,),
+    "genre_vibe": (AlbumGroup.primary_genre,),
+    "region_bucket": (AlbumGroup.country_code,),
+    "country": (AlbumGroup.country_code,),
+    "cover_url": (AlbumGroup.cover_url,),
+    "popularity": (AlbumGroup.popularity,),
+    "release_date": (AlbumGroup.earliest_release_date,),
+    "created_at": (AlbumGroup.created_at,),
+    "x": (MapNode.x,),
+    "y": (MapNode.y,),
+    "size": (MapNode.size,),
+}
+
+
+def album_field_columns(fields: List[str]):
+    """Deduplicated SELECT list for the given fields; id and created_at (the list sort key) are always included."""
+    columns = {AlbumGroup.album_group_id.key: AlbumGroup.album_group_id, AlbumGroup.created_at.key: AlbumGroup.created_at}
+    for field in fields:
+        for column in ALBUM_FIELD_COLUMNS[field]:
+            columns.setdefault(column.key, column)
+    return tuple(columns.values())
+
+
+def _all_album_rows_stmt(limit: int, offset: int, after: Optional[AlbumKey] = None, columns=None):
+    return (
+        select(*(columns or _album_row_columns()))
         .join(MapNode, AlbumGroup.album_group_id == MapNode.album_group_id)
-        .order_by(AlbumGroup.created_at.desc())
+        .where(*_after_filter(after))
+        .order_by(*_ALBUM_LIST_ORDER)
         .offset(offset)
         .limit(limit)
     )
-    result = await db.execute(stmt)
+
+
+async def get_all_album_rows(
+    db: AsyncSession, limit: int, offset: int, after: Optional[AlbumKey] = None, columns=None
+):
+    result = await db.execute(_all_album_rows_stmt(limit, offset, after, columns))
     return result
 
 
-async def search_albums(db: AsyncSession, q: str, limit: int = 20):
+async def stream_all_album_rows(
+    db: AsyncSession, limit: int, offset: int, after: Optional[AlbumKey] = None, columns=None
+):
+    stmt = _all_album_rows_stmt(limit, offset, after, columns)
+    return await db.stream(stmt.execution_options(yield_per=STREAM_YIELD_PER))
+
+
+def search_tsquery(q: str):
+    """
+    Prefix tsquery expression for as-you-type search ("dark side" ->
+    'dark':* & 'side':*), or None if q has no word characters.
+
+    The lexemes come from to_tsvector with the config of search_vector, so
+    the query is tokenized exactly like the documents ("AC/DC" stays one
+    'ac/dc' lexeme instead of 'ac' & 'dc'). They are quoted and cast to
+    tsquery as is, with no second parse.
+    """
+    if not re.search(r"\w", q):
+        return None
+    lexemes = func.unnest(func.to_tsvector(cast(SEARCH_CONFIG, REGCONFIG), q)).table_valued(
+        "lexeme", "positions", "weights"
+    )
+    # Inside a quoted tsquery lexeme, quotes are doubled and backslashes escaped
+    quoted = func.concat("'", func.replace(func.replace(lexemes.c.lexeme, "\\", "\\\\"), "'", "''"), "':*")
+    query_text = select(func.string_agg(quoted, " & ")).select_from(lexemes).scalar_subquery()
+    return cast(query_text, TSQUERY)
+
+
+async def set_trigram_thresholds(db: AsyncSession, similarity: Optional[float] = None, word_similarity: Optional[float] = None):
+    """
+    Thresholds of the pg_trgm % and %> operators for the current transaction.
+    Only the operators (not similarity() > x) can use the trigram GIN indexes.
+    """
+    settings = []
+    if similarity is not None:
+        settings.append(func.set_config("pg_trgm.similarity_threshold", str(similarity), True))
+    if word_similarity is not None:
+        settings.append(func.set_config("pg_trgm.word_similarity_threshold", str(word_similarity), True))
+    if settings:
+        await db.execute(select(*settings))
+
+
+def album_search_terms(q: str):
+    """
+    (first_tier, fuzzy_match, relevance) expressions of an album search for
+    q, or None if q has no word characters.
+
+    Full-text and normalized-key prefix matches (GIN on search_vector, title
+    weight A over artist B; btree on the *_key columns, so "bjork" finds
+    "Björk" and "ㅂㅌㅅ" finds "방탄소년단") are the first tier, then come
+    typo-tolerant trigram matches (GIN gin_trgm_ops): "title %> q" holds when
+    q is word-similar to part of the title.
+    """
+    tsquery = search_tsquery(q)
+    if tsquery is None:
+        return None
+    first_tier = AlbumGroup.search_vector.op("@@")(tsquery)
+    key = normalize_key(q)
+    if key:
+        # Keys have no LIKE wildcards: _ and % are stripped by normalize_key
+        first_tier = first_tier | AlbumGroup.title_key.like(f"{key}%") | AlbumGroup.artist_key.like(f"{key}%")
+    if is_choseong_query(q):
+        initials = q.replace(" ", "")
+        first_tier = first_tier | AlbumGroup.title_initials.like(f"{initials}%") | AlbumGroup.artist_initials.like(f"{initials}%")
+    # Keys are NULL before refresh_name_keys and for names without word
+    # characters; NULL would sort first under DESC
+    first_tier = func.coalesce(first_tier, false())
+    fuzzy_match = AlbumGroup.title.op("%>")(q) | AlbumGroup.primary_artist_display.op("%>")(q)
+    relevance = func.greatest(
+        func.ts_rank(AlbumGroup.search_vector, tsquery),
+        func.word_similarity(q, AlbumGroup.title),
+        func.word_similarity(q, AlbumGroup.primary_artist_display),
+    )
+    return first_tier, fuzzy_match, relevance
+
+
+def _search_album_rows_stmt(q: str, limit: int, columns=None):
     stmt = (
-        select(AlbumGroup, MapNode)
+        select(*(columns or _album_row_columns()))
         .join(MapNode, AlbumGroup.album_group_id == MapNode.album_group_id)
-        .where(
+        .limit(limit)
+    )
+    terms = album_search_terms(q)
+    if terms is None:
+        # Punctuation-only input: substring match, most popular first
+        return stmt.where(
             (AlbumGroup.title.ilike(f"%{q}%")) |
             (AlbumGroup.primary_artist_display.ilike(f"%{q}%"))
-        )
-        .limit(limit)
+        ).order_by(AlbumGroup.popularity.desc().nulls_last(), AlbumGroup.album_group_id)
+
+    first_tier, fuzzy_match, relevance = terms
+    score = relevance * (1 + func.coalesce(AlbumGroup.popularity, 0))
+    return (
+        stmt.where(first_tier | fuzzy_match)
+        .order_by(first_tier.desc(), score.desc(), AlbumGroup.album_group_id)
     )
-    result = await db.execute(stmt)
+
+
+async def get_search_album_rows(
+    db: AsyncSession, q: str, limit: int = 20, columns=None, fuzzy_threshold: Optional[float] = None
+):
+    await set_trigram_thresholds(db, word_similarity=fuzzy_threshold)
+    result = await db.execute(_search_album_rows_stmt(q, limit, columns))
     return result
 
 
+async def stream_search_album_rows(
+    db: AsyncSession, q: str, limit: int = 20, columns=None, fuzzy_threshold: Optional[float] = None
+):
+    await set_trigram_thresholds(db, word_similarity=fuzzy_threshold)
+    stmt = _search_album_rows_stmt(q, limit, columns)
+    return await db.stream(stmt.execution_options(yield_per=STREAM_YIELD_PER))
+
+
 async def get_album_group(db: AsyncSession, album_id: str):
     stmt = (
         select(AlbumGroup, MapNode)
@@ -69,6 +312,16 @@ async def get_album_group(db: AsyncSession, album_id: str):
     return result.first()
 
 
+async def get_album_row(db: AsyncSession, album_id: str, columns=None):
+    stmt = (
+        select(*(columns or _album_row_columns()))
+        .join(MapNode, AlbumGroup.album_group_id == MapNode.album_group_id)
+        .where(AlbumGroup.album_group_id == album_id)
+    )
+    result = await db.execute(stmt)
+    return result.first()
+
+
 async def get_releases_for_album(db: AsyncSession, album_id: str):
     result = await db.execute(select(Release).where(Release.album_group_id == album_id))
     return result.scalars().all()
@@ -119,22 +372,28 @@ async def get_album_awards(db: AsyncSession, album_id: str):
     return result.scalars().all()
 
 
-async def get_artist_profile_exact(db: AsyncSession, name: str):
+async def get_artist_profile_exact(db: AsyncSession, name_key: str):
+    """Creator whose normalized name equals name_key (the most popular, if several)."""
     stmt = (
         select(Creator, CreatorSpotifyProfile)
         .join(CreatorSpotifyProfile, Creator.creator_id == CreatorSpotifyProfile.creator_id, isouter=True)
-        .where(Creator.display_name.ilike(name))
+        .where(Creator.name_key == name_key)
+        .order_by(CreatorSpotifyProfile.popularity.desc().nulls_last(), Creator.creator_id)
         .limit(1)
     )
     result = await db.execute(stmt)
     return result.first()
 
 
-async def get_artist_profile_fuzzy(db: AsyncSession, name: str):
+async def get_artist_profile_fuzzy(db: AsyncSession, name: str, threshold: Optional[float] = None):
+    """Most similar creator: substring or trigram match (typos), best similarity first."""
+    await set_trigram_thresholds(db, similarity=threshold)
+    similarity = func.similarity(Creator.display_name, name)
     stmt = (
         select(Creator, CreatorSpotifyProfile)
         .join(CreatorSpotifyProfile, Creator.creator_id == CreatorSpotifyProfile.creator_id, isouter=True)
-        .where(Creator.display_name.ilike(f"%{name}%"))
+        .where(Creator.display_name.op("%")(name) | Creator.display_name.ilike(f"%{name}%"))
+        .order_by(similarity.desc(), CreatorSpotifyProfile.popularity.desc().nulls_last(), Creator.creator_id)
         .limit(1)
     )
     result = await db.execute(stmt)
@@ -146,10 +405,10 @@ async def get_creator_links(db: AsyncSession, creator_id: str):
     return result.scalars().all()
 
 
-async def get_discography(db: AsyncSession, display_name: str):
+async def get_discography(db: AsyncSession, artist_key: str):
     result = await db.execute(
         select(AlbumGroup)
-        .where(AlbumGroup.primary_artist_display.ilike(display_name))
+        .where(AlbumGroup.artist_key == artist_key)
         .order_by(AlbumGroup.original_year.desc().nulls_last())
         .limit(200)
     )
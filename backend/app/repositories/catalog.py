@@ -0,0 +1,101 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import select, delete, func, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AlbumGroup, MapNode, CatalogChange
+
+
+async def get_catalog_version(db: AsyncSession, until: Optional[int] = None) -> int:
+    stmt = select(func.coalesce(func.max(CatalogChange.id), 0))
+    if until is not None:
+        stmt = stmt.where(CatalogChange.id <= until)
+    result = await db.execute(stmt)
+    return result.scalar()
+
+
+async def get_latest_change(db: AsyncSession, until: Optional[int] = None):
+    """(id, changed_at) of the newest change up to until, or None when there is none."""
+    stmt = select(CatalogChange.id, CatalogChange.changed_at).order_by(CatalogChange.id.desc()).limit(1)
+    if until is not None:
+        stmt = stmt.where(CatalogChange.id <= until)
+    result = await db.execute(stmt)
+    return result.first()
+
+
+async def get_change_sequence_state(db: AsyncSession) -> Tuple[int, List[int]]:
+    """
+    (last id handed out for catalog_changes, xids of the other transactions
+    in progress just after). The two are read in separate statements, in this
+    order, so every transaction holding an id up to the bound has either
+    finished or is listed: one that starts writing later gets a higher id.
+    """
+    bound = await db.execute(text(
+        "SELECT coalesce(pg_sequence_last_value(pg_get_serial_sequence('catalog_changes', 'id')::regclass), 0)"
+    ))
+    xids = await db.execute(text(
+        "SELECT x::text FROM pg_snapshot_xip(pg_current_snapshot()) AS x "
+        "WHERE x IS DISTINCT FROM pg_current_xact_id_if_assigned()"
+    ))
+    return bound.scalar(), [int(x) for x in xids.scalars()]
+
+
+async def get_in_progress_xids(db: AsyncSession, xids: List[int]) -> List[int]:
+    if not xids:
+        return []
+    result = await db.execute(
+        text("SELECT x FROM unnest(CAST(:xids AS text[])) AS x WHERE pg_xact_status(x::xid8) = 'in progress'"),
+        {"xids": [str(x) for x in xids]},
+    )
+    return [int(x) for x in result.scalars()]
+
+
+async def insert_catalog_change(db: AsyncSession, album_group_id: str, change_type: str) -> int:
+    result = await db.execute(
+        insert(CatalogChange).values(album_group_id=album_group_id, change_type=change_type).returning(CatalogChange.id)
+    )
+    return result.scalar()
+
+
+async def get_change_bounds(db: AsyncSession):
+    """(oldest retained change id, latest change id); both None when the log is empty."""
+    result = await db.execute(select(func.min(CatalogChange.id), func.max(CatalogChange.id)))
+    return result.one()
+
+
+async def count_changed_albums(db: AsyncSession, since: int) -> int:
+    result = await db.execute(
+        select(func.count(func.distinct(CatalogChange.album_group_id))).where(CatalogChange.id > since)
+    )
+    return result.scalar()
+
+
+async def get_latest_changes(db: AsyncSession, since: int, until: int):
+    """Latest change per album in (since, until]."""
+    stmt = (
+        select(CatalogChange.album_group_id, CatalogChange.change_type)
+        .distinct(CatalogChange.album_group_id)
+        .where(CatalogChange.id > since, CatalogChange.id <= until)
+        .order_by(CatalogChange.album_group_id, CatalogChange.id.desc())
+    )
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def get_albums_with_nodes_by_ids(db: AsyncSession, album_ids: List[str]):
+    stmt = (
+        select(AlbumGroup, MapNode)
+        .join(MapNode, AlbumGroup.album_group_id == MapNode.album_group_id)
+        .where(AlbumGroup.album_group_id.in_(album_ids))
+    )
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def prune_changes(db: AsyncSession, before: datetime) -> int:
+    # Always keep the latest row so the catalog version survives pruning
+    latest = select(func.max(CatalogChange.id)).scalar_subquery()
+    result = await db.execute(
+        delete(CatalogChange).where(CatalogChange.changed_at < before, CatalogChange.id < latest)
+    )
+    return result.rowcount
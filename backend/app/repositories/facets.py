@@ -0,0 +1,70 @@
+from typing import List
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AlbumFacetCube
+
+
+async def get_cube_source_rows(db: AsyncSession):
+    stmt = text("""
+        SELECT
+            ag.original_year AS year,
+            coalesce(ag.primary_genre, 'Unknown') AS genre,
+            ag.country_code AS country_code,
+            floor(mn.y * 10)::int AS vibe_bucket,
+            count(*) AS album_count,
+            sum(ag.original_year) AS year_sum,
+            sum(mn.y) AS vibe_sum,
+            sum(coalesce(ag.popularity, 0)) AS popularity_sum
+        FROM album_groups ag
+        JOIN map_nodes mn ON ag.album_group_id = mn.album_group_id
+        WHERE ag.original_year IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    """)
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def replace_cube(db: AsyncSession, rows: List[dict], batch_size: int = 2000):
+    await db.execute(delete(AlbumFacetCube))
+    for i in range(0, len(rows), batch_size):
+        await db.execute(AlbumFacetCube.__table__.insert(), rows[i:i + batch_size])
+
+
+async def get_cube_grid_rows(db: AsyncSession, year_from: int, year_to: int):
+    bucket = AlbumFacetCube.period_start // 5
+    stmt = (
+        select(
+            bucket.label("bucket"),
+            AlbumFacetCube.vibe_bucket,
+            AlbumFacetCube.country_code,
+            func.sum(AlbumFacetCube.album_count).label("count"),
+            func.sum(AlbumFacetCube.year_sum).label("year_sum"),
+            func.sum(AlbumFacetCube.vibe_sum).label("vibe_sum"),
+        )
+        .where(
+            AlbumFacetCube.granularity == 1,
+            AlbumFacetCube.period_start >= year_from,
+            AlbumFacetCube.period_start <= year_to,
+        )
+        .group_by(bucket, AlbumFacetCube.vibe_bucket, AlbumFacetCube.country_code)
+    )
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def get_facet_source_rows(db: AsyncSession):
+    """Album counts by (year, genre, country) for the in-memory facet index."""
+    stmt = text("""
+        SELECT
+            ag.original_year AS year,
+            coalesce(ag.primary_genre, 'Unknown') AS genre,
+            ag.country_code AS country_code,
+            count(*) AS album_count
+        FROM album_groups ag
+        JOIN map_nodes mn ON ag.album_group_id = mn.album_group_id
+        WHERE ag.original_year IS NOT NULL
+        GROUP BY 1, 2, 3
+    """)
+    result = await db.execute(stmt)
+    return result.all()
@@ -0,0 +1,163 @@
+from typing import Iterable, List, Tuple
+from sqlalchemy import select, delete, tuple_, func, bindparam
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AlbumGroup, MapNode, MapTile
+
+
+def _map_node_columns():
+    return (
+        MapNode.album_group_id,
+        MapNode.x,
+        MapNode.y,
+        MapNode.size,
+        AlbumGroup.title,
+        AlbumGroup.country_code,
+        AlbumGroup.primary_genre,
+        AlbumGroup.popularity,
+        AlbumGroup.is_anchor,
+    )
+
+
+async def get_all_map_nodes(db: AsyncSession):
+    stmt = (
+        select(*_map_node_columns())
+        .join(AlbumGroup, AlbumGroup.album_group_id == MapNode.album_group_id)
+    )
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def get_map_nodes_signature(db: AsyncSession):
+    """Cheap change detector for in-memory indexes built from map_nodes."""
+    stmt = (
+        select(func.count(), func.max(MapNode.updated_at), func.max(AlbumGroup.updated_at))
+        .select_from(MapNode)
+        .join(AlbumGroup, AlbumGroup.album_group_id == MapNode.album_group_id)
+    )
+    result = await db.execute(stmt)
+    return tuple(result.one())
+
+
+async def get_map_nodes_by_ids(db: AsyncSession, album_ids: List[str]):
+    stmt = (
+        select(*_map_node_columns())
+        .join(AlbumGroup, AlbumGroup.album_group_id == MapNode.album_group_id)
+        .where(MapNode.album_group_id.in_(album_ids))
+    )
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def get_map_nodes_in_box(db: AsyncSession, x1: float, x2: float, y1: float, y2: float):
+    stmt = (
+        select(*_map_node_columns())
+        .join(AlbumGroup, AlbumGroup.album_group_id == MapNode.album_group_id)
+        .where(MapNode.x >= x1, MapNode.x < x2, MapNode.y >= y1, MapNode.y < y2)
+    )
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def get_map_tile(db: AsyncSession, z: int, x: int, y: int):
+    result = await db.execute(
+        select(MapTile).where(MapTile.z == z, MapTile.x == x, MapTile.y == y)
+    )
+    return result.scalars().first()
+
+
+async def upsert_map_tiles(db: AsyncSession, tiles: List[dict]):
+    if not tiles:
+        return
+    stmt = insert(MapTile).values(tiles)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MapTile.z, MapTile.x, MapTile.y],
+        set_={
+            "point_count": stmt.excluded.point_count,
+            "points": stmt.excluded.points,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+async def delete_map_tiles(db: AsyncSession, keys: Iterable[Tuple[int, int, int]]):
+    keys = list(keys)
+    if not keys:
+        return
+    await db.execute(
+        delete(MapTile).where(tuple_(MapTile.z, MapTile.x, MapTile.y).in_(keys))
+    )
+
+
+async def delete_all_map_tiles(db: AsyncSession):
+    await db.execute(delete(MapTile))
+
+
+async def get_layout_source_rows(db: AsyncSession):
+    """Albums that have a map node; the importers decide which albums are on the map."""
+    stmt = (
+        select(
+            AlbumGroup.album_group_id,
+            AlbumGroup.original_year,
+            AlbumGroup.primary_genre,
+            AlbumGroup.popularity,
+            AlbumGroup.updated_at,
+            MapNode.x,
+            MapNode.y,
+            MapNode.vibe,
+            MapNode.updated_at.label("node_updated_at"),
+        )
+        .join(MapNode, AlbumGroup.album_group_id == MapNode.album_group_id)
+    )
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def update_map_node_layout(db: AsyncSession, nodes: List[dict]):
+    """nodes: [{"b_id": album_group_id, "b_x", "b_y", "b_size", "b_vibe"}, ...]; existing nodes only."""
+    if not nodes:
+        return
+    table = MapNode.__table__
+    stmt = (
+        table.update()
+        .where(table.c.album_group_id == bindparam("b_id"))
+        .values(
+            x=bindparam("b_x"),
+            y=bindparam("b_y"),
+            size=bindparam("b_size"),
+            vibe=bindparam("b_vibe"),
+            updated_at=func.now(),
+        )
+    )
+    await db.execute(stmt, nodes)
+
+
+async def get_lod_source_rows(db: AsyncSession):
+    stmt = (
+        select(
+            MapNode.album_group_id,
+            MapNode.x,
+            MapNode.y,
+            MapNode.min_zoom,
+            AlbumGroup.popularity,
+            AlbumGroup.is_anchor,
+        )
+        .join(AlbumGroup, AlbumGroup.album_group_id == MapNode.album_group_id)
+    )
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def update_min_zoom(db: AsyncSession, updates: List[dict]):
+    """updates: [{"b_id": album_group_id, "b_min_zoom": level}, ...]"""
+    if not updates:
+        return
+    table = MapNode.__table__
+    stmt = (
+        table.update()
+        .where(table.c.album_group_id == bindparam("b_id"))
+        .values(min_zoom=bindparam("b_min_zoom"))
+    )
+    await db.execute(stmt, updates)
@@ -0,0 +1,170 @@
+from typing import Dict, List, Optional
+from sqlalchemy import Integer, String, bindparam, cast, false, func, literal, literal_column, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AlbumGroup, MapNode, Creator, CreatorSpotifyProfile, Release, Track
+from ..services.normalization import is_choseong_query, normalize_key
+from .albums import album_search_terms, set_trigram_thresholds
+
+
+async def get_suggest_album_rows(db: AsyncSession, album_ids: Optional[List[str]] = None):
+    """Albums shown on the map (those with a node), optionally limited to album_ids."""
+    stmt = (
+        select(
+            AlbumGroup.album_group_id,
+            AlbumGroup.title,
+            AlbumGroup.primary_artist_display,
+            AlbumGroup.popularity,
+        )
+        .join(MapNode, AlbumGroup.album_group_id == MapNode.album_group_id)
+    )
+    if album_ids is not None:
+        stmt = stmt.where(AlbumGroup.album_group_id.in_(album_ids))
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def get_suggest_creator_rows(db: AsyncSession):
+    # Spotify popularity is 0-100; album popularity is 0-1
+    stmt = (
+        select(
+            Creator.creator_id,
+            Creator.display_name,
+            (func.coalesce(CreatorSpotifyProfile.popularity, 0) / 100.0).label("popularity"),
+        )
+        .join(CreatorSpotifyProfile, Creator.creator_id == CreatorSpotifyProfile.creator_id, isouter=True)
+    )
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def get_name_key_rows(db: AsyncSession, model, id_column: str, columns: List[str]):
+    """id plus the given name/key columns of every row of model (AlbumGroup or Creator)."""
+    table = model.__table__
+    result = await db.execute(select(table.c[id_column], *(table.c[c] for c in columns)))
+    return result.all()
+
+
+async def update_name_keys(db: AsyncSession, model, id_column: str, updates: List[dict]):
+    """updates: [{"b_id": id, "<key column>": value, ...}, ...]"""
+    if not updates:
+        return
+    table = model.__table__
+    key_columns = [c for c in updates[0] if c != "b_id"]
+    stmt = (
+        table.update()
+        .where(table.c[id_column] == bindparam("b_id"))
+        # Derived columns: keep updated_at so changed_only layouts ignore these writes
+        .values(updated_at=table.c.updated_at, **{c: bindparam(c) for c in key_columns})
+    )
+    await db.execute(stmt, updates)
+
+
+def _ranked(first_tier, relevance, popularity, weight: float):
+    """Score shared by all result types: (prefix match + relevance) x popularity boost x type weight."""
+    # A NULL key (not refreshed yet, or a name without word characters) is no match
+    return (cast(func.coalesce(first_tier, false()), Integer) + relevance) * (1 + popularity) * weight
+
+
+def _album_results(q: str, limit: int, weight: float):
+    terms = album_search_terms(q)
+    if terms is None:
+        return None
+    first_tier, fuzzy_match, relevance = terms
+    return (
+        select(
+            literal("album", String).label("type"),
+            AlbumGroup.album_group_id.label("id"),
+            AlbumGroup.title.label("label"),
+            AlbumGroup.primary_artist_display.label("sublabel"),
+            AlbumGroup.album_group_id.label("album_id"),
+            _ranked(first_tier, relevance, func.coalesce(AlbumGroup.popularity, 0), weight).label("score"),
+        )
+        .join(MapNode, AlbumGroup.album_group_id == MapNode.album_group_id)
+        .where(first_tier | fuzzy_match)
+        .order_by(literal_column("score").desc().nulls_last())
+        .limit(limit)
+    )
+
+
+def _artist_results(q: str, limit: int, weight: float):
+    key = normalize_key(q)
+    if not key:
+        return None
+    # Keys have no LIKE wildcards: _ and % are stripped by normalize_key
+    first_tier = Creator.name_key.like(f"{key}%")
+    if is_choseong_query(q):
+        first_tier = first_tier | Creator.name_initials.like(f"{q.replace(' ', '')}%")
+    # Spotify popularity is 0-100; album popularity is 0-1
+    popularity = func.coalesce(CreatorSpotifyProfile.popularity, 0) / 100.0
+    return (
+        select(
+            literal("artist", String).label("type"),
+            Creator.creator_id.label("id"),
+            Creator.display_name.label("label"),
+            literal(None, String).label("sublabel"),
+            literal(None, String).label("album_id"),
+            _ranked(first_tier, func.similarity(Creator.display_name, q), popularity, weight).label("score"),
+        )
+        .join(CreatorSpotifyProfile, Creator.creator_id == CreatorSpotifyProfile.creator_id, isouter=True)
+        .where(first_tier | Creator.display_name.op("%")(q))
+        .order_by(literal_column("score").desc().nulls_last())
+        .limit(limit)
+    )
+
+
+def _track_results(q: str, limit: int, weight: float):
+    if not normalize_key(q):
+        return None
+    first_tier = Track.title.istartswith(q, autoescape=True)
+    score = _ranked(
+        first_tier, func.word_similarity(q, Track.title), func.coalesce(AlbumGroup.popularity, 0), weight
+    )
+    # A track is listed once per album, not once per release (deluxe editions, reissues)
+    per_album = (
+        select(
+            literal("track", String).label("type"),
+            Track.track_id.label("id"),
+            Track.title.label("label"),
+            AlbumGroup.primary_artist_display.label("sublabel"),
+            AlbumGroup.album_group_id.label("album_id"),
+            score.label("score"),
+        )
+        .join(Release, Track.release_id == Release.release_id)
+        .join(AlbumGroup, Release.album_group_id == AlbumGroup.album_group_id)
+        .join(MapNode, AlbumGroup.album_group_id == MapNode.album_group_id)
+        .where(Track.title.op("%>")(q))
+        .distinct(AlbumGroup.album_group_id, func.lower(Track.title))
+        .order_by(AlbumGroup.album_group_id, func.lower(Track.title), score.desc().nulls_last())
+        .subquery()
+    )
+    return select(per_album).order_by(per_album.c.score.desc().nulls_last()).limit(limit)
+
+
+SEARCH_RESULT_BUILDERS = {"album": _album_results, "artist": _artist_results, "track": _track_results}
+
+
+async def get_search_result_rows(
+    db: AsyncSession,
+    q: str,
+    limit: int,
+    weights: Dict[str, float],
+    name_threshold: Optional[float] = None,
+    title_threshold: Optional[float] = None,
+):
+    """
+    Albums, artists and tracks matching q in one query, best score first.
+    weights maps each requested type to its score weight. Every branch uses
+    its own indexes (search_vector, *_key, gin_trgm_ops) and is limited
+    before the merge, so one type can fill at most limit rows.
+    """
+    branches = [
+        stmt for stmt in (SEARCH_RESULT_BUILDERS[t](q, limit, w) for t, w in weights.items()) if stmt is not None
+    ]
+    if not branches:
+        return []
+    await set_trigram_thresholds(db, similarity=name_threshold, word_similarity=title_threshold)
+    merged = union_all(*(stmt.subquery().select() for stmt in branches)).subquery()
+    stmt = select(merged).order_by(merged.c.score.desc().nulls_last(), merged.c.type, merged.c.id).limit(limit)
+    result = await db.execute(stmt)
+    return result.all()
@@ -1,51 +1,233 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..conditional import CatalogConditional, catalog_conditional
 from ..database import get_db
 from ..schemas import APIResponse
 from ..services import albums as album_service
+from ..services import tiles as tile_service
+from ..services import heatmap as heatmap_service
+from ..services import map_indexes
+from ..services import suggest as suggest_service
+from ..services import search as search_service
+from ..services.columnar import COLUMNAR_MEDIA_TYPE, accepts_columnar
+from ..services.streaming import NDJSON_MEDIA_TYPE, accepts_ndjson
+from ..services.pagination import ALBUMS_PAGE_MAX, ALBUMS_PAGE_SIZE, decode_album_cursor
+from ..services import json_encoding
+from ..services import response_cache
+from ..services.cache import album_tag
 
 router = APIRouter()
 
 
+def _json_response(payload: dict, headers: dict | None = None) -> Response:
+    return Response(content=json_encoding.dumps(payload), media_type=json_encoding.JSON_MEDIA_TYPE, headers=headers)
+
+
+def _parse_fields(fields: str | None):
+    try:
+        return album_service.parse_album_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/map/points", response_model=APIResponse)
 async def get_map_points(
+    response: Response,
     yearFrom: int = 1960,
     yearTo: int = 2024,
     zoom: float = 1.0,
+    xMin: float | None = None,
+    xMax: float | None = None,
+    yMin: float | None = None,
+    yMax: float | None = None,
+    accept: str | None = Header(None),
+    cache: CatalogConditional = Depends(catalog_conditional),
     db: AsyncSession = Depends(get_db)
 ):
-    points = await album_service.get_map_points(db, yearFrom, yearTo, zoom)
+    bbox = None
+    viewport = (xMin, xMax, yMin, yMax)
+    if any(v is not None for v in viewport):
+        if any(v is None for v in viewport):
+            raise HTTPException(status_code=400, detail="xMin, xMax, yMin and yMax must be given together")
+        if xMin > xMax or yMin > yMax:
+            raise HTTPException(status_code=400, detail="Invalid bounding box")
+        bbox = viewport
+    if cache.not_modified:
+        return cache.not_modified_response()
+
+    if accepts_columnar(accept):
+        body = await album_service.get_map_points_columnar(db, yearFrom, yearTo, zoom, bbox)
+        return cache.set_headers(Response(content=body, media_type=COLUMNAR_MEDIA_TYPE, headers={"Vary": "Accept"}))
+    if accepts_ndjson(accept):
+        body = await album_service.stream_map_points(db, yearFrom, yearTo, zoom, bbox)
+        return cache.set_headers(StreamingResponse(body, media_type=NDJSON_MEDIA_TYPE, headers={"Vary": "Accept"}))
+    if zoom < 2.0:
+        # Zoomed-out grid: few distinct keys, shared across workers. Keyed on
+        # the version the cluster index reflects, which the body comes from
+        key = f"map_points:{yearFrom}:{yearTo}:{int(zoom)}:{bbox}"
+        body = await response_cache.get_or_compute(
+            key,
+            map_indexes.map_index_state.version or cache.version,
+            lambda: album_service.get_map_points(db, yearFrom, yearTo, zoom, bbox),
+        )
+        return cache.json_response(body, headers={"Vary": "Accept"})
+    points = await album_service.get_map_points(db, yearFrom, yearTo, zoom, bbox)
+    cache.set_headers(response)
+    response.headers["Vary"] = "Accept"
     return APIResponse(data=points)
 
 
+@router.get("/map/tiles/{z}/{x}/{y}", response_model=APIResponse)
+async def get_map_tile(
+    z: int,
+    x: int,
+    y: int,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
+    if not tile_service.is_valid_tile(z, x, y):
+        raise HTTPException(status_code=404, detail="Tile not found")
+    points, count = await tile_service.get_tile(db, z, x, y)
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return APIResponse(data=points, meta={"z": z, "x": x, "y": y, "count": count})
+
+
+@router.get("/map/heatmap", response_model=APIResponse)
+async def get_map_heatmap(genre: str | None = None, region: str | None = None):
+    heatmap = heatmap_service.get_heatmap(genre, region)
+    if heatmap is None:
+        raise HTTPException(status_code=404, detail="Heatmap not found")
+    return APIResponse(data=heatmap)
+
+
 @router.get("/albums", response_model=APIResponse)
 async def get_all_albums(
-    limit: int = 50000,
-    offset: int = 0,
+    limit: int = Query(ALBUMS_PAGE_SIZE, ge=1, le=ALBUMS_PAGE_MAX),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = None,
+    fields: str | None = None,
+    accept: str | None = Header(None),
+    cache: CatalogConditional = Depends(catalog_conditional),
     db: AsyncSession = Depends(get_db)
 ):
-    albums = await album_service.list_albums(db, limit, offset)
-    return APIResponse(data=albums)
+    projection = _parse_fields(fields)
+    # cursor is the opaque next_cursor of the previous page; offset is kept for old clients
+    after = None
+    if cursor:
+        if offset:
+            raise HTTPException(status_code=400, detail="cursor and offset cannot be combined")
+        try:
+            after = decode_album_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cache.not_modified:
+        return cache.not_modified_response()
+
+    if accepts_columnar(accept):
+        body, next_cursor = await album_service.list_albums_columnar(db, limit, offset, after, projection)
+        headers = {"Vary": "Accept"}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return cache.set_headers(Response(content=body, media_type=COLUMNAR_MEDIA_TYPE, headers=headers))
+    # Stable version, read before the rows: every change up to it is committed,
+    # so a client syncing from it may see a change twice, never miss one
+    version = cache.version
+    if accepts_ndjson(accept):
+        return cache.set_headers(StreamingResponse(
+            album_service.stream_albums(limit, offset, after, projection, version),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers={"Vary": "Accept"},
+        ))
+    albums, next_cursor = await album_service.list_albums(db, limit, offset, after, projection)
+    # Same shape as APIResponse, encoded directly instead of through pydantic
+    return cache.set_headers(_json_response(
+        {"data": albums, "meta": {"catalog_version": version, "next_cursor": next_cursor}},
+        headers={"Vary": "Accept"},
+    ))
 
 
 @router.get("/search", response_model=APIResponse)
-async def search_albums(q: str, db: AsyncSession = Depends(get_db)):
-    albums = await album_service.search_albums(db, q)
-    return APIResponse(data=albums)
+async def search_albums(
+    q: str,
+    fields: str | None = None,
+    accept: str | None = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    projection = _parse_fields(fields)
+    if accepts_ndjson(accept):
+        return StreamingResponse(
+            album_service.stream_search_albums(q, projection), media_type=NDJSON_MEDIA_TYPE, headers={"Vary": "Accept"}
+        )
+    albums = await album_service.search_albums(db, q, projection)
+    return _json_response({"data": albums, "meta": None})
+
+
+@router.get("/search/all", response_model=APIResponse)
+async def search_all(
+    q: str,
+    types: str | None = None,
+    limit: int = Query(search_service.SEARCH_LIMIT, ge=1, le=search_service.SEARCH_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db)
+):
+    """Albums, artists and tracks in one ranked list; types=album,artist,track narrows it."""
+    try:
+        type_names = search_service.parse_search_types(types)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    results = await search_service.search_all(db, q, limit, type_names)
+    return APIResponse(data=results)
+
+
+@router.get("/search/suggest", response_model=APIResponse)
+async def suggest(
+    q: str,
+    limit: int = Query(suggest_service.SUGGEST_LIMIT, ge=1, le=suggest_service.SUGGEST_MAX_LIMIT),
+):
+    """As-you-type suggestions (albums and artists) from the in-memory prefix index."""
+    suggestions = await suggest_service.suggest(q, limit)
+    return APIResponse(data=suggestions)
 
 
 @router.get("/albums/{album_id}", response_model=APIResponse)
-async def get_album_detail(album_id: str, db: AsyncSession = Depends(get_db)):
-    album = await album_service.get_album_summary(db, album_id)
-    if not album:
+async def get_album_detail(
+    album_id: str,
+    fields: str | None = None,
+    cache: CatalogConditional = Depends(catalog_conditional),
+    db: AsyncSession = Depends(get_db)
+):
+    projection = _parse_fields(fields)
+    if cache.not_modified:
+        return cache.not_modified_response()
+    key = f"album:{album_id}:{','.join(projection) if projection else ''}"
+    body = await response_cache.get_or_compute(
+        key,
+        cache.version,
+        lambda: album_service.get_album_summary(db, album_id, projection),
+        tags=[album_tag(album_id)],
+        local=album_service.album_summary_cache,
+    )
+    if body is None:
         raise HTTPException(status_code=404, detail="Album not found")
-    return APIResponse(data=album)
+    return cache.json_response(body)
 
 
 @router.get("/album-groups/{album_id}/detail", response_model=APIResponse)
-async def get_album_group_detail(album_id: str, db: AsyncSession = Depends(get_db)):
-    detail = await album_service.get_album_group_detail(db, album_id)
-    if not detail:
+async def get_album_group_detail(
+    album_id: str,
+    cache: CatalogConditional = Depends(catalog_conditional),
+    db: AsyncSession = Depends(get_db)
+):
+    if cache.not_modified:
+        return cache.not_modified_response()
+    body = await response_cache.get_or_compute(
+        f"album_detail:{album_id}",
+        cache.version,
+        lambda: album_service.get_album_group_detail(db, album_id),
+        tags=album_service.album_detail_tags,
+        local=album_service.album_detail_cache,
+    )
+    if body is None:
         raise HTTPException(status_code=404, detail="Album not found")
-    return APIResponse(data=detail)
+    return cache.json_response(body)
@@ -1,16 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..conditional import CatalogConditional, catalog_conditional
 from ..database import get_db
 from ..schemas import APIResponse
 from ..services import artists as artist_service
+from ..services import response_cache
 
 router = APIRouter()
 
 
 @router.get("/artists/lookup", response_model=APIResponse)
-async def get_artist_profile(name: str, db: AsyncSession = Depends(get_db)):
-    profile = await artist_service.get_artist_profile(db, name)
-    if not profile:
+async def get_artist_profile(
+    name: str,
+    cache: CatalogConditional = Depends(catalog_conditional),
+    db: AsyncSession = Depends(get_db)
+):
+    if cache.not_modified:
+        return cache.not_modified_response()
+    body = await response_cache.get_or_compute(
+        f"artist:{name.strip()}",
+        cache.version,
+        lambda: artist_service.get_artist_profile(db, name),
+        tags=artist_service.artist_profile_tags,
+    )
+    if body is None:
         raise HTTPException(status_code=400, detail="name is required")
-    return APIResponse(data=profile)
+    return cache.json_response(body)
@@ -0,0 +1,67 @@
+import gzip
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..schemas import APIResponse
+from ..services import catalog as catalog_service
+from ..services import snapshot as snapshot_service
+from ..services.catalog_version import current_catalog_version
+
+router = APIRouter()
+
+
+@router.get("/catalog/version", response_model=APIResponse)
+async def get_catalog_version():
+    version, _ = await current_catalog_version()
+    return APIResponse(data={"version": version})
+
+
+@router.get("/catalog/changes", response_model=APIResponse)
+async def get_catalog_changes(since: int = 0, db: AsyncSession = Depends(get_db)):
+    version, _ = await current_catalog_version()
+    changes = await catalog_service.get_changes(db, since, version)
+    return APIResponse(data=changes)
+
+
+@router.get("/catalog/snapshot")
+async def get_catalog_snapshot(
+    if_none_match: str | None = Header(None),
+    accept_encoding: str | None = Header(None),
+):
+    """Full /albums payload from the prebuilt snapshot; revalidate with If-None-Match."""
+    manifest = snapshot_service.read_manifest()
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Catalog snapshot not built")
+
+    encoding = next(
+        (
+            e for e in ("br", "gzip")
+            if e in manifest["files"] and snapshot_service.accepts_encoding(accept_encoding, e)
+        ),
+        None,
+    )
+    etag = snapshot_service.snapshot_etag(manifest, encoding)
+    headers = {
+        "ETag": etag,
+        # Always revalidate; unchanged snapshots cost a 304
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+        "X-Catalog-Version": str(manifest["version"]),
+    }
+    if snapshot_service.etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is not None:
+        return FileResponse(
+            snapshot_service.snapshot_path(manifest, encoding),
+            media_type="application/json",
+            headers={**headers, "Content-Encoding": encoding},
+        )
+
+    # Clients without gzip support are rare; decompress on the fly
+    with open(snapshot_service.snapshot_path(manifest, "gzip"), "rb") as f:
+        body = gzip.decompress(f.read())
+    return Response(content=body, media_type="application/json", headers=headers)
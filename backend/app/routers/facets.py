@@ -0,0 +1,25 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..schemas import APIResponse
+from ..services import facets as facet_service
+
+router = APIRouter()
+
+
+@router.get("/facets", response_model=APIResponse)
+async def get_facets(
+    granularity: int = 10,
+    yearFrom: int = 1950,
+    yearTo: int = 2026,
+    genre: List[str] | None = Query(None),
+    region: List[str] | None = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    if granularity not in facet_service.FACET_GRANULARITIES:
+        raise HTTPException(status_code=400, detail="granularity must be 1, 5 or 10")
+    facets = await facet_service.get_facets(db, granularity, yearFrom, yearTo, genre, region)
+    return APIResponse(data=facets)
@@ -1,8 +1,26 @@
 from fastapi import APIRouter
 
+from ..compression import compression_cache
+from ..services import albums as album_service
+from ..services import response_cache
+
 router = APIRouter()
 
 
 @router.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@router.get("/health/caches")
+def cache_stats():
+    return {
+        "caches": [cache.stats() for cache in album_service.ALBUM_CACHES],
+        "compression": {
+            "version": compression_cache.version,
+            "bytes": compression_cache.size,
+            "hits": compression_cache.hits,
+            "misses": compression_cache.misses,
+        },
+        "redis_responses": response_cache.stats,
+    }
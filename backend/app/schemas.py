@@ -22,6 +22,19 @@ class AlbumResponse(AlbumBase):
     class Config:
         from_attributes = True
 
+class AlbumChangeResponse(AlbumResponse):
+    x: float
+    y: float
+    size: float
+
+class CatalogChangesResponse(BaseModel):
+    version: int
+    since: int
+    # True when the change log cannot cover `since`; the client should reload /albums
+    reset: bool = False
+    upserted: List[AlbumChangeResponse] = []
+    deleted: List[str] = []
+
 class MapPoint(BaseModel):
     # Minimized for map view
     id: Optional[str] = None
@@ -33,6 +46,49 @@ class MapPoint(BaseModel):
     count: int = 1
     label: Optional[str] = None
 
+class SuggestionResponse(BaseModel):
+    type: str  # "album" | "artist"
+    id: str
+    label: str
+    sublabel: Optional[str] = None  # artist of an album suggestion
+    popularity: float = 0.0
+
+class SearchResultResponse(BaseModel):
+    type: str  # "album" | "artist" | "track"
+    id: str
+    label: str
+    sublabel: Optional[str] = None  # artist of an album or track
+    album_id: Optional[str] = None  # album to open: the album itself, or the track's album
+    score: float
+
+class HeatmapResponse(BaseModel):
+    genre: Optional[str] = None
+    region: Optional[str] = None
+    x_min: float
+    x_max: float
+    y_min: float
+    y_max: float
+    width: int
+    height: int
+    max: int
+    total: int
+    counts: List[int]  # row-major, `height` rows of `width` year bins from y_min
+
+class PeriodCount(BaseModel):
+    period_start: int
+    count: int
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class FacetsResponse(BaseModel):
+    granularity: int
+    total: int
+    periods: List[PeriodCount]
+    genres: List[FacetCount]
+    regions: List[FacetCount]
+
 class ResearchRequest(BaseModel):
     album_id: str
     lang: str = 'en'
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..schemas import (
@@ -7,12 +7,133 @@ from ..schemas import (
     AssetResponse, AlbumLinkResponse, AlbumAwardResponse
 )
 from ..repositories import albums as album_repo
-from .common import country_to_region, genre_to_vibe
+from . import columnar
+from . import clusters as cluster_service
+from . import facets as facet_service
+from . import streaming
+from .cache import LRUCache, album_tag, creator_tag
+from .lod import lod_level
+from .pagination import next_album_cursor
+from .columnar import F32, I32, U8, STR
+from .common import FUZZY_TITLE_THRESHOLD, country_to_region, genre_to_vibe
 
 
-async def get_map_points(db: AsyncSession, year_from: int, year_to: int, zoom: float):
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+# Column layouts for the columnar payload mode (see services/columnar.py).
+# Cluster and point layouts share names so clients decode /map/points uniformly;
+# album points add year and popularity, which clusters do not have.
+MAP_CLUSTER_COLUMNS = [
+    ("id", STR, lambda r: None),
+    ("x", F32, lambda r: r.x),
+    ("y", F32, lambda r: r.y),
+    ("r", F32, lambda r: min(r.count * 0.5 + 2, 20)),
+    ("color", STR, lambda r: country_to_region(r.country_code)),
+    ("is_cluster", U8, lambda r: 1),
+    ("count", I32, lambda r: r.count),
+    ("label", STR, lambda r: None),
+]
+
+MAP_POINT_COLUMNS = [
+    ("id", STR, lambda r: r.album_group_id),
+    ("x", F32, lambda r: r.x),
+    ("y", F32, lambda r: r.y),
+    ("r", F32, lambda r: r.size),
+    ("color", STR, lambda r: country_to_region(r.country_code)),
+    ("is_cluster", U8, lambda r: 0),
+    ("count", I32, lambda r: 1),
+    ("label", STR, lambda r: r.title),
+    ("year", I32, lambda r: r.original_year),
+    ("popularity", F32, lambda r: r.popularity),
+]
+
+MAP_POINT_MODEL_COLUMNS = [
+    ("id", STR, lambda p: p.id),
+    ("x", F32, lambda p: p.x),
+    ("y", F32, lambda p: p.y),
+    ("r", F32, lambda p: p.r),
+    ("color", STR, lambda p: p.color),
+    ("is_cluster", U8, lambda p: p.is_cluster),
+    ("count", I32, lambda p: p.count),
+    ("label", STR, lambda p: p.label),
+]
+
+ALBUM_COLUMNS = [
+    ("id", STR, lambda r: r.album_group_id),
+    ("title", STR, lambda r: r.title),
+    ("artist_name", STR, lambda r: r.primary_artist_display),
+    ("year", I32, lambda r: r.original_year or 0),
+    ("genre", STR, lambda r: r.primary_genre or "Unknown"),
+    ("genre_vibe", F32, lambda r: genre_to_vibe(r.primary_genre)),
+    ("region_bucket", STR, lambda r: country_to_region(r.country_code)),
+    ("country", STR, lambda r: r.country_code),
+    ("cover_url", STR, lambda r: r.cover_url),
+    ("popularity", F32, lambda r: r.popularity or 0.0),
+    ("release_date", STR, lambda r: _isoformat(r.earliest_release_date)),
+    ("created_at", STR, lambda r: _isoformat(r.created_at)),
+]
+
+# Map position of an album, only sent when requested via fields=
+ALBUM_POSITION_COLUMNS = [
+    ("x", F32, lambda r: r.x),
+    ("y", F32, lambda r: r.y),
+    ("size", F32, lambda r: r.size),
+]
+
+ALBUM_FIELDS = {
+    "id": lambda r: r.album_group_id,
+    "title": lambda r: r.title,
+    "artist_name": lambda r: r.primary_artist_display,
+    "year": lambda r: r.original_year or 0,
+    "genre": lambda r: r.primary_genre or "Unknown",
+    "genre_vibe": lambda r: genre_to_vibe(r.primary_genre),
+    "region_bucket": lambda r: country_to_region(r.country_code),
+    "country": lambda r: r.country_code,
+    "cover_url": lambda r: r.cover_url,
+    "popularity": lambda r: r.popularity or 0.0,
+    "release_date": lambda r: r.earliest_release_date,
+    "created_at": lambda r: r.created_at,
+    "x": lambda r: r.x,
+    "y": lambda r: r.y,
+    "size": lambda r: r.size,
+}
+
+
+def parse_album_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Comma separated field names -> list (None = full AlbumResponse). Raises ValueError on unknown names."""
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in names if f not in ALBUM_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    if not names:
+        raise ValueError("fields must name at least one field")
+    return names
+
+
+def project_album_row(r, fields: List[str]) -> dict:
+    return {f: ALBUM_FIELDS[f](r) for f in fields}
+
+
+def _album_columns_spec(fields: Optional[List[str]]):
+    if fields is None:
+        return ALBUM_COLUMNS
+    return [c for c in ALBUM_COLUMNS + ALBUM_POSITION_COLUMNS if c[0] in fields]
+
+
+async def get_map_points(db: AsyncSession, year_from: int, year_to: int, zoom: float, bbox=None):
     if zoom < 2.0:
-        result = await album_repo.get_map_points_grid(db, year_from, year_to)
+        clustered = cluster_service.get_clusters(zoom, year_from, year_to, bbox)
+        if clustered is not None:
+            return clustered
+
+        if bbox is None:
+            result = await facet_service.get_grid_clusters(db, year_from, year_to)
+        else:
+            result = await album_repo.get_map_points_grid(db, year_from, year_to, bbox)
         points = []
         for row in result:
             region = country_to_region(row.country_code)
@@ -26,13 +147,13 @@ async def get_map_points(db: AsyncSession, year_from: int, year_to: int, zoom: f
             ))
         return points
 
-    result = await album_repo.get_album_groups_with_nodes(db, year_from, year_to, 50000)
+    result = await album_repo.get_album_groups_with_nodes(db, year_from, year_to, 50000, bbox, lod_level(zoom))
     points = []
     for ag, mn in result.all():
         region = country_to_region(ag.country_code)
         points.append(MapPoint(
             id=ag.album_group_id,
-            x=ag.original_year or 0,
+            x=mn.x,
             y=mn.y,
             r=mn.size,
             color=region,
@@ -42,49 +163,163 @@ async def get_map_points(db: AsyncSession, year_from: int, year_to: int, zoom: f
     return points
 
 
-async def list_albums(db: AsyncSession, limit: int, offset: int):
-    result = await album_repo.get_all_albums(db, limit, offset)
-    albums = []
-    for ag, mn in result.all():
-        albums.append(AlbumResponse(
-            id=ag.album_group_id,
-            title=ag.title,
-            artist_name=ag.primary_artist_display,
-            year=ag.original_year or 0,
-            genre=ag.primary_genre or "Unknown",
-            genre_vibe=genre_to_vibe(ag.primary_genre),
-            region_bucket=country_to_region(ag.country_code),
-            country=ag.country_code,
-            cover_url=ag.cover_url,
-            popularity=ag.popularity or 0.0,
-            release_date=ag.earliest_release_date,
-            created_at=ag.created_at
-        ))
-    return albums
+async def get_map_points_columnar(db: AsyncSession, year_from: int, year_to: int, zoom: float, bbox=None) -> bytes:
+    if zoom < 2.0:
+        clustered = cluster_service.get_clusters(zoom, year_from, year_to, bbox)
+        if clustered is not None:
+            return columnar.encode_columns(clustered, MAP_POINT_MODEL_COLUMNS)
 
+        if bbox is None:
+            result = await facet_service.get_grid_clusters(db, year_from, year_to)
+        else:
+            result = await album_repo.get_map_points_grid(db, year_from, year_to, bbox)
+        return columnar.encode_columns(result, MAP_CLUSTER_COLUMNS)
 
-async def search_albums(db: AsyncSession, q: str):
-    result = await album_repo.search_albums(db, q)
-    albums = []
-    for ag, mn in result.all():
-        albums.append(AlbumResponse(
-            id=ag.album_group_id,
-            title=ag.title,
-            artist_name=ag.primary_artist_display,
-            year=ag.original_year or 0,
-            genre=ag.primary_genre or "Unknown",
-            genre_vibe=genre_to_vibe(ag.primary_genre),
-            region_bucket=country_to_region(ag.country_code),
-            country=ag.country_code,
-            cover_url=ag.cover_url,
-            popularity=ag.popularity or 0.0,
-            release_date=ag.earliest_release_date,
-            created_at=ag.created_at
-        ))
-    return albums
+    result = await album_repo.get_map_point_rows(db, year_from, year_to, 50000, bbox, lod_level(zoom))
+    return columnar.encode_columns(result, MAP_POINT_COLUMNS)
 
 
-async def get_album_summary(db: AsyncSession, album_id: str):
+def album_row_dict(r) -> dict:
+    """AlbumResponse fields from a column-only album row."""
+    return {
+        "id": r.album_group_id,
+        "title": r.title,
+        "artist_name": r.primary_artist_display,
+        "year": r.original_year or 0,
+        "genre": r.primary_genre or "Unknown",
+        "genre_vibe": genre_to_vibe(r.primary_genre),
+        "region_bucket": country_to_region(r.country_code),
+        "country": r.country_code,
+        "cover_url": r.cover_url,
+        "popularity": r.popularity or 0.0,
+        "release_date": r.earliest_release_date,
+        "created_at": r.created_at,
+    }
+
+
+def map_point_row_dict(r) -> dict:
+    """MapPoint fields from a column-only map point row."""
+    return {
+        "id": r.album_group_id,
+        "x": r.x,
+        "y": r.y,
+        "r": r.size,
+        "color": country_to_region(r.country_code),
+        "is_cluster": False,
+        "count": 1,
+        "label": r.title,
+    }
+
+
+async def stream_map_points(db: AsyncSession, year_from: int, year_to: int, zoom: float, bbox=None):
+    if zoom < 2.0:
+        # Cluster views are small and already in memory or precomputed
+        points = await get_map_points(db, year_from, year_to, zoom, bbox)
+        return streaming.iter_ndjson(p.model_dump() for p in points)
+    return streaming.stream_ndjson(
+        album_repo.stream_map_point_rows, map_point_row_dict,
+        year_from, year_to, 50000, bbox, lod_level(zoom)
+    )
+
+
+def _album_rows_for(fields: Optional[List[str]]):
+    """(SELECT columns, row -> dict) for a full (fields=None) or projected album listing."""
+    if fields is None:
+        return None, album_row_dict
+    return album_repo.album_field_columns(fields), lambda r: project_album_row(r, fields)
+
+
+async def list_albums(db: AsyncSession, limit: int, offset: int, after=None, fields=None):
+    """
+    /albums page as plain dicts, read as column tuples without ORM entities or
+    pydantic models (see scripts/db/benchmark/bench-album-read.py).
+    Returns (items, next page cursor).
+    """
+    columns, to_dict = _album_rows_for(fields)
+    rows = (await album_repo.get_all_album_rows(db, limit, offset, after, columns)).all()
+    next_cursor = next_album_cursor(rows[-1] if rows else None, limit, len(rows))
+    return [to_dict(r) for r in rows], next_cursor
+
+
+async def list_albums_columnar(db: AsyncSession, limit: int, offset: int, after=None, fields=None):
+    """Return (payload, next page cursor)."""
+    columns, _ = _album_rows_for(fields)
+    rows = (await album_repo.get_all_album_rows(db, limit, offset, after, columns)).all()
+    next_cursor = next_album_cursor(rows[-1] if rows else None, limit, len(rows))
+    return columnar.encode_columns(rows, _album_columns_spec(fields)), next_cursor
+
+
+def stream_albums(limit: int, offset: int, after=None, fields=None, catalog_version: Optional[int] = None):
+    """NDJSON /albums page; the last line is {"meta": {catalog_version, next_cursor}}."""
+    columns, to_dict = _album_rows_for(fields)
+
+    def meta(last_row, count: int) -> dict:
+        return {"catalog_version": catalog_version, "next_cursor": next_album_cursor(last_row, limit, count)}
+
+    return streaming.stream_ndjson(
+        album_repo.stream_all_album_rows, to_dict, limit, offset, after, columns, meta=meta
+    )
+
+
+async def search_albums(db: AsyncSession, q: str, fields=None):
+    columns, to_dict = _album_rows_for(fields)
+    result = await album_repo.get_search_album_rows(db, q, columns=columns, fuzzy_threshold=FUZZY_TITLE_THRESHOLD)
+    return [to_dict(r) for r in result]
+
+
+def stream_search_albums(q: str, fields=None):
+    columns, to_dict = _album_rows_for(fields)
+    return streaming.stream_ndjson(
+        album_repo.stream_search_album_rows, to_dict, q, 20, columns, FUZZY_TITLE_THRESHOLD
+    )
+
+
+# DetailPanel clicks concentrate on popular albums. These hold the response
+# bodies of /albums/{id} and /album-groups/{id}/detail in front of the shared
+# Redis cache (response_cache.get_or_compute(local=...)). Entries are tagged
+# with the album (and, for details, the credited creators) and evicted
+# precisely when those change (services/invalidation.py), so unrelated
+# catalog writes keep the cache warm.
+ALBUM_CACHE_TTL_SECONDS = 600
+# Tag on every detail entry, for writes that touch many albums' credits at once
+ALBUM_DETAILS_TAG = "album_details"
+album_summary_cache = LRUCache("album_summary", max_entries=4096, ttl_seconds=ALBUM_CACHE_TTL_SECONDS)
+album_detail_cache = LRUCache("album_detail", max_entries=1024, ttl_seconds=ALBUM_CACHE_TTL_SECONDS)
+ALBUM_CACHES = (album_summary_cache, album_detail_cache)
+
+
+def invalidate_album_caches(tags: Optional[List[str]] = None) -> int:
+    """Drop cached summaries/details with any of the given tags (everything if None)."""
+    if tags is None:
+        dropped = sum(len(c) for c in ALBUM_CACHES)
+        for cache in ALBUM_CACHES:
+            cache.clear()
+        return dropped
+    return sum(cache.invalidate_tags(tags) for cache in ALBUM_CACHES)
+
+
+def album_detail_tags(detail: dict) -> List[str]:
+    """Tags of a detail response, from its JSON form ({"album": ..., "album_credits": ...})."""
+    creators = {c["creator"]["creator_id"] for c in detail["album_credits"]}
+    creators.update(c["creator"]["creator_id"] for c in detail["track_credits"])
+    return [album_tag(detail["album"]["id"]), ALBUM_DETAILS_TAG] + [creator_tag(c) for c in sorted(creators)]
+
+
+async def get_album_summary(db: AsyncSession, album_id: str, fields=None):
+    """Uncached; the routes cache the response body (album_summary_cache, then Redis)."""
+    return await _load_album_summary(db, album_id, fields)
+
+
+async def get_album_group_detail(db: AsyncSession, album_id: str):
+    """Uncached; the routes cache the response body (album_detail_cache, then Redis)."""
+    return await _load_album_group_detail(db, album_id)
+
+
+async def _load_album_summary(db: AsyncSession, album_id: str, fields=None):
+    if fields is not None:
+        row = await album_repo.get_album_row(db, album_id, album_repo.album_field_columns(fields))
+        return project_album_row(row, fields) if row else None
+
     row = await album_repo.get_album_group(db, album_id)
     if not row:
         return None
@@ -105,7 +340,7 @@ async def get_album_summary(db: AsyncSession, album_id: str):
     )
 
 
-async def get_album_group_detail(db: AsyncSession, album_id: str):
+async def _load_album_group_detail(db: AsyncSession, album_id: str):
     row = await album_repo.get_album_group(db, album_id)
     if not row:
         return None
@@ -2,6 +2,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..schemas import ArtistProfileResponse, ArtistLinkResponse, ArtistAlbumResponse, ArtistRelationResponse
 from ..repositories import albums as album_repo
+from .cache import ARTISTS_TAG, album_tag, creator_tag
+from .common import FUZZY_NAME_THRESHOLD
+from .normalization import normalize_key
+
+
+def artist_profile_tags(profile: dict):
+    """Cache tags of a lookup (JSON form): its creator, related creators and discography albums."""
+    tags = [ARTISTS_TAG]
+    if profile.get("creator_id"):
+        tags.append(creator_tag(profile["creator_id"]))
+    tags.extend(creator_tag(r["creator_id"]) for r in profile["relations"])
+    tags.extend(album_tag(a["id"]) for a in profile["discography"])
+    return tags
 
 
 async def get_artist_profile(db: AsyncSession, name: str):
@@ -12,14 +25,15 @@ async def get_artist_profile(db: AsyncSession, name: str):
     if not normalized:
         return None
 
-    row = await album_repo.get_artist_profile_exact(db, normalized)
+    # "bjork", "BJÖRK" and "Björk" all find Björk
+    row = await album_repo.get_artist_profile_exact(db, normalize_key(normalized))
 
     creator = None
     profile = None
     if row:
         creator, profile = row
     else:
-        row = await album_repo.get_artist_profile_fuzzy(db, normalized)
+        row = await album_repo.get_artist_profile_fuzzy(db, normalized, FUZZY_NAME_THRESHOLD)
         if row:
             creator, profile = row
 
@@ -43,7 +57,7 @@ async def get_artist_profile(db: AsyncSession, name: str):
             for l in creator_links
         ]
 
-    discography_res = await album_repo.get_discography(db, display_name)
+    discography_res = await album_repo.get_discography(db, normalize_key(display_name))
     discography = [
         ArtistAlbumResponse(
             id=a.album_group_id,
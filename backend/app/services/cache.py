@@ -0,0 +1,136 @@
+"""
+Small in-process LRU cache with a TTL and hit/miss counters.
+
+Single event loop, so no locking. Entries are evicted least recently used
+first once max_entries is reached and treated as missing after ttl seconds.
+Entries can carry tags (e.g. "album:<id>", "creator:<id>") so a change
+invalidates exactly the entries built from the changed rows. A value loaded
+before an invalidation of one of its tags is not stored (set(started_at=...)),
+so a slow load cannot put back data that was just invalidated.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+MISSING = object()
+
+# How long invalidation times are remembered for the started_at check;
+# loads slower than this may store a value invalidated while they ran
+INVALIDATION_MEMORY_SECONDS = 60.0
+
+
+# Tag on every artist lookup: discographies match albums by artist name, so
+# new albums and creator imports cannot be pinned to ids
+ARTISTS_TAG = "artists"
+
+
+def album_tag(album_id: str) -> str:
+    return f"album:{album_id}"
+
+
+def creator_tag(creator_id: str) -> str:
+    return f"creator:{creator_id}"
+
+
+class LRUCache:
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tagged: Dict[str, Set[Hashable]] = {}
+        self._invalidated_at: Dict[str, float] = {}
+        self._cleared_at = float("-inf")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    def get(self, key: Hashable):
+        """Cached value or MISSING."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (), started_at: Optional[float] = None):
+        """
+        Store value. started_at (time.monotonic() taken before loading it)
+        skips the store if the cache was cleared or one of the tags was
+        invalidated since.
+        """
+        tags = tuple(tags)
+        if started_at is not None and (
+            self._cleared_at >= started_at
+            or any(self._invalidated_at.get(tag, float("-inf")) >= started_at for tag in tags)
+        ):
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value, tags)
+        for tag in tags:
+            self._tagged.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        if key in self._entries:
+            self._remove(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        keys = [k for k in self._entries if predicate(k)]
+        for k in keys:
+            self._remove(k)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        now = time.monotonic()
+        horizon = now - INVALIDATION_MEMORY_SECONDS
+        self._invalidated_at = {t: at for t, at in self._invalidated_at.items() if at > horizon}
+        keys = set()
+        for tag in tags:
+            self._invalidated_at[tag] = now
+            keys |= self._tagged.get(tag, set())
+        for k in keys:
+            self._remove(k)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        self._cleared_at = time.monotonic()
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._tagged.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
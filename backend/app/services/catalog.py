@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..repositories import catalog as catalog_repo
+from ..schemas import AlbumChangeResponse, CatalogChangesResponse
+from .common import country_to_region, genre_to_vibe
+from . import facets as facet_service
+from . import layout as layout_service
+from . import lod as lod_service
+from . import search as search_service
+from . import snapshot as snapshot_service
+from . import tiles as tile_service
+from .catalog_version import read_stable_version
+
+
+async def refresh_derived_data(
+    db: AsyncSession,
+    album_ids: Optional[List[str]] = None,
+    layout: bool = True,
+    changed_only: bool = False,
+) -> dict:
+    """
+    Refresh everything derived from album_groups after scripts write to them,
+    ending with the catalog snapshot (services/snapshot.py).
+
+    album_ids limits incremental work to the touched albums and changed_only to
+    albums edited since their map node was written; otherwise everything is
+    rebuilt. layout=False keeps the current map_nodes coordinates.
+    """
+    name_keys = await search_service.refresh_name_keys(db)
+    laid_out: List[str] = []
+    previous_points = []
+    if layout:
+        laid_out, previous_points = await layout_service.layout_albums(db, album_ids, changed_only)
+    lod_updates = await lod_service.refresh_lod(db)
+
+    if album_ids is None and not changed_only:
+        tiles = await tile_service.rebuild_all_tiles(db)
+    else:
+        tiles = await tile_service.refresh_tiles_for_albums(
+            db, sorted(set(album_ids or []) | set(laid_out)), previous_points
+        )
+    cube_rows = await facet_service.refresh_facet_cube(db)
+    await prune_change_log(db)
+    # Last, so the snapshot carries the version after the layout writes above
+    snapshot = await snapshot_service.build_catalog_snapshot(db)
+    return {
+        "name_keys": name_keys,
+        "laid_out": len(laid_out),
+        "lod_updates": lod_updates,
+        "tiles": tiles,
+        "cube_rows": cube_rows,
+        "snapshot_version": snapshot["version"],
+    }
+
+
+# More changed albums than this and a full /albums reload is cheaper
+CHANGES_MAX_ALBUMS = 5000
+CHANGE_LOG_RETENTION_DAYS = 30
+# album_group_id of "refresh" change rows, which are not tied to one album
+CATALOG_WIDE_CHANGE = "*"
+
+
+async def get_catalog_version(db: AsyncSession) -> int:
+    return await read_stable_version(db)
+
+
+async def bump_catalog_version(db: AsyncSession) -> int:
+    """
+    Start a new catalog version after writing catalog data that the
+    album_groups/map_nodes triggers do not see (creators, credits, awards).
+    Import scripts call this after committing. Returns the new version.
+    """
+    version = await catalog_repo.insert_catalog_change(db, CATALOG_WIDE_CHANGE, "refresh")
+    await db.commit()
+    return version
+
+
+async def prune_change_log(db: AsyncSession) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=CHANGE_LOG_RETENTION_DAYS)
+    deleted = await catalog_repo.prune_changes(db, cutoff)
+    await db.commit()
+    return deleted
+
+
+async def get_changes(db: AsyncSession, since: int, version: int) -> CatalogChangesResponse:
+    """
+    Changes in (since, version]. version is the published (stable) catalog
+    version: newer ids may still be joined by lower ones committing late.
+    """
+    oldest, _ = await catalog_repo.get_change_bounds(db)
+
+    if since == version:
+        return CatalogChangesResponse(version=version, since=since)
+    # Unknown future version, or changes after `since` were already pruned
+    if since > version or oldest is None or since < oldest - 1:
+        return CatalogChangesResponse(version=version, since=since, reset=True)
+    if await catalog_repo.count_changed_albums(db, since) > CHANGES_MAX_ALBUMS:
+        return CatalogChangesResponse(version=version, since=since, reset=True)
+
+    changes = await catalog_repo.get_latest_changes(db, since, version)
+    candidate_ids = [c.album_group_id for c in changes if c.change_type == "upsert"]
+    deleted = [c.album_group_id for c in changes if c.change_type == "delete"]
+
+    upserted = []
+    found = set()
+    if candidate_ids:
+        for ag, mn in await catalog_repo.get_albums_with_nodes_by_ids(db, candidate_ids):
+            found.add(ag.album_group_id)
+            upserted.append(AlbumChangeResponse(
+                id=ag.album_group_id,
+                title=ag.title,
+                artist_name=ag.primary_artist_display,
+                year=ag.original_year or 0,
+                genre=ag.primary_genre or "Unknown",
+                genre_vibe=genre_to_vibe(ag.primary_genre),
+                region_bucket=country_to_region(ag.country_code),
+                country=ag.country_code,
+                cover_url=ag.cover_url,
+                popularity=ag.popularity or 0.0,
+                release_date=ag.earliest_release_date,
+                created_at=ag.created_at,
+                x=mn.x,
+                y=mn.y,
+                size=mn.size
+            ))
+    # Albums without a map node are not part of /albums either
+    deleted.extend(a for a in candidate_ids if a not in found)
+
+    return CatalogChangesResponse(version=version, since=since, upserted=upserted, deleted=deleted)
@@ -0,0 +1,142 @@
+"""
+In-memory copy of the catalog version (highest catalog_changes id).
+
+Conditional GETs and the in-process caches key on it, so it must be
+available without a query. It is polled every CATALOG_VERSION_POLL_SECONDS
+(and reloaded at once when an invalidation message arrives); callbacks
+registered with on_version_change run when it moves, before the new version
+is published, so caches are evicted before responses carry the new ETag.
+
+Change ids come from a sequence, so a transaction holding a lower id can
+commit after a higher id became visible. The version therefore only moves
+up to a stable bound: the last id handed out at some point, once every
+transaction that was in progress at that point has finished. Every change up
+to the version is then visible, and clients syncing from it (/catalog/changes,
+the snapshot, the suggest index) never skip one.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import AsyncSessionLocal
+from ..repositories import catalog as catalog_repo
+
+CATALOG_VERSION_POLL_SECONDS = 5
+# First load only: how long to wait for writers in progress before using the
+# latest id as is
+CATALOG_VERSION_STABLE_WAIT_SECONDS = 30
+CATALOG_VERSION_STABLE_RETRY_SECONDS = 0.2
+
+# listener(previous_version, version); previous_version is None on first load
+VersionListener = Callable[[Optional[int], int], Optional[Awaitable[None]]]
+
+
+class CatalogVersionState:
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.changed_at: Optional[datetime] = None
+        self.listeners: List[VersionListener] = []
+        # Highest sequence bound known to be stable
+        self.bound: Optional[int] = None
+        # (sequence bound, xids in progress when it was read), oldest first
+        self.pending: List[Tuple[int, List[int]]] = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.version is not None
+
+    async def _stable_bound(self, db: AsyncSession) -> Optional[int]:
+        """The newest pending bound whose writers have all finished, if any."""
+        bound, xids = await catalog_repo.get_change_sequence_state(db)
+        last = self.pending[-1][0] if self.pending else self.bound
+        if last is None or bound > last:
+            self.pending.append((bound, xids))
+        waiting = set(await catalog_repo.get_in_progress_xids(db, sorted({x for _, xs in self.pending for x in xs})))
+        # A writer still running blocks every later bound too (it is in their lists)
+        stable = None
+        while self.pending and waiting.isdisjoint(self.pending[0][1]):
+            stable = self.pending.pop(0)[0]
+        return stable
+
+    async def _wait_stable_bound(self, db: AsyncSession) -> int:
+        deadline = time.monotonic() + CATALOG_VERSION_STABLE_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(CATALOG_VERSION_STABLE_RETRY_SECONDS)
+            stable = await self._stable_bound(db)
+            if stable is not None:
+                return stable
+        print("Catalog version: writers still in progress, using the latest change id")
+        bound = self.pending[-1][0]
+        self.pending.clear()
+        return bound
+
+    async def refresh(self, db: AsyncSession) -> bool:
+        """Reload from the change log. Returns True if the version changed."""
+        async with self._lock:
+            return await self._refresh(db)
+
+    async def _refresh(self, db: AsyncSession) -> bool:
+        # The bound moves only with the version: if a listener fails, the
+        # next poll finds the same bound again and retries
+        bound, pending = self.bound, list(self.pending)
+        try:
+            stable = await self._stable_bound(db)
+            if stable is None:
+                if self.bound is not None:
+                    return False
+                stable = await self._wait_stable_bound(db)
+            latest = await catalog_repo.get_latest_change(db, stable)
+            version, changed_at = (latest.id, latest.changed_at) if latest else (0, None)
+            changed = version != self.version
+            if changed:
+                for listener in self.listeners:
+                    result = listener(self.version, version)
+                    if asyncio.iscoroutine(result):
+                        await result
+        except Exception:
+            self.bound, self.pending = bound, pending
+            raise
+        self.bound = stable
+        self.version, self.changed_at = version, changed_at
+        return changed
+
+
+catalog_version_state = CatalogVersionState()
+
+
+def on_version_change(listener: VersionListener):
+    catalog_version_state.listeners.append(listener)
+
+
+async def read_stable_version(db: AsyncSession) -> int:
+    """
+    Version for loaders to record before reading their rows: the published
+    one once loaded (it may lag the rows, never skip a change), otherwise
+    read now (scripts and startup).
+    """
+    if catalog_version_state.ready:
+        return catalog_version_state.version
+    state = CatalogVersionState()
+    await state.refresh(db)
+    return state.version
+
+
+async def current_catalog_version():
+    """(version, changed_at) from memory; loads it on first use."""
+    if not catalog_version_state.ready:
+        async with AsyncSessionLocal() as db:
+            await catalog_version_state.refresh(db)
+    return catalog_version_state.version, catalog_version_state.changed_at
+
+
+async def catalog_version_refresh_loop():
+    while True:
+        await asyncio.sleep(CATALOG_VERSION_POLL_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                await catalog_version_state.refresh(db)
+        except Exception as e:
+            print(f"Catalog version refresh error: {e}")
@@ -0,0 +1,193 @@
+"""
+In-process hierarchical cluster index for zoomed-out map views.
+
+Nodes are loaded once into NumPy arrays and aggregated into a quadtree of
+grid levels: level z has (CLUSTER_GRID * 2^z)^2 cells over the map world
+bounds. Each level keeps its aggregates per (cell, release year); the finest
+level is built from the nodes and every coarser level by merging 2x2 cells
+of the level below. Queries select the years in range and sum them per cell,
+so they never touch Postgres and clusters straddling the range only count
+their members inside it.
+Loading and refreshing is handled by services/map_indexes.py.
+"""
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ..schemas import MapPoint
+from .common import COUNTRY_TO_REGION, country_to_region, MAP_X_MIN, MAP_X_MAX, MAP_Y_MIN, MAP_Y_MAX
+
+CLUSTER_MAX_ZOOM = 6
+# Level 0 grid: 16 cells across ~ 5-year buckets, matching the SQL grid
+CLUSTER_GRID = 16
+
+REGIONS = sorted(set(COUNTRY_TO_REGION.values())) + ["Unknown"]
+_REGION_INDEX = {r: i for i, r in enumerate(REGIONS)}
+
+
+class _Level:
+    """
+    Aggregates per (grid cell, release year) of one zoom level. Keeping the
+    year apart lets a query count only the members inside its year range,
+    even for clusters that straddle year_from or year_to.
+    """
+    __slots__ = ("gx", "gy", "year", "count", "sum_x", "sum_y", "popularity", "region_counts", "first")
+
+    def __init__(self, gx, gy, year, count, sum_x, sum_y, popularity, region_counts, first):
+        self.gx = gx
+        self.gy = gy
+        self.year = year
+        self.count = count
+        self.sum_x = sum_x
+        self.sum_y = sum_y
+        self.popularity = popularity
+        self.region_counts = region_counts
+        # Index of one member node, used to label single-node clusters
+        self.first = first
+
+
+def _group(key, count, sum_x, sum_y, popularity, region_counts, first):
+    """Sum the aggregates of entries sharing a key; returns (first entry index, sums...)."""
+    _, idx, inverse = np.unique(key, return_index=True, return_inverse=True)
+    n = len(idx)
+    merged_regions = np.zeros((n, region_counts.shape[1]), dtype=np.int64)
+    np.add.at(merged_regions, inverse, region_counts)
+    return (
+        idx,
+        np.bincount(inverse, weights=count, minlength=n).astype(np.int64),
+        np.bincount(inverse, weights=sum_x, minlength=n),
+        np.bincount(inverse, weights=sum_y, minlength=n),
+        np.bincount(inverse, weights=popularity, minlength=n),
+        merged_regions,
+        first[idx],
+    )
+
+
+def _merge(gx, gy, year, count, sum_x, sum_y, popularity, region_counts, first) -> _Level:
+    """Group entries by (grid cell, year) and sum their aggregates."""
+    # gx, gy < 2^21 and years < 2^21 (clipped at 0), so the key fits in 63 bits
+    key = (((gx << 21) + gy) << 21) + year
+    idx, *sums = _group(key, count, sum_x, sum_y, popularity, region_counts, first)
+    return _Level(gx[idx], gy[idx], year[idx], *sums)
+
+
+class ClusterIndex:
+    def __init__(self):
+        self.levels: List[_Level] = []
+        self.ids: List[str] = []
+        self.titles: List[str] = []
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def build(self, rows):
+        n = len(rows)
+        x = np.fromiter((r.x for r in rows), dtype=np.float64, count=n)
+        y = np.fromiter((r.y for r in rows), dtype=np.float64, count=n)
+        popularity = np.fromiter((r.popularity or 0.0 for r in rows), dtype=np.float64, count=n)
+        region = np.fromiter(
+            (_REGION_INDEX[country_to_region(r.country_code)] for r in rows), dtype=np.int64, count=n
+        )
+
+        # Release year of each node: layout keeps x inside the year
+        year = np.maximum(np.floor(x), 0).astype(np.int64)
+
+        # Finest level straight from the nodes
+        cells = CLUSTER_GRID << CLUSTER_MAX_ZOOM
+        nx = np.clip((x - MAP_X_MIN) / (MAP_X_MAX - MAP_X_MIN), 0.0, 0.999999)
+        ny = np.clip((y - MAP_Y_MIN) / (MAP_Y_MAX - MAP_Y_MIN), 0.0, 0.999999)
+        region_counts = np.zeros((n, len(REGIONS)), dtype=np.int64)
+        region_counts[np.arange(n), region] = 1
+        level = _merge(
+            (nx * cells).astype(np.int64),
+            (ny * cells).astype(np.int64),
+            year,
+            np.ones(n, dtype=np.int64),
+            x, y, popularity, region_counts,
+            np.arange(n, dtype=np.int64),
+        )
+
+        # Coarser levels merge 2x2 child cells of the level below, year by year
+        levels = [level]
+        for _ in range(CLUSTER_MAX_ZOOM):
+            level = _merge(
+                level.gx >> 1, level.gy >> 1, level.year, level.count,
+                level.sum_x, level.sum_y, level.popularity, level.region_counts, level.first,
+            )
+            levels.append(level)
+        levels.reverse()
+
+        self.levels = levels
+        self.ids = [r.album_group_id for r in rows]
+        self.titles = [r.title for r in rows]
+        self.loaded_at = time.time()
+
+    def query(
+        self,
+        zoom: float,
+        year_from: int,
+        year_to: int,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+    ) -> List[MapPoint]:
+        if not self.levels:
+            return []
+        level = self.levels[min(max(int(zoom), 0), CLUSTER_MAX_ZOOM)]
+
+        # Only the members released in the range, then summed per cell
+        in_range = np.flatnonzero((level.year >= year_from) & (level.year <= year_to))
+        if in_range.size == 0:
+            return []
+        _, count, sum_x, sum_y, _, region_counts, first = _group(
+            (level.gx[in_range] << 32) + level.gy[in_range],
+            level.count[in_range],
+            level.sum_x[in_range],
+            level.sum_y[in_range],
+            level.popularity[in_range],
+            level.region_counts[in_range],
+            level.first[in_range],
+        )
+        cx = sum_x / count
+        cy = sum_y / count
+        region = region_counts.argmax(axis=1)
+
+        mask = np.ones(len(count), dtype=bool)
+        if bbox is not None:
+            x1, x2, y1, y2 = bbox
+            mask &= (cx >= x1) & (cx <= x2) & (cy >= y1) & (cy <= y2)
+
+        points = []
+        for i in np.flatnonzero(mask):
+            n = int(count[i])
+            if n == 1:
+                node = int(first[i])
+                points.append(MapPoint(
+                    id=self.ids[node],
+                    x=float(cx[i]),
+                    y=float(cy[i]),
+                    color=REGIONS[region[i]],
+                    is_cluster=False,
+                    label=self.titles[node],
+                ))
+            else:
+                points.append(MapPoint(
+                    x=float(cx[i]),
+                    y=float(cy[i]),
+                    r=min(n * 0.5 + 2, 20),
+                    count=n,
+                    color=REGIONS[region[i]],
+                    is_cluster=True,
+                ))
+        return points
+
+
+cluster_index = ClusterIndex()
+
+
+def get_clusters(zoom: float, year_from: int, year_to: int, bbox=None) -> Optional[List[MapPoint]]:
+    """Clusters from the in-memory index, or None if it has not been loaded."""
+    if not cluster_index.ready:
+        return None
+    return cluster_index.query(zoom, year_from, year_to, bbox)
@@ -0,0 +1,93 @@
+"""
+Columnar binary encoding for large list payloads.
+
+Layout (little-endian):
+  magic b"SCOL" | u32 version | u32 rows | u32 columns
+  per column: u8 name length, name (utf-8), u8 dtype
+  zero padding to a 4-byte boundary
+  column data in declaration order (4 bytes per row for f32/i32/str, 1 byte for u8)
+  zero padding to a 4-byte boundary
+  string table: u32 count, u32 offsets[count + 1], utf-8 blob
+
+dtype: 1 = float32, 2 = int32, 3 = uint8, 4 = string (int32 index into the
+string table, -1 for null). Strings are deduplicated, so repeated values such
+as genres and regions cost four bytes per row.
+"""
+import struct
+import sys
+from array import array
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.sonic.columnar"
+COLUMNAR_VERSION = 1
+
+F32 = 1
+I32 = 2
+U8 = 3
+STR = 4
+
+_ARRAY_CODES = {F32: "f", I32: "i", U8: "B", STR: "i"}
+
+# (column name, dtype, getter)
+ColumnSpec = Tuple[str, int, Callable[[Any], Any]]
+
+
+def accepts_columnar(accept: Optional[str]) -> bool:
+    return bool(accept) and COLUMNAR_MEDIA_TYPE in accept
+
+
+def _pad(buf: bytearray):
+    buf.extend(b"\x00" * (-len(buf) % 4))
+
+
+def encode_columns(rows: Iterable[Any], spec: Sequence[ColumnSpec]) -> bytes:
+    columns: List[array] = [array(_ARRAY_CODES[dtype]) for _, dtype, _ in spec]
+    strings: List[str] = []
+    string_index: dict = {}
+
+    def intern(value) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        idx = string_index.get(value)
+        if idx is None:
+            idx = len(strings)
+            string_index[value] = idx
+            strings.append(value)
+        return idx
+
+    count = 0
+    for row in rows:
+        count += 1
+        for col, (_, dtype, getter) in zip(columns, spec):
+            value = getter(row)
+            if dtype == STR:
+                col.append(intern(value))
+            elif dtype == F32:
+                col.append(float(value or 0.0))
+            else:
+                col.append(int(value or 0))
+
+    buf = bytearray(b"SCOL")
+    buf += struct.pack("<III", COLUMNAR_VERSION, count, len(spec))
+    for name, dtype, _ in spec:
+        encoded = name.encode("utf-8")
+        buf += struct.pack("<B", len(encoded)) + encoded + struct.pack("<B", dtype)
+    _pad(buf)
+
+    for col in columns:
+        if sys.byteorder == "big":
+            col.byteswap()
+        buf += col.tobytes()
+    _pad(buf)
+
+    blobs = [s.encode("utf-8") for s in strings]
+    offsets = array("I", [0])
+    for b in blobs:
+        offsets.append(offsets[-1] + len(b))
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    buf += struct.pack("<I", len(blobs))
+    buf += offsets.tobytes()
+    buf += b"".join(blobs)
+    return bytes(buf)
@@ -1,6 +1,13 @@
+import os
 from typing import Optional
 
 
+# pg_trgm thresholds (0-1, higher is stricter) for typo-tolerant matching:
+# creator names by similarity, album titles/artists in /search by word similarity
+FUZZY_NAME_THRESHOLD = float(os.getenv("FUZZY_NAME_THRESHOLD", "0.3"))
+FUZZY_TITLE_THRESHOLD = float(os.getenv("FUZZY_TITLE_THRESHOLD", "0.5"))
+
+
 COUNTRY_TO_REGION = {
     'United States': 'North America', 'USA': 'North America', 'US': 'North America',
     'Canada': 'North America', 'Mexico': 'North America',
@@ -62,3 +69,10 @@ def genre_to_vibe(genre: Optional[str]) -> float:
     if not genre:
         return 0.5
     return GENRE_VIBE_MAP.get(genre, 0.5)
+
+
+# Map world bounds: x = release year, y = genre vibe
+MAP_X_MIN = 1950.0
+MAP_X_MAX = 2030.0
+MAP_Y_MIN = 0.0
+MAP_Y_MAX = 1.0
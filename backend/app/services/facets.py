@@ -0,0 +1,217 @@
+import asyncio
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import AsyncSessionLocal
+from ..repositories import facets as facet_repo
+from ..schemas import FacetsResponse, FacetCount, PeriodCount
+from .catalog_version import catalog_version_state, on_version_change, read_stable_version
+from .clusters import REGIONS
+from .common import country_to_region
+
+# Period sizes kept in album_facet_cube (years)
+FACET_GRANULARITIES = (1, 5, 10)
+
+
+class GridCell(NamedTuple):
+    """Same shape as a row of album_repo.get_map_points_grid."""
+    x: float
+    y: float
+    count: int
+    country_code: Optional[str]
+
+
+async def refresh_facet_cube(db: AsyncSession) -> int:
+    """Recompute the cube from album_groups + map_nodes. Returns the row count."""
+    source = await facet_repo.get_cube_source_rows(db)
+
+    cube: Dict[tuple, list] = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+    for r in source:
+        region = country_to_region(r.country_code)
+        for g in FACET_GRANULARITIES:
+            key = (g, (r.year // g) * g, r.genre, region, r.country_code, r.vibe_bucket)
+            acc = cube[key]
+            acc[0] += r.album_count
+            acc[1] += float(r.year_sum)
+            acc[2] += float(r.vibe_sum)
+            acc[3] += float(r.popularity_sum)
+
+    rows = [
+        {
+            "granularity": g,
+            "period_start": period,
+            "primary_genre": genre,
+            "region": region,
+            "country_code": country,
+            "vibe_bucket": vibe,
+            "album_count": count,
+            "year_sum": year_sum,
+            "vibe_sum": vibe_sum,
+            "popularity_sum": pop_sum,
+        }
+        for (g, period, genre, region, country, vibe), (count, year_sum, vibe_sum, pop_sum) in cube.items()
+    ]
+    await facet_repo.replace_cube(db, rows)
+    await db.commit()
+    return len(rows)
+
+
+async def get_grid_clusters(db: AsyncSession, year_from: int, year_to: int) -> List[GridCell]:
+    """5-year x vibe-decile clusters read from the cube instead of album_groups."""
+    rows = await facet_repo.get_cube_grid_rows(db, year_from, year_to)
+
+    cells: Dict[tuple, list] = defaultdict(lambda: [0, 0.0, 0.0, Counter()])
+    for r in rows:
+        acc = cells[(r.bucket, r.vibe_bucket)]
+        acc[0] += r.count
+        acc[1] += r.year_sum
+        acc[2] += r.vibe_sum
+        acc[3][r.country_code] += r.count
+
+    points = []
+    for count, year_sum, vibe_sum, countries in cells.values():
+        # Like mode() in SQL, ignore NULL countries unless nothing else is left
+        known = [(c, n) for c, n in countries.most_common() if c is not None]
+        points.append(GridCell(
+            x=year_sum / count,
+            y=vibe_sum / count,
+            count=count,
+            country_code=known[0][0] if known else None,
+        ))
+    return points
+
+
+class FacetIndex:
+    """
+    Album counts as one NumPy array counts[genre, region, year]. Any filter
+    combination is a masked sum over that array, so /facets latency depends
+    on the number of genres, regions and years, not on the catalog size.
+    """
+
+    def __init__(self):
+        self.genres: List[str] = []
+        self.year_min = 0
+        self.counts: Optional[np.ndarray] = None
+        # Catalog version the index was built from
+        self.version: Optional[int] = None
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def build(self, rows, version: int):
+        genres = sorted({r.genre for r in rows})
+        genre_index = {g: i for i, g in enumerate(genres)}
+        region_index = {r: i for i, r in enumerate(REGIONS)}
+        year_min = min((r.year for r in rows), default=0)
+        year_max = max((r.year for r in rows), default=-1)
+
+        counts = np.zeros((len(genres), len(REGIONS), year_max - year_min + 1), dtype=np.int64)
+        for r in rows:
+            counts[genre_index[r.genre], region_index[country_to_region(r.country_code)], r.year - year_min] += r.album_count
+
+        self.genres = genres
+        self.year_min = year_min
+        self.counts = counts
+        self.version = version
+        self.loaded_at = time.time()
+
+    def _mask(self, values: List[str], selected: Optional[List[str]]) -> np.ndarray:
+        if not selected:
+            return np.ones(len(values), dtype=bool)
+        wanted = set(selected)
+        return np.fromiter((v in wanted for v in values), dtype=bool, count=len(values))
+
+    def query(
+        self,
+        granularity: int,
+        year_from: int,
+        year_to: int,
+        genres: Optional[List[str]] = None,
+        regions: Optional[List[str]] = None,
+    ) -> FacetsResponse:
+        # Exactly the years in range; a period cut by year_from or year_to is counted in part
+        start = max(year_from - self.year_min, 0)
+        stop = max(min(year_to - self.year_min + 1, self.counts.shape[2]), start)
+        window = self.counts[:, :, start:stop]
+        genre_mask = self._mask(self.genres, genres)
+        region_mask = self._mask(REGIONS, regions)
+
+        # Each facet ignores its own filter, so the other values stay selectable
+        genre_counts = window[:, region_mask].sum(axis=(1, 2))
+        region_counts = window[genre_mask].sum(axis=(0, 2))
+        year_counts = window[genre_mask][:, region_mask].sum(axis=(0, 1))
+
+        years = np.arange(start, stop) + self.year_min
+        period_starts = (years // granularity) * granularity
+        periods: Counter = Counter()
+        for period, count in zip(period_starts.tolist(), year_counts.tolist()):
+            if count:
+                periods[period] += count
+
+        return FacetsResponse(
+            granularity=granularity,
+            total=int(year_counts.sum()),
+            periods=[PeriodCount(period_start=p, count=c) for p, c in sorted(periods.items())],
+            genres=_facet_counts(self.genres, genre_counts),
+            regions=_facet_counts(REGIONS, region_counts),
+        )
+
+
+def _facet_counts(values: List[str], counts: np.ndarray) -> List[FacetCount]:
+    order = np.argsort(-counts, kind="stable")
+    return [FacetCount(value=values[i], count=int(counts[i])) for i in order if counts[i]]
+
+
+facet_index = FacetIndex()
+
+
+async def load_facet_index(db: AsyncSession):
+    # Version first: a write landing during the load triggers another reload
+    version = await read_stable_version(db)
+    rows = await facet_repo.get_facet_source_rows(db)
+    facet_index.build(rows, version)
+
+
+_reload_task: Optional[asyncio.Task] = None
+
+
+async def _reload_facet_index():
+    try:
+        while True:
+            async with AsyncSessionLocal() as db:
+                await load_facet_index(db)
+            if facet_index.version >= (catalog_version_state.version or 0):
+                return
+    except Exception as e:
+        print(f"Facet index refresh error: {e}")
+
+
+def _schedule_reload(previous: Optional[int], version: int):
+    global _reload_task
+    if previous is None:
+        return
+    if _reload_task is None or _reload_task.done():
+        _reload_task = asyncio.create_task(_reload_facet_index())
+
+
+on_version_change(_schedule_reload)
+
+
+async def get_facets(
+    db: AsyncSession,
+    granularity: int,
+    year_from: int,
+    year_to: int,
+    genres: Optional[List[str]] = None,
+    regions: Optional[List[str]] = None,
+) -> FacetsResponse:
+    """Counts per period, genre and region for the active filters (multi-select genres/regions)."""
+    if not facet_index.ready:
+        await load_facet_index(db)
+    return facet_index.query(granularity, year_from, year_to, genres, regions)
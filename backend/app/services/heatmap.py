@@ -0,0 +1,97 @@
+"""
+In-memory density rasters for the fully zoomed-out map.
+
+Nodes are binned into a year x vibe histogram for every genre family and
+region combination, kept as one NumPy array counts[genre, region, y, x].
+Any genre/region slice is a sum over that array, so requests never touch
+Postgres. Loading and refreshing is handled by services/map_indexes.py.
+"""
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from ..schemas import HeatmapResponse
+from .common import country_to_region, MAP_X_MIN, MAP_X_MAX, MAP_Y_MIN, MAP_Y_MAX
+from .clusters import REGIONS
+
+# One column per year, HEATMAP_HEIGHT vibe rows
+HEATMAP_WIDTH = int(MAP_X_MAX - MAP_X_MIN)
+HEATMAP_HEIGHT = 32
+
+
+class HeatmapIndex:
+    def __init__(self):
+        self.genres: List[str] = []
+        self.counts: Optional[np.ndarray] = None
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def build(self, rows):
+        n = len(rows)
+        genre_names = [r.primary_genre or "Unknown" for r in rows]
+        genres = sorted(set(genre_names))
+        genre_index = {g: i for i, g in enumerate(genres)}
+        region_index = {r: i for i, r in enumerate(REGIONS)}
+
+        g = np.fromiter((genre_index[name] for name in genre_names), dtype=np.int64, count=n)
+        region = np.fromiter(
+            (region_index[country_to_region(r.country_code)] for r in rows), dtype=np.int64, count=n
+        )
+        x = np.fromiter((r.x for r in rows), dtype=np.float64, count=n)
+        y = np.fromiter((r.y for r in rows), dtype=np.float64, count=n)
+
+        # Nodes outside the world bounds are clamped into the edge bins
+        bx = np.clip(((x - MAP_X_MIN) / (MAP_X_MAX - MAP_X_MIN) * HEATMAP_WIDTH).astype(np.int64), 0, HEATMAP_WIDTH - 1)
+        by = np.clip(((y - MAP_Y_MIN) / (MAP_Y_MAX - MAP_Y_MIN) * HEATMAP_HEIGHT).astype(np.int64), 0, HEATMAP_HEIGHT - 1)
+
+        shape = (len(genres), len(REGIONS), HEATMAP_HEIGHT, HEATMAP_WIDTH)
+        flat = np.ravel_multi_index((g, region, by, bx), shape)
+        counts = np.bincount(flat, minlength=int(np.prod(shape))).astype(np.uint32).reshape(shape)
+
+        self.genres = genres
+        self.counts = counts
+        self.loaded_at = time.time()
+
+    def raster(self, genre: Optional[str] = None, region: Optional[str] = None) -> Optional[np.ndarray]:
+        """(HEATMAP_HEIGHT, HEATMAP_WIDTH) counts, or None for an unknown genre/region."""
+        counts = self.counts
+        if genre is not None:
+            if genre not in self.genres:
+                return None
+            idx = self.genres.index(genre)
+            counts = counts[idx:idx + 1]
+        if region is not None:
+            if region not in REGIONS:
+                return None
+            idx = REGIONS.index(region)
+            counts = counts[:, idx:idx + 1]
+        return counts.sum(axis=(0, 1))
+
+
+heatmap_index = HeatmapIndex()
+
+
+def get_heatmap(genre: Optional[str] = None, region: Optional[str] = None) -> Optional[HeatmapResponse]:
+    """Heatmap from the in-memory index, or None if not loaded or unknown filter."""
+    if not heatmap_index.ready:
+        return None
+    raster = heatmap_index.raster(genre, region)
+    if raster is None:
+        return None
+    return HeatmapResponse(
+        genre=genre,
+        region=region,
+        x_min=MAP_X_MIN,
+        x_max=MAP_X_MAX,
+        y_min=MAP_Y_MIN,
+        y_max=MAP_Y_MAX,
+        width=HEATMAP_WIDTH,
+        height=HEATMAP_HEIGHT,
+        max=int(raster.max(initial=0)),
+        total=int(raster.sum()),
+        counts=raster.ravel().tolist(),
+    )
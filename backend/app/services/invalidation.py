@@ -0,0 +1,124 @@
+"""
+Cross-worker cache invalidation.
+
+Album summaries/details (in-process LRU, services/albums.py) and the tagged
+shared responses (services/response_cache.py) are not keyed by the catalog
+version, so an unrelated write does not empty them. Instead they are evicted
+by tag ("album:<id>", "creator:<id>", "artists", "album_details"):
+
+- Writers publish {"tags": [...]} (or {"all": true}) on the Redis channel
+  INVALIDATION_CHANNEL after committing. publish() evicts the shared Redis
+  entries itself, then every worker's invalidation_listener() evicts its
+  local entries and reloads the catalog version, so ETags move at once.
+- Writes to album_groups/map_nodes are also seen through the change log:
+  when the catalog version moves, the albums changed since the previous
+  version are evicted (reconcile_changes). This covers writers that do not
+  publish, at the cost of the version poll delay. Catalog-wide "refresh"
+  rows carry no album ids; the scripts that write them also publish.
+"""
+import asyncio
+import json
+from typing import List, Optional
+
+from redis.exceptions import RedisError
+
+from ..database import AsyncSessionLocal
+from ..repositories import catalog as catalog_repo
+from ..service_gemini import redis_client
+from . import albums as album_service
+from . import response_cache
+from .cache import album_tag
+from .catalog import CATALOG_WIDE_CHANGE, CHANGES_MAX_ALBUMS
+from .catalog_version import catalog_version_state, on_version_change
+
+INVALIDATION_CHANNEL = "catalog:invalidate"
+INVALIDATION_RECONNECT_SECONDS = 5
+
+
+def evict(tags: Optional[List[str]]) -> int:
+    """Evict local entries with any of the tags (everything if None)."""
+    return album_service.invalidate_album_caches(tags)
+
+
+async def evict_shared(tags: Optional[List[str]]) -> int:
+    if tags is None:
+        return await response_cache.evict_all_tagged()
+    return await response_cache.evict_tags(tags)
+
+
+async def publish(tags: Optional[List[str]] = None, everything: bool = False) -> bool:
+    """
+    Invalidate the given tags (or everything) in the shared cache and in all
+    API workers. Called by scripts after their commit. Returns False if Redis
+    was unreachable; the change log still catches album_groups writes.
+    """
+    if not tags and not everything:
+        return True
+    try:
+        await evict_shared(None if everything else tags)
+        message = {"all": True} if everything else {"tags": sorted(set(tags))}
+        await redis_client.publish(INVALIDATION_CHANNEL, json.dumps(message))
+        return True
+    except (RedisError, OSError) as e:
+        print(f"Cache invalidation publish failed: {e}")
+        return False
+
+
+async def _apply(message: dict):
+    tags = None if message.get("all") else list(message.get("tags") or [])
+    evict(tags)
+    # The writer committed before publishing, so the new version is readable now
+    async with AsyncSessionLocal() as db:
+        await catalog_version_state.refresh(db)
+
+
+async def invalidation_listener():
+    """Background task: apply invalidation messages published by other processes."""
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            async for raw in pubsub.listen():
+                if raw.get("type") != "message":
+                    continue
+                try:
+                    await _apply(json.loads(raw["data"]))
+                except (ValueError, TypeError) as e:
+                    print(f"Bad invalidation message {raw['data']!r}: {e}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Messages sent while disconnected are lost; the change log
+            # reconcile and the cache TTL bound the staleness
+            print(f"Invalidation listener error: {e}")
+        finally:
+            try:
+                await pubsub.close()
+            except Exception:
+                pass
+        await asyncio.sleep(INVALIDATION_RECONNECT_SECONDS)
+
+
+async def reconcile_changes(previous: Optional[int], version: int):
+    """Version listener: evict the albums changed in (previous, version]."""
+    if previous is None or version <= previous:
+        # First load, or the log was reset: nothing cached can be trusted
+        if previous is not None:
+            evict(None)
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            if await catalog_repo.count_changed_albums(db, previous) > CHANGES_MAX_ALBUMS:
+                evict(None)
+                await evict_shared(None)
+                return
+            changes = await catalog_repo.get_latest_changes(db, previous, version)
+        tags = [album_tag(c.album_group_id) for c in changes if c.album_group_id != CATALOG_WIDE_CHANGE]
+        if tags:
+            evict(tags)
+            await evict_shared(tags)
+    except Exception as e:
+        print(f"Cache reconcile error: {e}")
+
+
+on_version_change(reconcile_changes)
@@ -0,0 +1,33 @@
+"""
+JSON encoding for the hot list endpoints.
+
+Uses orjson when it is installed (several times faster than the standard
+library, with native date/datetime support) and falls back to json with the
+same compact output otherwise.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def json_default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, default=json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(body):
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
@@ -0,0 +1,160 @@
+"""
+Batch layout of map_nodes.
+
+Every album starts at (middle of its release year, genre vibe). The vibe is
+the per-album value the importers computed (map_nodes.vibe), so repeated
+layouts spread around the same point instead of drifting; albums without one
+fall back to their current y, then to the coarse genre_to_vibe.
+Albums are binned into cells of LAYOUT_CELL_YEARS x LAYOUT_CELL_VIBE and laid
+out inside their cell on a sunflower (Vogel) spiral, most popular first, so
+popular albums sit on the genre line and the tail fans out around them.
+The spiral keeps x within the release year and grows in y with the cell
+population; node size shrinks in dense cells so neighbours do not overlap.
+
+The layout is cell-local, so an incremental run only recomputes the cells
+that contain new or changed albums. It only moves existing map_nodes: which
+albums are on the map is decided by the importers that create the nodes.
+"""
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..repositories import maps as map_repo
+from .common import genre_to_vibe, MAP_Y_MIN, MAP_Y_MAX
+
+LAYOUT_CELL_YEARS = 1.0
+LAYOUT_CELL_VIBE = 0.05
+# Half-width of the spiral in years; keeps nodes inside their release year
+LAYOUT_X_RADIUS = 0.45
+# Vibe spread per sqrt(node) and its cap
+LAYOUT_Y_SPACING = 0.006
+LAYOUT_Y_MAX_RADIUS = 0.12
+# Cells above this population get smaller nodes
+LAYOUT_DENSE_CELL = 25
+LAYOUT_WRITE_BATCH = 1000
+
+_GOLDEN_ANGLE = np.pi * (3.0 - np.sqrt(5.0))
+
+
+def _unit_hash(album_ids: List[str]) -> np.ndarray:
+    """Deterministic per-album value in [0, 1) so re-runs are stable."""
+    return np.fromiter(
+        (zlib.crc32(a.encode("utf-8")) / 0x100000000 for a in album_ids),
+        dtype=np.float64,
+        count=len(album_ids),
+    )
+
+
+def _cell_keys(x0: np.ndarray, y0: np.ndarray) -> np.ndarray:
+    cx = np.floor(x0 / LAYOUT_CELL_YEARS).astype(np.int64)
+    cy = np.floor(y0 / LAYOUT_CELL_VIBE).astype(np.int64)
+    return (cx << 32) + cy
+
+
+def _base_vibe(r) -> float:
+    if r.vibe is not None:
+        return r.vibe
+    # Nodes written before map_nodes.vibe existed carry the importer's vibe in y
+    if r.y is not None:
+        return r.y
+    return genre_to_vibe(r.primary_genre)
+
+
+def base_positions(rows) -> Tuple[np.ndarray, np.ndarray]:
+    """Unspread (x, y) per album: middle of the release year, stored genre vibe."""
+    n = len(rows)
+    x = np.fromiter((r.original_year or 0 for r in rows), dtype=np.float64, count=n) + 0.5
+    y = np.fromiter((_base_vibe(r) for r in rows), dtype=np.float64, count=n)
+    return x, y
+
+
+def compute_layout(album_ids: List[str], x0: np.ndarray, y0: np.ndarray, popularity: np.ndarray):
+    """Return (x, y, size) arrays for the given albums."""
+    n = len(album_ids)
+    if n == 0:
+        empty = np.zeros(0)
+        return empty, empty, empty
+
+    _, cell, cell_size = np.unique(_cell_keys(x0, y0), return_inverse=True, return_counts=True)
+
+    # Rank inside the cell: most popular first, album id hash as tie-breaker
+    order = np.lexsort((_unit_hash(album_ids), -popularity, cell))
+    sorted_cells = cell[order]
+    starts = np.searchsorted(sorted_cells, sorted_cells, side="left")
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n) - starts
+
+    population = cell_size[cell]
+    radius = np.sqrt((rank + 0.5) / population)
+    angle = rank * _GOLDEN_ANGLE
+    y_radius = np.minimum(LAYOUT_Y_SPACING * np.sqrt(population), LAYOUT_Y_MAX_RADIUS)
+
+    # x stays inside the release year, y fans out around the genre line
+    x = x0 + radius * np.cos(angle) * LAYOUT_X_RADIUS
+    y = np.clip(y0 + radius * np.sin(angle) * y_radius, MAP_Y_MIN, MAP_Y_MAX)
+
+    density_scale = np.clip(np.sqrt(LAYOUT_DENSE_CELL / population), 0.5, 1.0)
+    size = (popularity * 10 + 2) * density_scale
+    return x, y, size
+
+
+async def layout_albums(
+    db: AsyncSession,
+    album_ids: Optional[List[str]] = None,
+    changed_only: bool = False,
+):
+    """
+    Lay out map_nodes and write them in bulk.
+
+    album_ids / changed_only select the dirty albums (changed_only picks albums
+    edited after their node was written); with neither, every node is laid
+    out. Albums without a node are left alone. Every album sharing a cell
+    with a dirty album is recomputed.
+    Returns (laid out album ids, previous (x, y) of moved nodes).
+    """
+    rows = await map_repo.get_layout_source_rows(db)
+    if not rows:
+        return [], []
+
+    ids = [r.album_group_id for r in rows]
+    x0, y0 = base_positions(rows)
+    popularity = np.fromiter((r.popularity or 0.0 for r in rows), dtype=np.float64, count=len(rows))
+
+    if album_ids is None and not changed_only:
+        selected = np.ones(len(rows), dtype=bool)
+    else:
+        dirty = np.zeros(len(rows), dtype=bool)
+        if album_ids is not None:
+            wanted = set(album_ids)
+            dirty |= np.fromiter((a in wanted for a in ids), dtype=bool, count=len(rows))
+        if changed_only:
+            dirty |= np.fromiter(
+                (
+                    r.node_updated_at is None or (r.updated_at is not None and r.updated_at > r.node_updated_at)
+                    for r in rows
+                ),
+                dtype=bool,
+                count=len(rows),
+            )
+        cell_key = _cell_keys(x0, y0)
+        selected = np.isin(cell_key, cell_key[dirty])
+
+    idx = np.flatnonzero(selected)
+    if idx.size == 0:
+        return [], []
+
+    sel_ids = [ids[i] for i in idx]
+    x, y, size = compute_layout(sel_ids, x0[idx], y0[idx], popularity[idx])
+
+    nodes = [
+        {"b_id": a, "b_x": float(nx), "b_y": float(ny), "b_size": float(ns), "b_vibe": float(nv)}
+        for a, nx, ny, ns, nv in zip(sel_ids, x, y, size, y0[idx])
+    ]
+    previous_points = [(rows[i].x, rows[i].y) for i in idx if rows[i].x is not None]
+
+    for i in range(0, len(nodes), LAYOUT_WRITE_BATCH):
+        await map_repo.update_map_node_layout(db, nodes[i:i + LAYOUT_WRITE_BATCH])
+    await db.commit()
+    return sel_ids, previous_points
@@ -0,0 +1,73 @@
+"""
+Popularity-weighted level of detail for map points.
+
+At zoom level z the map world is split into (LOD_GRID * 2^z)^2 screen cells
+and each cell shows its LOD_POINTS_PER_CELL most popular albums. Because
+cells halve with every zoom step, the number of visible albums grows with
+zoom while staying bounded per screen area. Anchor albums are always shown.
+
+Each node stores the first level at which it becomes visible
+(map_nodes.min_zoom), so /map/points only filters on min_zoom <= level.
+"""
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..repositories import maps as map_repo
+from .common import MAP_X_MIN, MAP_X_MAX, MAP_Y_MIN, MAP_Y_MAX
+
+LOD_MIN_ZOOM = 2
+LOD_MAX_ZOOM = 8
+LOD_GRID = 8
+LOD_POINTS_PER_CELL = 6
+LOD_WRITE_BATCH = 2000
+
+
+def lod_level(zoom: float) -> int:
+    return min(max(int(zoom), LOD_MIN_ZOOM), LOD_MAX_ZOOM)
+
+
+def compute_min_zoom(x: np.ndarray, y: np.ndarray, popularity: np.ndarray, is_anchor: np.ndarray) -> np.ndarray:
+    n = len(x)
+    # Everything is visible at the deepest level
+    min_zoom = np.full(n, LOD_MAX_ZOOM, dtype=np.int64)
+    if n == 0:
+        return min_zoom
+
+    nx = np.clip((x - MAP_X_MIN) / (MAP_X_MAX - MAP_X_MIN), 0.0, 0.999999)
+    ny = np.clip((y - MAP_Y_MIN) / (MAP_Y_MAX - MAP_Y_MIN), 0.0, 0.999999)
+
+    for z in range(LOD_MAX_ZOOM - 1, LOD_MIN_ZOOM - 1, -1):
+        cells = LOD_GRID << z
+        cell = (nx * cells).astype(np.int64) * cells + (ny * cells).astype(np.int64)
+        order = np.lexsort((-popularity, cell))
+        sorted_cells = cell[order]
+        rank = np.empty(n, dtype=np.int64)
+        rank[order] = np.arange(n) - np.searchsorted(sorted_cells, sorted_cells, side="left")
+        min_zoom = np.where(rank < LOD_POINTS_PER_CELL, z, min_zoom)
+
+    return np.where(is_anchor, LOD_MIN_ZOOM, min_zoom)
+
+
+async def refresh_lod(db: AsyncSession) -> int:
+    """Recompute map_nodes.min_zoom; only changed rows are written. Returns the update count."""
+    rows = await map_repo.get_lod_source_rows(db)
+    n = len(rows)
+    if n == 0:
+        return 0
+
+    min_zoom = compute_min_zoom(
+        np.fromiter((r.x for r in rows), dtype=np.float64, count=n),
+        np.fromiter((r.y for r in rows), dtype=np.float64, count=n),
+        np.fromiter((r.popularity or 0.0 for r in rows), dtype=np.float64, count=n),
+        np.fromiter((bool(r.is_anchor) for r in rows), dtype=bool, count=n),
+    )
+
+    updates = [
+        {"b_id": r.album_group_id, "b_min_zoom": int(z)}
+        for r, z in zip(rows, min_zoom)
+        if r.min_zoom != z
+    ]
+    for i in range(0, len(updates), LOD_WRITE_BATCH):
+        await map_repo.update_min_zoom(db, updates[i:i + LOD_WRITE_BATCH])
+    await db.commit()
+    return len(updates)
@@ -0,0 +1,67 @@
+"""
+Loading and refreshing of the in-process map indexes (clusters, heatmap).
+
+Both are built from the same map_nodes rows at startup and rebuilt when the
+catalog version moves and the map_nodes signature (row count, latest
+updated_at) changed, e.g. after an import script ran. The rebuild runs as a
+version listener, which completes before the new version is published, so a
+response carrying the new ETag is never built from the old indexes. If the
+rebuild fails the version is not published either, and the next poll tries
+again.
+
+map_index_state.version is the catalog version the indexes reflect; shared
+cache entries built from them are keyed on it.
+"""
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import AsyncSessionLocal
+from ..repositories import maps as map_repo
+from .catalog_version import on_version_change, read_stable_version
+from .clusters import cluster_index
+from .heatmap import heatmap_index
+
+
+class MapIndexState:
+    def __init__(self):
+        self.signature = None
+        # Catalog version the indexes reflect (None until loaded)
+        self.version: Optional[int] = None
+
+
+map_index_state = MapIndexState()
+
+
+async def load_map_indexes(db: AsyncSession):
+    # Version first: a write landing during the load is picked up by the next reload
+    version = await read_stable_version(db)
+    signature = await map_repo.get_map_nodes_signature(db)
+    rows = await map_repo.get_all_map_nodes(db)
+    cluster_index.build(rows)
+    heatmap_index.build(rows)
+    map_index_state.signature = signature
+    map_index_state.version = version
+
+
+async def refresh_map_indexes(db: AsyncSession, version: Optional[int] = None) -> bool:
+    """Reload the indexes if map_nodes changed since the last load."""
+    signature = await map_repo.get_map_nodes_signature(db)
+    if signature == map_index_state.signature and cluster_index.ready and heatmap_index.ready:
+        if version is not None:
+            map_index_state.version = version
+        return False
+    await load_map_indexes(db)
+    return True
+
+
+async def _on_version_change(previous: Optional[int], version: int):
+    # First load of the version: the startup load is current
+    if previous is None and cluster_index.ready and heatmap_index.ready:
+        return
+    # Errors propagate so the new version is not published over stale indexes
+    async with AsyncSessionLocal() as db:
+        await refresh_map_indexes(db, version)
+
+
+on_version_change(_on_version_change)
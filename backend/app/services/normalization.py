@@ -0,0 +1,75 @@
+"""
+Normalized text keys for matching titles and names regardless of case,
+accents and punctuation ("Björk" / "bjork", "AC/DC" / "ac dc").
+
+Hangul is decomposed into compatibility jamo, with compound vowels and
+final consonants split ("닭" -> "ㄷㅏㄹㄱ"), so a syllable that is still being
+typed is a prefix of the finished one ("다", "닭" and "달ㄱ" all match).
+choseong_key keeps only the initial consonants ("방탄소년단" -> "ㅂㅌㅅㄴㄷ")
+for searches by initials.
+
+The keys are persisted on album_groups and creators (models.py) and used by
+/search, /search/suggest, artist lookup and the matching scripts, so any
+change here needs a key refresh (refresh_derived_data) to stay consistent.
+"""
+import re
+import unicodedata
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+# Hangul syllable = 0xAC00 + (initial * 21 + medial) * 28 + final
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+_INITIALS = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_MEDIALS = [
+    "ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ",
+    "ㅗㅣ", "ㅛ", "ㅜ", "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ",
+]
+_FINALS = [
+    "", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+    "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ",
+]
+# Compound compatibility jamo typed on their own
+_COMPOUND_JAMO = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ", "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ",
+    "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+}
+_JAMO_FIRST, _JAMO_LAST = 0x3131, 0x318E
+
+
+def _is_syllable(c: str) -> bool:
+    return _HANGUL_FIRST <= ord(c) <= _HANGUL_LAST
+
+
+def _fold_char(c: str) -> str:
+    code = ord(c)
+    if _HANGUL_FIRST <= code <= _HANGUL_LAST:
+        index = code - _HANGUL_FIRST
+        return _INITIALS[index // 588] + _MEDIALS[(index % 588) // 28] + _FINALS[index % 28]
+    if _JAMO_FIRST <= code <= _JAMO_LAST:
+        # NFKD would turn compatibility jamo into conjoining jamo
+        return _COMPOUND_JAMO.get(c, c)
+    if code < 0x80:
+        return c
+    # Strip accents: decompose and drop combining marks
+    return "".join(d for d in unicodedata.normalize("NFKD", c) if not unicodedata.combining(d))
+
+
+def normalize_key(text: str) -> str:
+    if not text:
+        return ""
+    folded = "".join(_fold_char(c) for c in text).casefold()
+    return _NON_WORD.sub(" ", folded).strip()
+
+
+def choseong_key(text: str) -> str:
+    """Initial consonants of the Hangul syllables in text ("" if there are none)."""
+    if not text:
+        return ""
+    return "".join(_INITIALS[(ord(c) - _HANGUL_FIRST) // 588] for c in text if _is_syllable(c))
+
+
+def is_choseong_query(q: str) -> bool:
+    """True for input made only of initial consonants, e.g. "ㅂㅌㅅ"."""
+    letters = q.replace(" ", "")
+    return bool(letters) and all(c in _INITIALS for c in letters)
@@ -0,0 +1,41 @@
+"""
+Opaque keyset cursors for list endpoints.
+
+A cursor encodes the sort key of the last row of a page, here
+(created_at, album_group_id) for /albums. The next page starts strictly
+after that key, so every page costs one index range scan regardless of
+how deep the client has paged, unlike OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+# Maximum page size for /albums. It is also the default, as before cursors
+# existed: clients that never pass limit still get the whole catalog
+ALBUMS_PAGE_MAX = 50000
+ALBUMS_PAGE_SIZE = ALBUMS_PAGE_MAX
+
+AlbumCursor = Tuple[datetime, str]
+
+
+def encode_album_cursor(created_at: Optional[datetime], album_id: str) -> str:
+    raw = json.dumps([created_at.isoformat() if created_at else None, album_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_album_cursor(cursor: str) -> AlbumCursor:
+    """Raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, album_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(album_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def next_album_cursor(last_row, limit: int, count: int) -> Optional[str]:
+    """Cursor for the page after last_row (an album row), None on the last page."""
+    if last_row is None or count < limit:
+        return None
+    return encode_album_cursor(last_row.created_at, last_row.album_group_id)
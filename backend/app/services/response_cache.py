@@ -0,0 +1,282 @@
+"""
+Shared Redis cache for public GET responses, with single-flight protection.
+
+Each worker process has its own in-memory caches, so a cold popular album
+would otherwise be computed by every worker at once. Entries are the final
+JSON body of the response, stored in Redis under the catalog version so a
+catalog change never serves stale data:
+
+  resp:<version>:<key>        JSON body, RESPONSE_CACHE_TTL_SECONDS
+  resp-lock:<version>:<key>   held by the one request computing a missing body
+
+Entries about one album or creator are stored unversioned and tagged instead
+(resp:t:<key>, with the keys of each tag in the set resp-tag:<tag>), so a
+change evicts only the affected entries (services/invalidation.py) instead
+of the whole cache turning over with every catalog version.
+
+A body computed before an eviction must not be stored after it. Every
+eviction takes the next number of the resp-evict-seq counter and records it
+as the generation of its tags (resp-gen:<tag>, or resp-gen-all for
+evict_all_tagged). A request reads the counter before computing, and the
+store is a Lua check-and-set that is skipped if any of the body's tags was
+evicted since then.
+
+Hot entries can also be kept in a process-local LRU (get_or_compute(local=)),
+checked before Redis, so repeat requests in a worker skip the round-trip. A
+local entry carries the same tags, is evicted by the invalidation listener of
+its worker, and is not stored if one of its tags was evicted while it was
+being fetched (LRUCache.set(started_at=)).
+
+Requests for the same key inside one worker share a single in-flight future.
+Across workers, only the request that wins the SET NX lock computes the
+body; the others poll for it until RESPONSE_CACHE_WAIT_SECONDS and then
+compute it themselves. Redis is best effort: when it is unavailable
+responses are computed directly.
+
+Reuses the redis_client from service_gemini.py.
+"""
+import asyncio
+import secrets
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from fastapi.encoders import jsonable_encoder
+from redis.exceptions import RedisError
+
+from ..service_gemini import redis_client
+from . import json_encoding
+from .cache import MISSING, LRUCache
+
+RESPONSE_CACHE_TTL_SECONDS = 600
+RESPONSE_CACHE_LOCK_MS = 10_000
+RESPONSE_CACHE_WAIT_SECONDS = 5.0
+RESPONSE_CACHE_POLL_SECONDS = 0.05
+
+# Deletes the lock only if this request still owns it
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+_inflight: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+
+# Stores a tagged body unless one of its tags was evicted after the compute started.
+# KEYS: cache key, then n generation keys, then the n-1 tag set keys
+# (the first generation key, resp-gen-all, has no tag set).
+# ARGV: eviction sequence read before computing, body, TTL, n
+_STORE_IF_CURRENT = """
+local n = tonumber(ARGV[4])
+local started = tonumber(ARGV[1])
+for i = 2, n + 1 do
+    local generation = redis.call("get", KEYS[i])
+    if generation and tonumber(generation) > started then
+        return 0
+    end
+end
+redis.call("set", KEYS[1], ARGV[2], "EX", ARGV[3])
+for i = n + 2, #KEYS do
+    redis.call("sadd", KEYS[i], KEYS[1])
+    redis.call("expire", KEYS[i], ARGV[3])
+end
+return 1
+"""
+
+EVICTION_SEQUENCE_KEY = "resp-evict-seq"
+ALL_TAGS_GENERATION_KEY = "resp-gen-all"
+
+stats = {
+    "local_hits": 0, "hits": 0, "misses": 0, "coalesced": 0, "waited": 0, "errors": 0, "stale_skips": 0,
+}
+
+
+def _encode(data: Any) -> str:
+    return json_encoding.dumps({"data": data, "meta": None}).decode("utf-8")
+
+
+async def _release(lock_key: str, token: str):
+    try:
+        await redis_client.eval(_RELEASE_LOCK, 1, lock_key, token)
+    except (RedisError, OSError):
+        pass
+
+
+async def _compute(compute: Callable[[], Awaitable[Any]]) -> Optional[str]:
+    payload = await compute()
+    return None if payload is None else _encode(jsonable_encoder(payload))
+
+
+# A tag list, or a function of the payload's JSON form ("data" of the body)
+Tags = Union[None, List[str], Callable[[Any], List[str]]]
+
+
+def _tag_list(tags: Tags, data: Any) -> Optional[List[str]]:
+    return tags(data) if callable(tags) else tags
+
+
+async def _eviction_sequence() -> int:
+    return int(await redis_client.get(EVICTION_SEQUENCE_KEY) or 0)
+
+
+async def _store(cache_key: str, body: str, tags: Optional[List[str]], started: int):
+    """Store body; tagged bodies only if none of their tags was evicted after started."""
+    if tags is None:
+        await redis_client.set(cache_key, body, ex=RESPONSE_CACHE_TTL_SECONDS)
+        return
+    generation_keys = [ALL_TAGS_GENERATION_KEY] + [f"resp-gen:{tag}" for tag in tags]
+    tag_keys = [f"resp-tag:{tag}" for tag in tags]
+    keys = [cache_key, *generation_keys, *tag_keys]
+    stored = await redis_client.eval(
+        _STORE_IF_CURRENT, len(keys), *keys, started, body, RESPONSE_CACHE_TTL_SECONDS, len(generation_keys)
+    )
+    if not stored:
+        stats["stale_skips"] += 1
+
+
+async def _mark_evicted(generation_keys: List[str]):
+    """Record a new generation for the keys before their entries are deleted."""
+    sequence = await redis_client.incr(EVICTION_SEQUENCE_KEY)
+    pipe = redis_client.pipeline(transaction=False)
+    for key in generation_keys:
+        # Only needs to outlive the computes started before the eviction
+        pipe.set(key, sequence, ex=RESPONSE_CACHE_TTL_SECONDS)
+    await pipe.execute()
+
+
+async def evict_tags(tags: List[str]) -> int:
+    """Delete the tagged entries. Returns the number of entries removed."""
+    if not tags:
+        return 0
+    await _mark_evicted([f"resp-gen:{tag}" for tag in tags])
+    tag_keys = [f"resp-tag:{tag}" for tag in tags]
+    pipe = redis_client.pipeline(transaction=False)
+    for tag_key in tag_keys:
+        pipe.smembers(tag_key)
+    members = set().union(*await pipe.execute())
+    if members:
+        await redis_client.delete(*members)
+    await redis_client.delete(*tag_keys)
+    return len(members)
+
+
+async def evict_all_tagged() -> int:
+    await _mark_evicted([ALL_TAGS_GENERATION_KEY])
+    removed = 0
+    for pattern in ("resp:t:*", "resp-tag:*"):
+        batch = []
+        async for key in redis_client.scan_iter(match=pattern, count=1000):
+            batch.append(key)
+            if len(batch) >= 1000:
+                removed += await redis_client.delete(*batch)
+                batch = []
+        if batch:
+            removed += await redis_client.delete(*batch)
+    return removed
+
+
+async def _fetch_shared(
+    cache_key: str, lock_key: str, compute: Callable[[], Awaitable[Any]], tags: Tags = None
+) -> Optional[str]:
+    try:
+        body = await redis_client.get(cache_key)
+        if body is not None:
+            stats["hits"] += 1
+            return body
+        stats["misses"] += 1
+        # Before computing: evictions after this make the body stale
+        started = await _eviction_sequence() if tags is not None else 0
+
+        token = secrets.token_hex(8)
+        deadline = time.monotonic() + RESPONSE_CACHE_WAIT_SECONDS
+        while not await redis_client.set(lock_key, token, nx=True, px=RESPONSE_CACHE_LOCK_MS):
+            # Another worker is computing it
+            await asyncio.sleep(RESPONSE_CACHE_POLL_SECONDS)
+            body = await redis_client.get(cache_key)
+            if body is not None:
+                stats["waited"] += 1
+                return body
+            if time.monotonic() > deadline:
+                return await _compute(compute)
+    except (RedisError, OSError):
+        stats["errors"] += 1
+        return await _compute(compute)
+
+    try:
+        payload = await compute()
+        # Missing entities (404) are not cached
+        if payload is None:
+            return None
+        data = jsonable_encoder(payload)
+        body = _encode(data)
+        try:
+            await _store(cache_key, body, _tag_list(tags, data), started)
+        except (RedisError, OSError):
+            stats["errors"] += 1
+        return body
+    finally:
+        await _release(lock_key, token)
+
+
+async def get_or_compute(
+    key: str,
+    version: int,
+    compute: Callable[[], Awaitable[Any]],
+    tags: Tags = None,
+    local: Optional[LRUCache] = None,
+) -> Optional[str]:
+    """
+    JSON body ({"data": ..., "meta": null}) for key, or None when compute()
+    returns None. Untagged entries are scoped to the catalog version; tagged
+    ones (a list, or a function of the payload's JSON form) live until their
+    tags are evicted or the TTL expires. local is checked first and filled
+    from Redis or compute().
+    """
+    scope = "t" if tags is not None else str(version)
+    cache_key = f"resp:{scope}:{key}"
+    if local is None:
+        return await _get_shared(cache_key, scope, key, compute, tags)
+
+    body = local.get(cache_key)
+    if body is not MISSING:
+        stats["local_hits"] += 1
+        return body
+    started_at = time.monotonic()
+    body = await _get_shared(cache_key, scope, key, compute, tags)
+    if body is not None:
+        # Redis hits carry no tags; they are read back from the body
+        local_tags = _tag_list(tags, json_encoding.loads(body)["data"]) if callable(tags) else tags
+        local.set(cache_key, body, local_tags or (), started_at)
+    return body
+
+
+async def _get_shared(
+    cache_key: str, scope: str, key: str, compute: Callable[[], Awaitable[Any]], tags: Tags
+) -> Optional[str]:
+    inflight = _inflight.get(cache_key)
+    if inflight is not None:
+        stats["coalesced"] += 1
+        try:
+            return await asyncio.shield(inflight)
+        except asyncio.CancelledError:
+            if not inflight.cancelled():
+                raise
+            # The computing request was cancelled (client went away)
+            return await _compute(compute)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[cache_key] = future
+    try:
+        body = await _fetch_shared(cache_key, f"resp-lock:{scope}:{key}", compute, tags)
+        future.set_result(body)
+        return body
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark retrieved so an unobserved failure is not logged as never retrieved
+        future.exception()
+        raise
+    finally:
+        del _inflight[cache_key]
@@ -0,0 +1,84 @@
+"""
+Unified search over albums, artists and tracks, and the normalized matching
+keys (services/normalization.py) of album_groups and creators it relies on.
+
+search_all runs one query per request: each type is matched through its own
+indexes and scored as (prefix match + relevance) x (1 + popularity) x type
+weight, so results of all types merge into one ranking. On equal matches an
+artist ranks above its albums, and an album above its tracks.
+
+ORM writes set the keys through the models.set_name_keys hooks;
+refresh_name_keys catches up rows written with Core statements or before
+the columns existed and runs as part of refresh_derived_data.
+"""
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AlbumGroup, Creator, NAME_KEY_COLUMNS
+from ..repositories import search as search_repo
+from ..schemas import SearchResultResponse
+from .common import FUZZY_NAME_THRESHOLD, FUZZY_TITLE_THRESHOLD
+from .normalization import choseong_key, normalize_key
+
+SEARCH_TYPE_WEIGHTS = {"artist": 1.0, "album": 0.9, "track": 0.8}
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+
+NAME_KEY_WRITE_BATCH = 2000
+
+
+async def refresh_name_keys(db: AsyncSession) -> int:
+    """Recompute the keys; only changed rows are written. Returns the update count."""
+    total = 0
+    for model, id_column in ((AlbumGroup, "album_group_id"), (Creator, "creator_id")):
+        specs = NAME_KEY_COLUMNS[model.__tablename__]
+        columns = [c for spec in specs for c in spec]
+        rows = await search_repo.get_name_key_rows(db, model, id_column, columns)
+
+        updates = []
+        for r in rows:
+            values = {}
+            for source, key, initials in specs:
+                name = getattr(r, source)
+                values[key] = normalize_key(name) or None
+                values[initials] = choseong_key(name) or None
+            if any(getattr(r, column) != value for column, value in values.items()):
+                updates.append({"b_id": getattr(r, id_column), **values})
+
+        for i in range(0, len(updates), NAME_KEY_WRITE_BATCH):
+            await search_repo.update_name_keys(db, model, id_column, updates[i:i + NAME_KEY_WRITE_BATCH])
+        total += len(updates)
+    await db.commit()
+    return total
+
+
+def parse_search_types(types: Optional[str]) -> List[str]:
+    """Comma separated result types -> list (None = all). Raises ValueError on unknown names."""
+    if types is None:
+        return list(SEARCH_TYPE_WEIGHTS)
+    names = list(dict.fromkeys(t.strip() for t in types.split(",") if t.strip()))
+    unknown = [t for t in names if t not in SEARCH_TYPE_WEIGHTS]
+    if unknown:
+        raise ValueError(f"Unknown types: {', '.join(unknown)}")
+    if not names:
+        raise ValueError("types must name at least one type")
+    return names
+
+
+async def search_all(
+    db: AsyncSession, q: str, limit: int = SEARCH_LIMIT, types: Optional[List[str]] = None
+) -> List[SearchResultResponse]:
+    q = q.strip()
+    if not q:
+        return []
+    weights = {t: SEARCH_TYPE_WEIGHTS[t] for t in (types or SEARCH_TYPE_WEIGHTS)}
+    rows = await search_repo.get_search_result_rows(
+        db, q, limit, weights, name_threshold=FUZZY_NAME_THRESHOLD, title_threshold=FUZZY_TITLE_THRESHOLD
+    )
+    return [
+        SearchResultResponse(
+            type=r.type, id=r.id, label=r.label, sublabel=r.sublabel, album_id=r.album_id, score=float(r.score)
+        )
+        for r in rows
+    ]
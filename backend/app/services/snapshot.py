@@ -0,0 +1,141 @@
+"""
+Prebuilt, precompressed catalog snapshot.
+
+The frontend loads the whole catalog on startup. Instead of running the
+/albums query for every visit, refresh_derived_data (and the cover and date
+scripts, which do not run it) writes the same payload
+({"data": [...], "meta": {"catalog_version": v}}) once per catalog version as
+gzip and brotli files, plus a small manifest:
+
+  CATALOG_SNAPSHOT_DIR/catalog-<version>.json.gz
+  CATALOG_SNAPSHOT_DIR/catalog-<version>.json.br
+  CATALOG_SNAPSHOT_DIR/manifest.json   {"version", "etag", "built_at", "files"}
+
+/catalog/snapshot serves the file matching Accept-Encoding with a strong ETag
+(content hash plus the encoding, since a strong validator names exact bytes),
+so revalidations are answered with 304 without touching
+Postgres. Clients apply /catalog/changes?since=<version> for anything newer,
+so a snapshot that lags behind a script write is still caught up.
+"""
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..repositories import albums as album_repo
+from .catalog_version import read_stable_version
+from .albums import album_row_dict
+from . import json_encoding
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always written
+    brotli = None
+
+CATALOG_SNAPSHOT_DIR = os.getenv("CATALOG_SNAPSHOT_DIR", "/app/snapshots")
+SNAPSHOT_MANIFEST = "manifest.json"
+# Older snapshot files are kept so in-flight downloads of the previous version finish
+SNAPSHOT_KEEP_VERSIONS = 2
+
+_manifest_cache = {"mtime": None, "manifest": None}
+
+
+def _write_atomic(path: str, body: bytes):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, path)
+
+
+def _prune_snapshots(keep_versions):
+    keep = {f"catalog-{v}." for v in keep_versions}
+    for name in os.listdir(CATALOG_SNAPSHOT_DIR):
+        if name.startswith("catalog-") and not any(name.startswith(k) for k in keep):
+            os.remove(os.path.join(CATALOG_SNAPSHOT_DIR, name))
+
+
+async def build_catalog_snapshot(db: AsyncSession) -> dict:
+    """Write the snapshot for the current catalog version. Returns the manifest."""
+    # Stable version first: the snapshot may then include newer rows, never miss any
+    version = await read_stable_version(db)
+    previous = read_manifest()
+
+    rows = await album_repo.get_all_album_rows(db, None, 0)
+    payload = {"data": [album_row_dict(r) for r in rows], "meta": {"catalog_version": version}}
+    body = json_encoding.dumps(payload)
+
+    os.makedirs(CATALOG_SNAPSHOT_DIR, exist_ok=True)
+    files = {}
+    name = f"catalog-{version}.json.gz"
+    _write_atomic(os.path.join(CATALOG_SNAPSHOT_DIR, name), gzip.compress(body, compresslevel=9, mtime=0))
+    files["gzip"] = name
+    if brotli is not None:
+        name = f"catalog-{version}.json.br"
+        _write_atomic(os.path.join(CATALOG_SNAPSHOT_DIR, name), brotli.compress(body, quality=11))
+        files["br"] = name
+
+    manifest = {
+        "version": version,
+        "etag": f'"catalog-{version}-{hashlib.sha256(body).hexdigest()[:20]}"',
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "albums": len(payload["data"]),
+        "size": len(body),
+        "files": files,
+    }
+    _write_atomic(
+        os.path.join(CATALOG_SNAPSHOT_DIR, SNAPSHOT_MANIFEST),
+        json.dumps(manifest, indent=2).encode("utf-8"),
+    )
+
+    keep_versions = [version]
+    if previous and previous["version"] != version:
+        keep_versions.append(previous["version"])
+    _prune_snapshots(keep_versions[:SNAPSHOT_KEEP_VERSIONS])
+    return manifest
+
+
+def read_manifest() -> Optional[dict]:
+    """Current manifest, re-read only when the file changed; None if no snapshot was built."""
+    path = os.path.join(CATALOG_SNAPSHOT_DIR, SNAPSHOT_MANIFEST)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _manifest_cache["mtime"] != mtime:
+        with open(path, "rb") as f:
+            _manifest_cache["manifest"] = json.load(f)
+        _manifest_cache["mtime"] = mtime
+    return _manifest_cache["manifest"]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in [t.strip() for t in if_none_match.split(",")]
+
+
+def accepts_encoding(accept_encoding: Optional[str], encoding: str) -> bool:
+    if not accept_encoding:
+        return False
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() in (encoding, "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def snapshot_etag(manifest: dict, encoding: Optional[str]) -> str:
+    """Strong ETag of one representation: "br", "gzip", or None for the uncompressed body."""
+    if encoding is None:
+        return manifest["etag"]
+    return f'{manifest["etag"][:-1]}-{encoding}"'
+
+
+def snapshot_path(manifest: dict, encoding: str) -> str:
+    return os.path.join(CATALOG_SNAPSHOT_DIR, manifest["files"][encoding])
@@ -0,0 +1,50 @@
+"""
+NDJSON streaming for large list endpoints.
+
+Each generator opens its own session: dependencies with yield are torn down
+before a StreamingResponse body is sent, so the request's get_db session
+cannot back a server-side cursor.
+"""
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+
+from ..database import AsyncSessionLocal
+from .json_encoding import dumps
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def accepts_ndjson(accept: Optional[str]) -> bool:
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+
+def ndjson_lines(items: Iterable[dict]) -> bytes:
+    return b"".join(dumps(item) + b"\n" for item in items)
+
+
+async def stream_ndjson(
+    open_stream: Callable[..., Any],
+    to_dict: Callable[[Any], dict],
+    *args,
+    meta: Optional[Callable[[Any, int], dict]] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Run open_stream(db, *args) (a repository stream_* function) on a fresh
+    session and emit one chunk of NDJSON per fetched partition.
+
+    meta(last row or None, row count), if given, is sent as a final
+    {"meta": ...} line, the NDJSON counterpart of APIResponse.meta.
+    """
+    last, count = None, 0
+    async with AsyncSessionLocal() as db:
+        result = await open_stream(db, *args)
+        async for partition in result.partitions():
+            if partition:
+                last, count = partition[-1], count + len(partition)
+            yield ndjson_lines(to_dict(row) for row in partition)
+    if meta is not None:
+        yield ndjson_lines([{"meta": meta(last, count)}])
+
+
+async def iter_ndjson(items: Iterable[dict]) -> AsyncIterator[bytes]:
+    """Stream an already computed (small) list, e.g. clusters."""
+    yield ndjson_lines(items)
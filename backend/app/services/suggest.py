@@ -0,0 +1,205 @@
+"""
+In-process prefix index for /search/suggest.
+
+Album titles and creator names are normalized (services/normalization.py)
+and indexed once per word start, so "moon" finds "The Dark Side of the
+Moon", and Hangul names also by their initials ("ㅂㅌ" finds "방탄소년단").
+Keys live in one sorted list: a prefix is a bisect range, and the
+most popular entries in that range are picked with a NumPy partial sort, so
+a keystroke never touches Postgres and costs well under a millisecond.
+
+The index is loaded at startup and patched from the catalog change log when
+the catalog version moves: changed albums are reloaded, deleted ones
+dropped, and creators reloaded on catalog-wide "refresh" changes (creator
+and credit imports). The sorted arrays are rebuilt in a worker thread and
+swapped in whole, so queries always see a consistent index.
+"""
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import AsyncSessionLocal
+from ..repositories import catalog as catalog_repo
+from ..repositories import search as search_repo
+from ..schemas import SuggestionResponse
+from .catalog import CATALOG_WIDE_CHANGE, CHANGES_MAX_ALBUMS
+from .catalog_version import on_version_change, read_stable_version
+from .normalization import choseong_key, is_choseong_query, normalize_key
+
+SUGGEST_LIMIT = 10
+SUGGEST_MAX_LIMIT = 50
+# Word starts indexed per name; later words are rarely typed first
+SUGGEST_MAX_WORDS = 8
+
+
+class Suggestion(NamedTuple):
+    type: str
+    id: str
+    label: str
+    sublabel: Optional[str]
+    popularity: float
+
+
+EntryKey = Tuple[str, str]  # (type, id)
+
+
+def _word_start_keys(label: str) -> List[str]:
+    words = normalize_key(label).split()[:SUGGEST_MAX_WORDS]
+    keys = [" ".join(words[i:]) for i in range(len(words))]
+    # Hangul initials per word start, without spaces ("방탄 소년단" -> "ㅂㅌㅅㄴㄷ", "ㅅㄴㄷ")
+    initials = [choseong_key(w) for w in label.split()[:SUGGEST_MAX_WORDS]]
+    keys.extend({"".join(initials[i:]) for i in range(len(initials)) if initials[i]})
+    return keys
+
+
+class _Arrays:
+    """Immutable sorted view of the entries."""
+
+    def __init__(self, entries: List[Suggestion]):
+        pairs = sorted(
+            (key, i) for i, entry in enumerate(entries) for key in _word_start_keys(entry.label)
+        )
+        self.entries = entries
+        self.keys = [key for key, _ in pairs]
+        self.entry_index = np.fromiter((i for _, i in pairs), dtype=np.int64, count=len(pairs))
+        popularity = np.fromiter((e.popularity for e in entries), dtype=np.float64, count=len(entries))
+        self.popularity = popularity[self.entry_index]
+
+
+class SuggestIndex:
+    def __init__(self):
+        self.entries: Dict[EntryKey, Suggestion] = {}
+        self._arrays = _Arrays([])
+        # Catalog version the entries reflect
+        self.version: Optional[int] = None
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def __len__(self) -> int:
+        return len(self._arrays.keys)
+
+    async def rebuild(self):
+        entries = list(self.entries.values())
+        self._arrays = await asyncio.to_thread(_Arrays, entries)
+        self.loaded_at = time.time()
+
+    def set_albums(self, rows):
+        for r in rows:
+            self.entries[("album", r.album_group_id)] = Suggestion(
+                "album", r.album_group_id, r.title, r.primary_artist_display, float(r.popularity or 0.0)
+            )
+
+    def set_creators(self, rows):
+        self.entries = {k: e for k, e in self.entries.items() if k[0] != "artist"}
+        for r in rows:
+            self.entries[("artist", r.creator_id)] = Suggestion(
+                "artist", r.creator_id, r.display_name, None, float(r.popularity or 0.0)
+            )
+
+    def remove_albums(self, album_ids: List[str]):
+        for album_id in album_ids:
+            self.entries.pop(("album", album_id), None)
+
+    def query(self, q: str, limit: int = SUGGEST_LIMIT) -> List[Suggestion]:
+        prefix = q.replace(" ", "") if is_choseong_query(q) else normalize_key(q)
+        if not prefix:
+            return []
+        arrays = self._arrays
+        lo = bisect_left(arrays.keys, prefix)
+        hi = bisect_left(arrays.keys, prefix + "\U0010ffff", lo)
+        if lo == hi:
+            return []
+
+        # An entry can match through several word starts; over-fetch, then dedupe
+        popularity = arrays.popularity[lo:hi]
+        take = min(len(popularity), limit * 4)
+        top = np.argpartition(-popularity, take - 1)[:take] if take < len(popularity) else np.arange(len(popularity))
+        top = top[np.argsort(-popularity[top], kind="stable")]
+
+        seen = set()
+        results = []
+        for i in arrays.entry_index[lo + top]:
+            if i in seen:
+                continue
+            seen.add(i)
+            results.append(arrays.entries[i])
+            if len(results) == limit:
+                break
+        return results
+
+
+suggest_index = SuggestIndex()
+
+
+async def load_suggest_index(db: AsyncSession):
+    # Version first: a write landing during the load is applied again later
+    suggest_index.version = await read_stable_version(db)
+    suggest_index.entries = {}
+    suggest_index.set_albums(await search_repo.get_suggest_album_rows(db))
+    suggest_index.set_creators(await search_repo.get_suggest_creator_rows(db))
+    await suggest_index.rebuild()
+
+
+async def apply_catalog_changes(db: AsyncSession, until: int):
+    """Patch the index with the changes after its version, up to until."""
+    since = suggest_index.version
+    if until <= since:
+        return
+    oldest, _ = await catalog_repo.get_change_bounds(db)
+    # Changes already pruned, or too many to patch
+    if oldest is None or since < oldest - 1 or await catalog_repo.count_changed_albums(db, since) > CHANGES_MAX_ALBUMS:
+        await load_suggest_index(db)
+        return
+    changes = await catalog_repo.get_latest_changes(db, since, until)
+    album_ids = [c.album_group_id for c in changes if c.album_group_id != CATALOG_WIDE_CHANGE]
+    if album_ids:
+        rows = await search_repo.get_suggest_album_rows(db, album_ids)
+        # Deleted albums, and albums without a map node, are not suggested
+        suggest_index.remove_albums(album_ids)
+        suggest_index.set_albums(rows)
+    if any(c.album_group_id == CATALOG_WIDE_CHANGE for c in changes):
+        suggest_index.set_creators(await search_repo.get_suggest_creator_rows(db))
+    suggest_index.version = until
+    await suggest_index.rebuild()
+
+
+# Updates run one at a time, in version order
+_update_lock = asyncio.Lock()
+
+
+async def _update(version: int):
+    async with _update_lock:
+        try:
+            async with AsyncSessionLocal() as db:
+                if version < suggest_index.version:
+                    # The change log was reset
+                    await load_suggest_index(db)
+                else:
+                    await apply_catalog_changes(db, version)
+        except Exception as e:
+            print(f"Suggest index update error: {e}")
+
+
+def _on_version_change(previous: Optional[int], version: int):
+    # Not loaded yet: the first load reads the current state anyway
+    if suggest_index.ready:
+        asyncio.create_task(_update(version))
+
+
+on_version_change(_on_version_change)
+
+
+async def suggest(q: str, limit: int = SUGGEST_LIMIT) -> List[SuggestionResponse]:
+    if not suggest_index.ready:
+        async with _update_lock:
+            if not suggest_index.ready:
+                async with AsyncSessionLocal() as db:
+                    await load_suggest_index(db)
+    return [SuggestionResponse(**s._asdict()) for s in suggest_index.query(q, limit)]
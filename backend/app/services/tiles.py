@@ -0,0 +1,186 @@
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..repositories import maps as map_repo
+from .common import country_to_region, MAP_X_MIN, MAP_X_MAX, MAP_Y_MIN, MAP_Y_MAX
+
+
+# Quadtree pyramid: zoom z has 2^z x 2^z tiles over the map world bounds.
+TILE_MAX_ZOOM = 7
+# Tiles with more points than this are aggregated into a TILE_GRID x TILE_GRID grid.
+TILE_POINT_LIMIT = 256
+TILE_GRID = 8
+# Above this many touched albums an incremental refresh costs more than a full rebuild.
+TILE_INCREMENTAL_LIMIT = 2000
+TILE_WRITE_BATCH = 500
+
+TileKey = Tuple[int, int, int]
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    if z < 0 or z > TILE_MAX_ZOOM:
+        return False
+    n = 1 << z
+    return 0 <= x < n and 0 <= y < n
+
+
+def _normalize(x: float, y: float) -> Tuple[float, float]:
+    nx = (x - MAP_X_MIN) / (MAP_X_MAX - MAP_X_MIN)
+    ny = (y - MAP_Y_MIN) / (MAP_Y_MAX - MAP_Y_MIN)
+    # Clamp outliers (e.g. albums without a year) into the edge tiles
+    return min(max(nx, 0.0), 0.999999), min(max(ny, 0.0), 0.999999)
+
+
+def tile_for_point(z: int, x: float, y: float) -> TileKey:
+    nx, ny = _normalize(x, y)
+    n = 1 << z
+    return z, int(nx * n), int(ny * n)
+
+
+def tile_keys_for_points(points: Iterable[Tuple[float, float]]) -> Set[TileKey]:
+    keys: Set[TileKey] = set()
+    for x, y in points:
+        for z in range(TILE_MAX_ZOOM + 1):
+            keys.add(tile_for_point(z, x, y))
+    return keys
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """Return (x1, x2, y1, y2) in map coordinates for a tile."""
+    n = 1 << z
+    span_x = (MAP_X_MAX - MAP_X_MIN) / n
+    span_y = (MAP_Y_MAX - MAP_Y_MIN) / n
+    x1 = MAP_X_MIN + x * span_x
+    y1 = MAP_Y_MIN + y * span_y
+    return x1, x1 + span_x, y1, y1 + span_y
+
+
+def _point_payload(row) -> dict:
+    return {
+        "id": row.album_group_id,
+        "x": row.x,
+        "y": row.y,
+        "r": row.size,
+        "color": country_to_region(row.country_code),
+        "is_cluster": False,
+        "count": 1,
+        "label": row.title,
+    }
+
+
+def _cluster_payload(rows: list) -> dict:
+    count = len(rows)
+    regions = Counter(country_to_region(r.country_code) for r in rows)
+    return {
+        "id": None,
+        "x": sum(r.x for r in rows) / count,
+        "y": sum(r.y for r in rows) / count,
+        "r": min(count * 0.5 + 2, 20),
+        "color": regions.most_common(1)[0][0],
+        "is_cluster": True,
+        "count": count,
+        "label": None,
+    }
+
+
+def build_tile_points(z: int, rows: list) -> List[dict]:
+    """Raw points for sparse tiles and the deepest level, grid clusters otherwise."""
+    if z == TILE_MAX_ZOOM or len(rows) <= TILE_POINT_LIMIT:
+        return [_point_payload(r) for r in rows]
+
+    n = (1 << z) * TILE_GRID
+    cells: Dict[Tuple[int, int], list] = defaultdict(list)
+    for r in rows:
+        nx, ny = _normalize(r.x, r.y)
+        cells[(int(nx * n), int(ny * n))].append(r)
+
+    points = []
+    for cell_rows in cells.values():
+        if len(cell_rows) == 1:
+            points.append(_point_payload(cell_rows[0]))
+        else:
+            points.append(_cluster_payload(cell_rows))
+    return points
+
+
+async def _write_tiles(db: AsyncSession, tiles: List[dict]):
+    for i in range(0, len(tiles), TILE_WRITE_BATCH):
+        await map_repo.upsert_map_tiles(db, tiles[i:i + TILE_WRITE_BATCH])
+
+
+async def rebuild_all_tiles(db: AsyncSession) -> int:
+    """Drop and rebuild the whole pyramid. Returns the number of tiles written."""
+    rows = await map_repo.get_all_map_nodes(db)
+
+    buckets: Dict[TileKey, list] = defaultdict(list)
+    for r in rows:
+        for z in range(TILE_MAX_ZOOM + 1):
+            buckets[tile_for_point(z, r.x, r.y)].append(r)
+
+    tiles = [
+        {"z": z, "x": x, "y": y, "point_count": len(tile_rows), "points": build_tile_points(z, tile_rows)}
+        for (z, x, y), tile_rows in buckets.items()
+    ]
+
+    await map_repo.delete_all_map_tiles(db)
+    await _write_tiles(db, tiles)
+    await db.commit()
+    return len(tiles)
+
+
+async def rebuild_tiles(db: AsyncSession, keys: Iterable[TileKey]) -> int:
+    """Rebuild only the given tiles from the current map_nodes."""
+    tiles = []
+    empty: List[TileKey] = []
+    for z, x, y in sorted(set(keys)):
+        x1, x2, y1, y2 = tile_bounds(z, x, y)
+        # Edge tiles also own the clamped outliers beyond the world bounds
+        if x == 0:
+            x1 = float("-inf")
+        if y == 0:
+            y1 = float("-inf")
+        if x == (1 << z) - 1:
+            x2 = float("inf")
+        if y == (1 << z) - 1:
+            y2 = float("inf")
+        rows = await map_repo.get_map_nodes_in_box(db, x1, x2, y1, y2)
+        if rows:
+            tiles.append({"z": z, "x": x, "y": y, "point_count": len(rows), "points": build_tile_points(z, rows)})
+        else:
+            empty.append((z, x, y))
+
+    await map_repo.delete_map_tiles(db, empty)
+    await _write_tiles(db, tiles)
+    await db.commit()
+    return len(tiles)
+
+
+async def refresh_tiles_for_albums(
+    db: AsyncSession,
+    album_ids: List[str],
+    previous_points: Optional[Iterable[Tuple[float, float]]] = None,
+) -> int:
+    """
+    Incrementally refresh the tiles covering the given albums.
+
+    Pass previous_points when nodes were moved so their old tiles are rebuilt too.
+    """
+    if not album_ids:
+        return 0
+    if len(album_ids) > TILE_INCREMENTAL_LIMIT:
+        return await rebuild_all_tiles(db)
+
+    rows = await map_repo.get_map_nodes_by_ids(db, album_ids)
+    points = [(r.x, r.y) for r in rows]
+    if previous_points:
+        points.extend(previous_points)
+    return await rebuild_tiles(db, tile_keys_for_points(points))
+
+
+async def get_tile(db: AsyncSession, z: int, x: int, y: int):
+    """Return (points, point_count) for a tile; empty tiles are not stored."""
+    tile = await map_repo.get_map_tile(db, z, x, y)
+    if not tile:
+        return [], 0
+    return tile.points, tile.point_count
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.conditional import CatalogConditional, catalog_conditional
+from app.database import get_db
+from app.main import app
+from app.repositories import albums as album_repo
+from app.services import albums as album_service
+
+
+def _compile(stmt):
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+def test_no_bbox_adds_no_filter():
+    assert album_repo._bbox_filter(None) == []
+    assert "map_nodes.x >=" not in str(_compile(album_repo._map_point_rows_stmt(1960, 2024, 10)))
+
+
+def test_bbox_filters_both_axes():
+    compiled = _compile(album_repo._map_point_rows_stmt(1960, 2024, 10, bbox=(1970.0, 1980.0, 0.2, 0.4)))
+    sql = str(compiled)
+    for clause in ("map_nodes.x >= ", "map_nodes.x <= ", "map_nodes.y >= ", "map_nodes.y <= "):
+        assert clause in sql
+    assert {1970.0, 1980.0, 0.2, 0.4} <= set(compiled.params.values())
+
+
+class RecordingSession:
+    def __init__(self):
+        self.executed = []
+
+    async def execute(self, stmt, params=None):
+        self.executed.append((str(stmt), params))
+
+
+def test_grid_query_binds_the_bbox():
+    db = RecordingSession()
+    asyncio.run(album_repo.get_map_points_grid(db, 1960, 2024, (1970.0, 1980.0, 0.2, 0.4)))
+    sql, params = db.executed[0]
+    assert "mn.x BETWEEN :bx1 AND :bx2 AND mn.y BETWEEN :by1 AND :by2" in sql
+    assert params == {"y1": 1960, "y2": 2024, "bx1": 1970.0, "bx2": 1980.0, "by1": 0.2, "by2": 0.4}
+
+    asyncio.run(album_repo.get_map_points_grid(db, 1960, 2024))
+    assert "BETWEEN :bx1" not in db.executed[1][0]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = []
+
+    async def get_map_points(db, year_from, year_to, zoom, bbox=None):
+        calls.append(bbox)
+        return []
+
+    async def conditional(request: Request):
+        return CatalogConditional(1, None, "json", request)
+
+    async def no_db():
+        yield None
+
+    monkeypatch.setattr(album_service, "get_map_points", get_map_points)
+    app.dependency_overrides[catalog_conditional] = conditional
+    app.dependency_overrides[get_db] = no_db
+    yield TestClient(app), calls
+    app.dependency_overrides.clear()
+
+
+def test_route_passes_the_viewport(client):
+    http, calls = client
+    response = http.get("/map/points", params={"zoom": 5, "xMin": 1970, "xMax": 1980, "yMin": 0.2, "yMax": 0.4})
+    assert response.status_code == 200
+    assert calls == [(1970.0, 1980.0, 0.2, 0.4)]
+
+    http.get("/map/points", params={"zoom": 5})
+    assert calls[-1] is None
+
+
+@pytest.mark.parametrize("params", [
+    {"xMin": 1970, "xMax": 1980, "yMin": 0.2},
+    {"xMin": 1980, "xMax": 1970, "yMin": 0.2, "yMax": 0.4},
+    {"xMin": 1970, "xMax": 1980, "yMin": 0.4, "yMax": 0.2},
+])
+def test_route_rejects_partial_or_inverted_boxes(client, params):
+    http, calls = client
+    assert http.get("/map/points", params={"zoom": 5, **params}).status_code == 400
+    assert calls == []
@@ -0,0 +1,134 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import cache as cache_module
+from app.services.cache import MISSING, LRUCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_get_and_set():
+    cache = LRUCache("test", max_entries=10, ttl_seconds=60)
+    assert cache.get("a") is MISSING
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cached_none_is_a_hit():
+    cache = LRUCache("test", max_entries=10, ttl_seconds=60)
+    cache.set("a", None)
+    assert cache.get("a") is None
+    assert cache.hits == 1
+
+
+def test_least_recently_used_is_evicted():
+    cache = LRUCache("test", max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1 and len(cache) == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LRUCache("test", max_entries=10, ttl_seconds=5)
+    cache.set("a", 1)
+    clock.value += 4.9
+    assert cache.get("a") == 1
+    clock.value += 0.2
+    assert cache.get("a") is MISSING
+    assert len(cache) == 0
+
+
+def test_overwrite_refreshes_value():
+    cache = LRUCache("test", max_entries=10, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("a", 2)
+    assert cache.get("a") == 2 and len(cache) == 1
+
+
+def test_invalidate_and_clear():
+    cache = LRUCache("test", max_entries=10, ttl_seconds=60)
+    for key in ("a1", "a2", "b1"):
+        cache.set(key, key)
+    cache.invalidate("b1")
+    cache.invalidate("missing")
+    assert cache.invalidate_where(lambda k: k.startswith("a")) == 2
+    assert len(cache) == 0
+
+    cache.set("c", 1)
+    cache.clear()
+    assert cache.get("c") is MISSING
+
+
+def test_stats():
+    cache = LRUCache("test", max_entries=10, ttl_seconds=60)
+    assert cache.stats()["hit_rate"] is None
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert stats["name"] == "test" and stats["entries"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_invalidate_tags_removes_only_tagged_entries():
+    cache = LRUCache("test", max_entries=10, ttl_seconds=60)
+    cache.set("album-1", 1, tags=["album:1"])
+    cache.set("album-2", 2, tags=["album:2"])
+    cache.set("artist", 3, tags=["album:1", "album:2"])
+    assert cache.invalidate_tags(["album:1"]) == 2
+    assert cache.get("album-1") is MISSING and cache.get("artist") is MISSING
+    assert cache.get("album-2") == 2
+    assert cache.invalidations == 2
+
+
+def test_evicted_entries_leave_the_tag_index():
+    cache = LRUCache("test", max_entries=1, ttl_seconds=60)
+    cache.set("a", 1, tags=["album:a"])
+    cache.set("b", 2, tags=["album:b"])
+    assert "album:a" not in cache._tagged
+    assert cache.invalidate_tags(["album:a"]) == 0
+    assert cache.get("b") == 2
+
+
+def test_stale_store_after_tag_invalidation_is_skipped(clock):
+    cache = LRUCache("test", max_entries=10, ttl_seconds=60)
+    started = clock.value
+    clock.value += 1
+    cache.invalidate_tags(["album:1"])
+    clock.value += 1
+    cache.set("album-1", "stale", tags=["album:1"], started_at=started)
+    assert cache.get("album-1") is MISSING
+
+    # Loads started after the invalidation are stored
+    cache.set("album-1", "fresh", tags=["album:1"], started_at=clock.value)
+    assert cache.get("album-1") == "fresh"
+
+
+def test_stale_store_only_checks_its_own_tags(clock):
+    cache = LRUCache("test", max_entries=10, ttl_seconds=60)
+    started = clock.value
+    clock.value += 1
+    cache.invalidate_tags(["album:1"])
+    cache.set("album-2", 2, tags=["album:2"], started_at=started)
+    cache.set("untagged", 3, started_at=started)
+    assert cache.get("album-2") == 2 and cache.get("untagged") == 3
+
+
+def test_stale_store_after_clear_is_skipped(clock):
+    cache = LRUCache("test", max_entries=10, ttl_seconds=60)
+    started = clock.value
+    clock.value += 1
+    cache.clear()
+    cache.set("a", 1, started_at=started)
+    assert cache.get("a") is MISSING
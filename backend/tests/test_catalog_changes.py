@@ -0,0 +1,87 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import catalog
+
+
+def _album(album_id):
+    return SimpleNamespace(
+        album_group_id=album_id, title=album_id.upper(), primary_artist_display="Artist", original_year=None,
+        primary_genre=None, country_code="UK", cover_url=None, popularity=None, earliest_release_date=None,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+class FakeCatalogRepo:
+    """Change log rows are (id, album_group_id, change_type); albums are those with a map node."""
+
+    def __init__(self, changes, albums=()):
+        self.changes = changes
+        self.albums = set(albums)
+        self.fetched = None
+
+    async def get_change_bounds(self, db):
+        ids = [c[0] for c in self.changes]
+        return (min(ids), max(ids)) if ids else (None, None)
+
+    async def count_changed_albums(self, db, since):
+        return len({a for i, a, _ in self.changes if i > since})
+
+    async def get_latest_changes(self, db, since, until):
+        latest = {}
+        for i, album_id, change_type in self.changes:
+            if since < i <= until:
+                latest[album_id] = change_type
+        return [SimpleNamespace(album_group_id=a, change_type=t) for a, t in latest.items()]
+
+    async def get_albums_with_nodes_by_ids(self, db, album_ids):
+        self.fetched = list(album_ids)
+        return [(_album(a), SimpleNamespace(x=1990.5, y=0.5, size=4.0)) for a in album_ids if a in self.albums]
+
+
+def _changes(repo, monkeypatch, since, version):
+    monkeypatch.setattr(catalog, "catalog_repo", repo)
+    return asyncio.run(catalog.get_changes(None, since, version))
+
+
+CHANGES = [(10, "a1", "upsert"), (11, "a2", "upsert"), (12, "a1", "delete"), (13, "a3", "upsert"), (14, "a4", "upsert")]
+
+
+def test_latest_change_per_album_wins(monkeypatch):
+    repo = FakeCatalogRepo(CHANGES, albums={"a2", "a3"})
+    result = _changes(repo, monkeypatch, 9, 13)
+    assert not result.reset
+    assert [a.id for a in result.upserted] == ["a2", "a3"]
+    assert result.deleted == ["a1"]
+    # Changes after the published version are left for the next sync
+    assert "a4" not in repo.fetched
+
+
+def test_upserted_albums_carry_defaults_and_node_position(monkeypatch):
+    result = _changes(FakeCatalogRepo(CHANGES, albums={"a2"}), monkeypatch, 10, 11)
+    album = result.upserted[0]
+    assert (album.year, album.genre, album.popularity, album.region_bucket) == (0, "Unknown", 0.0, "Europe")
+    assert (album.x, album.y, album.size) == (1990.5, 0.5, 4.0)
+
+
+def test_upserts_without_a_map_node_are_deletes(monkeypatch):
+    result = _changes(FakeCatalogRepo(CHANGES, albums=()), monkeypatch, 12, 13)
+    assert result.upserted == [] and result.deleted == ["a3"]
+
+
+def test_up_to_date_client_gets_nothing(monkeypatch):
+    result = _changes(FakeCatalogRepo(CHANGES), monkeypatch, 13, 13)
+    assert not result.reset and result.upserted == [] and result.deleted == []
+
+
+@pytest.mark.parametrize("since", [8, 14])
+def test_pruned_or_future_versions_reset(monkeypatch, since):
+    assert _changes(FakeCatalogRepo(CHANGES), monkeypatch, since, 13).reset
+
+
+def test_too_many_changed_albums_reset(monkeypatch):
+    monkeypatch.setattr(catalog, "CHANGES_MAX_ALBUMS", 2)
+    assert _changes(FakeCatalogRepo(CHANGES), monkeypatch, 9, 13).reset
@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import catalog_version
+from app.services.catalog_version import CatalogVersionState
+
+
+class FakeChangeLog:
+    """catalog_changes ids plus the transactions still writing them."""
+
+    def __init__(self, ids, in_progress=()):
+        self.ids = list(ids)
+        self.in_progress = set(in_progress)
+
+    async def get_change_sequence_state(self, db):
+        return max(self.ids, default=0), sorted(self.in_progress)
+
+    async def get_in_progress_xids(self, db, xids):
+        return [x for x in xids if x in self.in_progress]
+
+    async def get_latest_change(self, db, until=None):
+        ids = [i for i in self.ids if until is None or i <= until]
+        if not ids:
+            return None
+        return SimpleNamespace(id=max(ids), changed_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+
+@pytest.fixture
+def change_log(monkeypatch):
+    log = FakeChangeLog([1, 2, 5])
+    monkeypatch.setattr(catalog_version, "catalog_repo", log)
+    return log
+
+
+def _refresh(state):
+    return asyncio.run(state.refresh(None))
+
+
+def test_version_follows_the_change_log(change_log):
+    state = CatalogVersionState()
+    seen = []
+    state.listeners.append(lambda previous, version: seen.append((previous, version)))
+    assert _refresh(state) and state.version == 5
+    assert not _refresh(state)
+    change_log.ids.append(9)
+    assert _refresh(state) and state.version == 9
+    assert seen == [(None, 5), (5, 9)]
+
+
+def test_version_waits_for_writers_in_progress(change_log):
+    state = CatalogVersionState()
+    _refresh(state)
+    # Transaction 100 holds an id below 9 that is not visible yet
+    change_log.ids.append(9)
+    change_log.in_progress.add(100)
+    assert not _refresh(state) and state.version == 5
+    change_log.in_progress.clear()
+    assert _refresh(state) and state.version == 9
+
+
+def test_failed_listener_is_retried_on_the_next_poll(change_log):
+    state = CatalogVersionState()
+    _refresh(state)
+    failures = [RuntimeError("map index reload failed")]
+    seen = []
+
+    async def listener(previous, version):
+        if failures:
+            raise failures.pop()
+        seen.append((previous, version))
+
+    state.listeners.append(listener)
+    change_log.ids.append(9)
+    with pytest.raises(RuntimeError):
+        _refresh(state)
+    # Not published, and the bound did not move past the failed version
+    assert state.version == 5 and state.bound == 5
+
+    assert _refresh(state) and state.version == 9
+    assert seen == [(5, 9)]
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+from app.services.clusters import CLUSTER_MAX_ZOOM, ClusterIndex
+
+
+def _row(i, x, y=0.5, country_code="US", popularity=0.5):
+    return SimpleNamespace(
+        album_group_id=f"a{i}", title=f"t{i}", x=x, y=y, popularity=popularity, country_code=country_code
+    )
+
+
+def _index(rows):
+    index = ClusterIndex()
+    index.build(rows)
+    return index
+
+
+def _total(points):
+    return sum(p.count for p in points)
+
+
+def test_counts_every_node_in_range():
+    rows = [_row(i, 1960.0 + i, y=(i % 10) / 10) for i in range(60)]
+    index = _index(rows)
+    for zoom in range(CLUSTER_MAX_ZOOM + 1):
+        assert _total(index.query(zoom, 1950, 2030)) == 60
+        assert _total(index.query(zoom, 1970, 1979)) == 10
+
+
+def test_cluster_straddling_the_year_range_counts_only_members_inside():
+    # One cell at zoom 0 holds albums from 1999, 2000 and 2001
+    index = _index([_row(0, 1999.5), _row(1, 2000.5), _row(2, 2001.5)])
+    points = index.query(0, 2000, 2000)
+    assert _total(points) == 1
+    assert len(points) == 1 and not points[0].is_cluster
+    assert points[0].id == "a1"
+    assert points[0].x == 2000.5
+
+    points = index.query(0, 2000, 2001)
+    assert len(points) == 1 and points[0].is_cluster and points[0].count == 2
+    assert points[0].x == 2001.0
+
+
+def test_single_node_is_a_point():
+    index = _index([_row(0, 1985.2, y=0.3)])
+    [point] = index.query(CLUSTER_MAX_ZOOM, 1950, 2030)
+    assert point.id == "a0" and point.label == "t0" and not point.is_cluster
+    assert (point.x, point.y) == (1985.2, 0.3)
+
+
+def test_bbox_filters_on_cluster_centroids():
+    index = _index([_row(0, 1960.5, y=0.1), _row(1, 2010.5, y=0.9)])
+    points = index.query(CLUSTER_MAX_ZOOM, 1950, 2030, bbox=(1950.0, 1970.0, 0.0, 0.5))
+    assert [p.id for p in points] == ["a0"]
+
+
+def test_majority_region_colors_the_cluster():
+    rows = [_row(0, 1990.1, country_code="UK"), _row(1, 1990.2, country_code="UK"), _row(2, 1990.3)]
+    [point] = _index(rows).query(0, 1950, 2030)
+    assert point.color == "Europe"
+
+
+def test_null_country_and_popularity():
+    [point] = _index([_row(0, 1990.5, country_code=None, popularity=None)]).query(0, 1950, 2030)
+    assert point.color == "Unknown"
+
+
+def test_empty_range_and_unloaded_index():
+    assert _index([_row(0, 1990.5)]).query(0, 2000, 2010) == []
+    assert ClusterIndex().query(0, 1950, 2030) == []
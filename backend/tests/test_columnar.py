@@ -0,0 +1,110 @@
+import struct
+from types import SimpleNamespace
+
+from app.services.albums import MAP_POINT_COLUMNS
+from app.services.columnar import COLUMNAR_MEDIA_TYPE, F32, I32, STR, U8, accepts_columnar, encode_columns
+
+_FORMATS = {F32: "f", I32: "i", U8: "B", STR: "i"}
+
+
+def decode(body: bytes):
+    """Reference decoder for the layout documented in services/columnar.py."""
+    assert body[:4] == b"SCOL"
+    _, rows, ncols = struct.unpack_from("<III", body, 4)
+    pos = 16
+    header = []
+    for _ in range(ncols):
+        (length,) = struct.unpack_from("<B", body, pos)
+        name = body[pos + 1:pos + 1 + length].decode("utf-8")
+        (dtype,) = struct.unpack_from("<B", body, pos + 1 + length)
+        header.append((name, dtype))
+        pos += length + 2
+    pos += -pos % 4
+
+    columns = {}
+    for name, dtype in header:
+        fmt = _FORMATS[dtype]
+        size = struct.calcsize(fmt)
+        columns[name] = (dtype, list(struct.unpack_from(f"<{rows}{fmt}", body, pos)))
+        pos += size * rows
+    pos += -pos % 4
+
+    (count,) = struct.unpack_from("<I", body, pos)
+    offsets = struct.unpack_from(f"<{count + 1}I", body, pos + 4)
+    blob = body[pos + 4 + 4 * (count + 1):]
+    strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(count)]
+
+    decoded = {}
+    for name, (dtype, values) in columns.items():
+        if dtype == STR:
+            values = [None if v == -1 else strings[v] for v in values]
+        decoded[name] = values
+    return rows, decoded, strings
+
+
+SPEC = [
+    ("id", STR, lambda r: r.id),
+    ("score", F32, lambda r: r.score),
+    ("year", I32, lambda r: r.year),
+    ("flag", U8, lambda r: r.flag),
+    ("genre", STR, lambda r: r.genre),
+]
+
+
+def test_round_trip():
+    rows = [
+        SimpleNamespace(id="a", score=0.5, year=1999, flag=1, genre="Rock"),
+        SimpleNamespace(id="b", score=1.25, year=2001, flag=0, genre="Jazz"),
+    ]
+    count, columns, _ = decode(encode_columns(rows, SPEC))
+    assert count == 2
+    assert columns == {
+        "id": ["a", "b"],
+        "score": [0.5, 1.25],
+        "year": [1999, 2001],
+        "flag": [1, 0],
+        "genre": ["Rock", "Jazz"],
+    }
+
+
+def test_strings_are_deduplicated():
+    rows = [SimpleNamespace(id=str(i), score=0, year=0, flag=0, genre="Rock") for i in range(5)]
+    _, columns, strings = decode(encode_columns(rows, SPEC))
+    assert columns["genre"] == ["Rock"] * 5
+    assert strings.count("Rock") == 1
+
+
+def test_nulls():
+    rows = [SimpleNamespace(id="a", score=None, year=None, flag=None, genre=None)]
+    _, columns, _ = decode(encode_columns(rows, SPEC))
+    assert columns["genre"] == [None]
+    assert columns["score"] == [0.0] and columns["year"] == [0] and columns["flag"] == [0]
+
+
+def test_unicode_strings():
+    rows = [SimpleNamespace(id="방탄소년단", score=0, year=0, flag=0, genre="Björk")]
+    _, columns, _ = decode(encode_columns(rows, SPEC))
+    assert columns["id"] == ["방탄소년단"] and columns["genre"] == ["Björk"]
+
+
+def test_empty():
+    count, columns, strings = decode(encode_columns([], SPEC))
+    assert count == 0 and strings == []
+    assert all(values == [] for values in columns.values())
+
+
+def test_map_points_carry_year_and_popularity():
+    row = SimpleNamespace(
+        album_group_id="a", title="t", original_year=1973, country_code=None,
+        popularity=None, x=1973.4, y=0.25, size=2.0,
+    )
+    _, columns, _ = decode(encode_columns([row], MAP_POINT_COLUMNS))
+    assert columns["year"] == [1973]
+    assert columns["popularity"] == [0.0]
+    assert columns["color"] == ["Unknown"]
+
+
+def test_accepts_columnar():
+    assert accepts_columnar(f"{COLUMNAR_MEDIA_TYPE}, application/json")
+    assert not accepts_columnar("application/json")
+    assert not accepts_columnar(None)
@@ -0,0 +1,60 @@
+import gzip
+
+import pytest
+
+from app import compression
+from app.compression import CompressionCache, choose_encoding
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, deflate, br", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("BR;q=0.0, GZIP;q=0.5", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("*;q=0", None),
+    ("*, br;q=0", "gzip"),
+    ("gzip;q=bogus", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_choose_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("br, gzip") == "gzip"
+    assert choose_encoding("br") is None
+
+
+def test_cache_compresses_once_per_version():
+    cache = CompressionCache()
+    body = b'{"data": []}' * 200
+    first = cache.get_or_compress(body, "gzip", 1)
+    assert gzip.decompress(first) == body
+    assert cache.get_or_compress(body, "gzip", 1) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # A newer version drops the older entries
+    cache.get_or_compress(body, "gzip", 2)
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache._entries) == 1
+
+
+def test_cache_does_not_keep_bodies_of_older_versions():
+    cache = CompressionCache()
+    cache.get_or_compress(b"new", "gzip", 2)
+    cache.get_or_compress(b"old", "gzip", 1)
+    assert cache.version == 2
+    assert len(cache._entries) == 1
+
+
+def test_cache_is_bounded_by_bytes():
+    cache = CompressionCache(max_bytes=100)
+    for i in range(20):
+        cache.get_or_compress(f"body {i}".encode(), "gzip", 1)
+    assert 0 < cache.size <= 100
+    assert cache.size == sum(len(v) for v in cache._entries.values())
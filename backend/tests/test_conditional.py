@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+
+import pytest
+from starlette.requests import Request
+
+from app.conditional import CatalogConditional, _etag_matches, _not_modified_since
+
+ETAG = 'W/"catalog-7-json"'
+CHANGED_AT = datetime(2024, 5, 1, 12, 30, 15, 500000, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ('W/"catalog-7-json"', True),
+    ('"catalog-7-json"', True),
+    ('"catalog-6-json", W/"catalog-7-json"', True),
+    ("*", True),
+    ('W/"catalog-7-ndjson"', False),
+    ('W/"catalog-6-json"', False),
+])
+def test_etag_comparison_is_weak(header, expected):
+    assert _etag_matches(header, ETAG) is expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    # Sub-second part of changed_at is dropped, as HTTP dates cannot carry it
+    ("Wed, 01 May 2024 12:30:15 GMT", True),
+    ("Wed, 01 May 2024 12:31:00 GMT", True),
+    ("Wed, 01 May 2024 12:30:14 GMT", False),
+    ("not a date", False),
+    ("Wed, 01 May 2024 12:30:15 -0000", False),
+])
+def test_not_modified_since(header, expected):
+    assert _not_modified_since(header, CHANGED_AT) is expected
+
+
+def _request(**headers):
+    raw = [(k.replace("_", "-").lower().encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    request = _request(if_none_match='W/"catalog-6-json"', if_modified_since="Wed, 01 May 2024 13:00:00 GMT")
+    assert not CatalogConditional(7, CHANGED_AT, "json", request).not_modified
+
+
+def test_validators_and_304():
+    cache = CatalogConditional(7, CHANGED_AT, "json", _request(if_modified_since="Wed, 01 May 2024 13:00:00 GMT"))
+    assert cache.not_modified
+    response = cache.not_modified_response()
+    assert response.status_code == 304
+    assert response.headers["etag"] == ETAG
+    assert response.headers["last-modified"] == "Wed, 01 May 2024 12:30:15 GMT"
+    assert response.headers["x-catalog-version"] == "7"
+
+
+def test_empty_change_log_has_no_last_modified():
+    cache = CatalogConditional(0, None, "json", _request(if_modified_since="Wed, 01 May 2024 13:00:00 GMT"))
+    assert not cache.not_modified
+    assert "Last-Modified" not in cache.headers()
@@ -0,0 +1,146 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import facets
+from app.services.facets import FacetIndex
+
+
+def _row(year, genre, country_code, album_count):
+    return SimpleNamespace(year=year, genre=genre, country_code=country_code, album_count=album_count)
+
+
+ROWS = [
+    _row(1971, "Rock", "UK", 3),
+    _row(1974, "Rock", "US", 2),
+    _row(1979, "Jazz", "US", 1),
+    _row(1983, "Pop", "Japan", 4),
+    _row(1985, "Rock", None, 5),
+]
+
+
+def _index(rows=ROWS):
+    index = FacetIndex()
+    index.build(rows, version=7)
+    return index
+
+
+def _counts(facets):
+    return {f.value: f.count for f in facets}
+
+
+def test_unfiltered_counts():
+    result = _index().query(10, 1950, 2030)
+    assert result.total == 15
+    assert _counts(result.genres) == {"Rock": 10, "Pop": 4, "Jazz": 1}
+    assert [(p.period_start, p.count) for p in result.periods] == [(1970, 6), (1980, 9)]
+    # NULL country codes are counted under "Unknown"
+    assert _counts(result.regions)["Unknown"] == 5
+
+
+def test_each_facet_ignores_its_own_filter():
+    result = _index().query(1, 1950, 2030, genres=["Rock"], regions=["North America"])
+    assert result.total == 2
+    # Genres are counted with the region filter only, regions with the genre filter only
+    assert _counts(result.genres) == {"Rock": 2, "Jazz": 1}
+    assert _counts(result.regions) == {"Unknown": 5, "Europe": 3, "North America": 2}
+
+
+def test_year_range_and_granularity():
+    result = _index().query(5, 1974, 1983)
+    assert [(p.period_start, p.count) for p in result.periods] == [(1970, 2), (1975, 1), (1980, 4)]
+    assert result.total == 7
+
+
+def test_years_before_year_from_are_not_counted():
+    # 1971 and 1974 share the 1970 decade with 1975, but are out of range
+    result = _index().query(10, 1975, 1979)
+    assert result.total == 1
+    assert _counts(result.genres) == {"Jazz": 1}
+    assert [(p.period_start, p.count) for p in result.periods] == [(1970, 1)]
+
+
+def test_facets_are_sorted_by_count():
+    result = _index().query(10, 1950, 2030)
+    counts = [f.count for f in result.regions]
+    assert counts == sorted(counts, reverse=True)
+
+
+def test_range_outside_the_catalog():
+    assert _index().query(10, 2000, 2030).total == 0
+    assert _index().query(1, 1900, 1950).total == 0
+
+
+def test_empty_index():
+    index = _index([])
+    assert index.ready and index.version == 7
+    result = index.query(10, 1950, 2030)
+    assert result.total == 0 and result.genres == [] and result.periods == []
+
+
+class FakeFacetRepo:
+    def __init__(self, source=(), grid=()):
+        self.source = list(source)
+        self.grid = list(grid)
+        self.replaced = None
+
+    async def get_cube_source_rows(self, db):
+        return self.source
+
+    async def replace_cube(self, db, rows):
+        self.replaced = rows
+
+    async def get_cube_grid_rows(self, db, year_from, year_to):
+        return self.grid
+
+
+class FakeSession:
+    async def commit(self):
+        pass
+
+
+def _source(year, genre, country_code, vibe_bucket, album_count, vibe_sum):
+    return SimpleNamespace(
+        year=year, genre=genre, country_code=country_code, vibe_bucket=vibe_bucket, album_count=album_count,
+        year_sum=year * album_count, vibe_sum=vibe_sum, popularity_sum=0.5 * album_count,
+    )
+
+
+def test_cube_rolls_years_up_into_every_granularity(monkeypatch):
+    repo = FakeFacetRepo(source=[
+        _source(1971, "Rock", "UK", 3, 2, 0.7),
+        _source(1974, "Rock", "UK", 3, 1, 0.35),
+    ])
+    monkeypatch.setattr(facets, "facet_repo", repo)
+    assert asyncio.run(facets.refresh_facet_cube(FakeSession())) == 4
+
+    cube = {(r["granularity"], r["period_start"]): r for r in repo.replaced}
+    assert set(cube) == {(1, 1971), (1, 1974), (5, 1970), (10, 1970)}
+    decade = cube[(10, 1970)]
+    assert decade["album_count"] == 3 and decade["region"] == "Europe"
+    assert decade["year_sum"] == 1971 * 2 + 1974 and decade["vibe_sum"] == pytest.approx(1.05)
+
+
+def _grid(bucket, vibe_bucket, country_code, count, year, vibe):
+    return SimpleNamespace(
+        bucket=bucket, vibe_bucket=vibe_bucket, country_code=country_code,
+        count=count, year_sum=year * count, vibe_sum=vibe * count,
+    )
+
+
+def test_grid_clusters_merge_cube_rows_into_cells(monkeypatch):
+    monkeypatch.setattr(facets, "facet_repo", FakeFacetRepo(grid=[
+        _grid(394, 3, "US", 1, 1970, 0.3),
+        _grid(394, 3, "UK", 3, 1974, 0.34),
+        _grid(394, 3, None, 5, 1972, 0.32),
+        _grid(395, 6, None, 2, 1976, 0.6),
+    ]))
+    cells = asyncio.run(facets.get_grid_clusters(None, 1960, 2024))
+    assert len(cells) == 2
+    first, second = cells
+    assert first.count == 9
+    assert first.x == pytest.approx((1970 + 3 * 1974 + 5 * 1972) / 9)
+    # NULL countries only win when nothing else is left
+    assert first.country_code == "UK"
+    assert second.country_code is None and second.y == pytest.approx(0.6)
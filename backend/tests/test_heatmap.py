@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import heatmap
+from app.services.common import MAP_X_MAX, MAP_X_MIN, MAP_Y_MAX, MAP_Y_MIN
+from app.services.heatmap import HEATMAP_HEIGHT, HEATMAP_WIDTH, HeatmapIndex
+
+
+def _node(x, y, genre="Rock", country_code="US"):
+    return SimpleNamespace(x=x, y=y, primary_genre=genre, country_code=country_code)
+
+
+ROWS = [
+    _node(1970.5, 0.1),
+    _node(1970.6, 0.11),
+    _node(1990.5, 0.9, "Jazz", "UK"),
+    _node(1990.5, 0.9, None, None),
+    # Outside the world bounds: clamped into the edge bins
+    _node(1900.0, -1.0),
+    _node(2100.0, 2.0, "Jazz", "UK"),
+]
+
+
+def _bin(x, y):
+    col = int((x - MAP_X_MIN) / (MAP_X_MAX - MAP_X_MIN) * HEATMAP_WIDTH)
+    row = int((y - MAP_Y_MIN) / (MAP_Y_MAX - MAP_Y_MIN) * HEATMAP_HEIGHT)
+    return row, col
+
+
+@pytest.fixture
+def index():
+    index = HeatmapIndex()
+    index.build(ROWS)
+    return index
+
+
+def test_raster_bins_year_by_vibe(index):
+    raster = index.raster()
+    assert raster.shape == (HEATMAP_HEIGHT, HEATMAP_WIDTH)
+    assert raster.sum() == len(ROWS)
+    assert raster[_bin(1970.5, 0.1)] == 2
+    assert raster[_bin(1990.5, 0.9)] == 2
+
+
+def test_out_of_bounds_nodes_are_clamped_to_the_edges(index):
+    raster = index.raster()
+    assert raster[0, 0] == 1
+    assert raster[HEATMAP_HEIGHT - 1, HEATMAP_WIDTH - 1] == 1
+
+
+def test_genre_and_region_slices(index):
+    assert index.genres == ["Jazz", "Rock", "Unknown"]
+    assert index.raster(genre="Jazz").sum() == 2
+    assert index.raster(region="North America").sum() == 3
+    assert index.raster(genre="Rock", region="Europe").sum() == 0
+    assert index.raster(genre="Unknown", region="Unknown").sum() == 1
+    assert index.raster(genre="Polka") is None
+    assert index.raster(region="Atlantis") is None
+
+
+def test_get_heatmap_needs_a_loaded_index(monkeypatch):
+    monkeypatch.setattr(heatmap, "heatmap_index", HeatmapIndex())
+    assert heatmap.get_heatmap() is None
+
+
+def test_get_heatmap_response(monkeypatch, index):
+    monkeypatch.setattr(heatmap, "heatmap_index", index)
+    response = heatmap.get_heatmap(genre="Rock")
+    assert (response.width, response.height) == (HEATMAP_WIDTH, HEATMAP_HEIGHT)
+    assert len(response.counts) == HEATMAP_WIDTH * HEATMAP_HEIGHT
+    assert response.total == 3 and response.max == 2
+    # counts is row-major: vibe rows of year columns
+    counts = np.array(response.counts).reshape(HEATMAP_HEIGHT, HEATMAP_WIDTH)
+    assert counts[_bin(1970.5, 0.1)] == 2
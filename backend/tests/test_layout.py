@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import layout
+from app.services.common import MAP_Y_MAX, MAP_Y_MIN, genre_to_vibe
+from app.services.layout import LAYOUT_DENSE_CELL, LAYOUT_X_RADIUS, LAYOUT_Y_SPACING, base_positions, compute_layout
+
+
+def _layout(n, year=1990.5, vibe=0.5, popularity=None):
+    ids = [f"a{i}" for i in range(n)]
+    popularity = np.linspace(1, 0, n) if popularity is None else popularity
+    return ids, compute_layout(ids, np.full(n, year), np.full(n, vibe), popularity)
+
+
+def test_empty():
+    x, y, size = compute_layout([], np.zeros(0), np.zeros(0), np.zeros(0))
+    assert len(x) == len(y) == len(size) == 0
+
+
+def test_x_stays_inside_the_release_year():
+    _, (x, y, _) = _layout(500)
+    assert (x >= 1990.5 - LAYOUT_X_RADIUS).all() and (x <= 1990.5 + LAYOUT_X_RADIUS).all()
+    assert (np.floor(x) == 1990).all()
+
+
+def test_nodes_do_not_stack():
+    _, (x, y, _) = _layout(200)
+    assert len(set(zip(x.round(6), y.round(6)))) == 200
+
+
+def test_most_popular_album_sits_nearest_the_genre_line():
+    _, (x, y, _) = _layout(50)
+    y_radius = LAYOUT_Y_SPACING * np.sqrt(50)
+    distance = np.hypot((x - 1990.5) / LAYOUT_X_RADIUS, (y - 0.5) / y_radius)
+    assert distance.argmin() == 0
+
+
+def test_layout_is_deterministic_and_order_independent():
+    ids, (x, y, size) = _layout(30, popularity=np.zeros(30))
+    order = np.arange(30)[::-1]
+    x2, y2, size2 = compute_layout([ids[i] for i in order], np.full(30, 1990.5), np.full(30, 0.5), np.zeros(30))
+    assert np.allclose(x2, x[order]) and np.allclose(y2, y[order]) and np.allclose(size2, size[order])
+
+
+def test_y_is_clamped_to_the_map():
+    _, (_, y, _) = _layout(400, vibe=0.999)
+    assert (y >= MAP_Y_MIN).all() and (y <= MAP_Y_MAX).all()
+
+
+def test_dense_cells_get_smaller_nodes():
+    _, (_, _, sparse) = _layout(1, popularity=np.array([0.5]))
+    _, (_, _, dense) = _layout(LAYOUT_DENSE_CELL * 4, popularity=np.full(LAYOUT_DENSE_CELL * 4, 0.5))
+    assert dense[0] < sparse[0]
+
+
+def test_base_positions_prefer_stored_vibe_then_y_then_genre():
+    rows = [
+        SimpleNamespace(original_year=1990, vibe=0.3, y=0.9, primary_genre="Rock"),
+        SimpleNamespace(original_year=1991, vibe=None, y=0.9, primary_genre="Rock"),
+        SimpleNamespace(original_year=None, vibe=None, y=None, primary_genre="Rock"),
+    ]
+    x, y = base_positions(rows)
+    assert x.tolist() == [1990.5, 1991.5, 0.5]
+    assert y.tolist() == [0.3, 0.9, genre_to_vibe("Rock")]
+
+
+class FakeMapRepo:
+    def __init__(self, rows):
+        self.rows = rows
+        self.written = []
+
+    async def get_layout_source_rows(self, db):
+        return self.rows
+
+    async def update_map_node_layout(self, db, nodes):
+        self.written.extend(nodes)
+
+
+class FakeSession:
+    async def commit(self):
+        pass
+
+
+def _node(album_id, year, vibe, changed=False):
+    written = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return SimpleNamespace(
+        album_group_id=album_id, original_year=year, primary_genre="Rock", popularity=0.5,
+        updated_at=datetime(2024, 2, 1, tzinfo=timezone.utc) if changed else written,
+        x=year + 0.5, y=vibe, vibe=vibe, node_updated_at=written,
+    )
+
+
+@pytest.fixture
+def map_repo(monkeypatch):
+    repo = FakeMapRepo([_node("a1", 1990, 0.5), _node("a2", 1990, 0.51, changed=True), _node("a3", 2005, 0.2)])
+    monkeypatch.setattr(layout, "map_repo", repo)
+    return repo
+
+
+def test_layout_only_updates_existing_nodes(map_repo):
+    laid_out, previous = asyncio.run(layout.layout_albums(FakeSession()))
+    assert laid_out == ["a1", "a2", "a3"]
+    assert [n["b_id"] for n in map_repo.written] == laid_out
+    assert previous == [(1990.5, 0.5), (1990.5, 0.51), (2005.5, 0.2)]
+
+
+def test_changed_only_relays_the_cells_of_changed_albums(map_repo):
+    laid_out, _ = asyncio.run(layout.layout_albums(FakeSession(), changed_only=True))
+    # a1 shares a cell with the changed a2; a3 is untouched
+    assert laid_out == ["a1", "a2"]
+
+
+def test_album_ids_select_their_cells(map_repo):
+    laid_out, _ = asyncio.run(layout.layout_albums(FakeSession(), album_ids=["a3"]))
+    assert laid_out == ["a3"]
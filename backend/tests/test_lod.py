@@ -0,0 +1,124 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services import lod
+from app.services.lod import LOD_MAX_ZOOM, LOD_MIN_ZOOM, LOD_POINTS_PER_CELL, compute_min_zoom, lod_level
+
+
+def _min_zoom(x, y, popularity, is_anchor=None):
+    n = len(x)
+    if is_anchor is None:
+        is_anchor = np.zeros(n, dtype=bool)
+    return compute_min_zoom(
+        np.asarray(x, dtype=np.float64),
+        np.asarray(y, dtype=np.float64),
+        np.asarray(popularity, dtype=np.float64),
+        np.asarray(is_anchor, dtype=bool),
+    )
+
+
+def test_lod_level_is_clamped():
+    assert lod_level(0) == LOD_MIN_ZOOM
+    assert lod_level(4.7) == 4
+    assert lod_level(20) == LOD_MAX_ZOOM
+
+
+def test_empty():
+    assert len(_min_zoom([], [], [])) == 0
+
+
+def test_most_popular_albums_of_a_cell_show_first():
+    n = LOD_POINTS_PER_CELL + 4
+    popularity = np.arange(n, dtype=np.float64)
+    # Same position: the albums share a cell at every level
+    min_zoom = _min_zoom([1990.0] * n, [0.5] * n, popularity)
+    top = popularity >= n - LOD_POINTS_PER_CELL
+    assert (min_zoom[top] == LOD_MIN_ZOOM).all()
+    assert (min_zoom[~top] == LOD_MAX_ZOOM).all()
+
+
+def test_albums_split_into_finer_cells_show_at_deeper_levels():
+    n = LOD_POINTS_PER_CELL + 1
+    # Close enough to share a cell at the coarsest level, apart at the finest
+    x = 1990.0 + np.arange(n) * 0.05
+    min_zoom = _min_zoom(x, [0.5] * n, np.arange(n, dtype=np.float64))
+    assert min_zoom[0] > LOD_MIN_ZOOM
+    assert (min_zoom[1:] == LOD_MIN_ZOOM).all()
+
+
+def test_visible_albums_grow_with_zoom():
+    rng = np.random.default_rng(7)
+    n = 2000
+    min_zoom = _min_zoom(rng.uniform(1950, 2030, n), rng.uniform(0, 1, n), rng.uniform(0, 1, n))
+    visible = [(min_zoom <= z).sum() for z in range(LOD_MIN_ZOOM, LOD_MAX_ZOOM + 1)]
+    assert visible == sorted(visible)
+    assert visible[-1] == n
+
+
+def test_anchors_are_always_shown():
+    n = LOD_POINTS_PER_CELL + 2
+    is_anchor = np.zeros(n, dtype=bool)
+    is_anchor[0] = True
+    # The anchor is the least popular album of the cell
+    min_zoom = _min_zoom([1990.0] * n, [0.5] * n, np.arange(n, dtype=np.float64), is_anchor)
+    assert min_zoom[0] == LOD_MIN_ZOOM
+
+
+class FakeMapRepo:
+    def __init__(self, rows):
+        self.rows = rows
+        self.updates = []
+
+    async def get_lod_source_rows(self, db):
+        return self.rows
+
+    async def update_min_zoom(self, db, updates):
+        self.updates.append(updates)
+
+
+class FakeSession:
+    def __init__(self):
+        self.commits = 0
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _node(album_id, popularity, min_zoom, is_anchor=False):
+    return SimpleNamespace(album_group_id=album_id, x=1990.0, y=0.5, popularity=popularity, is_anchor=is_anchor, min_zoom=min_zoom)
+
+
+def test_refresh_writes_only_changed_min_zooms(monkeypatch):
+    n = LOD_POINTS_PER_CELL + 2
+    # a0 is the least popular; it is stored as visible from the start but belongs at the deepest level
+    rows = [_node(f"a{i}", float(i), LOD_MIN_ZOOM) for i in range(n)]
+    rows[1].is_anchor = True
+    repo = FakeMapRepo(rows)
+    monkeypatch.setattr(lod, "map_repo", repo)
+    monkeypatch.setattr(lod, "LOD_WRITE_BATCH", 1)
+
+    db = FakeSession()
+    assert asyncio.run(lod.refresh_lod(db)) == 1
+    assert repo.updates == [[{"b_id": "a0", "b_min_zoom": LOD_MAX_ZOOM}]]
+    assert db.commits == 1
+
+    rows[0].min_zoom = LOD_MAX_ZOOM
+    repo.updates.clear()
+    assert asyncio.run(lod.refresh_lod(db)) == 0
+    assert repo.updates == []
+
+
+def test_refresh_batches_writes(monkeypatch):
+    rows = [_node(f"a{i}", float(i), None) for i in range(5)]
+    repo = FakeMapRepo(rows)
+    monkeypatch.setattr(lod, "map_repo", repo)
+    monkeypatch.setattr(lod, "LOD_WRITE_BATCH", 2)
+    assert asyncio.run(lod.refresh_lod(FakeSession())) == 5
+    assert [len(batch) for batch in repo.updates] == [2, 2, 1]
+
+
+def test_refresh_without_nodes(monkeypatch):
+    monkeypatch.setattr(lod, "map_repo", FakeMapRepo([]))
+    assert asyncio.run(lod.refresh_lod(FakeSession())) == 0
@@ -0,0 +1,56 @@
+import pytest
+
+from app.services.normalization import choseong_key, is_choseong_query, normalize_key
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Björk", "bjork"),
+    ("AC/DC", "ac dc"),
+    ("  The  Dark-Side_of the Moon!! ", "the dark side of the moon"),
+    ("Beyoncé", "beyonce"),
+    ("Motörhead", "motorhead"),
+    ("STRASSE", "strasse"),
+    ("Straße", "strasse"),
+    ("ＡＢＣ", "abc"),
+    ("Sigur Rós", "sigur ros"),
+    ("!!!", ""),
+])
+def test_normalize_key(text, expected):
+    assert normalize_key(text) == expected
+
+
+@pytest.mark.parametrize("text", [None, ""])
+def test_normalize_key_of_null_is_empty(text):
+    assert normalize_key(text) == ""
+    assert choseong_key(text) == ""
+
+
+def test_hangul_is_decomposed_into_jamo():
+    assert normalize_key("닭") == "ㄷㅏㄹㄱ"
+    assert normalize_key("방탄 소년단") == "ㅂㅏㅇㅌㅏㄴ ㅅㅗㄴㅕㄴㄷㅏㄴ"
+
+
+def test_partly_typed_syllable_is_a_prefix():
+    finished = normalize_key("닭")
+    for typing in ("ㄷ", "다", "달", "달ㄱ", "ㄷㅏㄺ"):
+        assert finished.startswith(normalize_key(typing))
+
+
+def test_compound_vowels_are_split():
+    assert normalize_key("과") == normalize_key("고") + "ㅏ"
+    assert normalize_key("ㅘ") == "ㅗㅏ"
+
+
+def test_choseong_key():
+    assert choseong_key("방탄소년단") == "ㅂㅌㅅㄴㄷ"
+    assert choseong_key("BTS 방탄") == "ㅂㅌ"
+    assert choseong_key("Radiohead") == ""
+
+
+def test_is_choseong_query():
+    assert is_choseong_query("ㅂㅌㅅ")
+    assert is_choseong_query("ㅂㅌ ㅅ")
+    assert not is_choseong_query("방탄")
+    assert not is_choseong_query("ㅏ")
+    assert not is_choseong_query("")
+    assert not is_choseong_query("   ")
@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.pagination import decode_album_cursor, encode_album_cursor, next_album_cursor
+
+
+def test_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    cursor = encode_album_cursor(created_at, "album-1")
+    assert decode_album_cursor(cursor) == (created_at, "album-1")
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_album_cursor(datetime(2024, 5, 1, tzinfo=timezone.utc), "??>>~~")
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "bnVsbA", "WzFd", "!!!"])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_album_cursor(cursor)
+
+
+def test_null_created_at_is_an_invalid_cursor():
+    # Keyset comparisons cannot continue after a NULL key
+    with pytest.raises(ValueError):
+        decode_album_cursor(encode_album_cursor(None, "album-1"))
+
+
+def test_next_cursor_only_for_full_pages():
+    row = SimpleNamespace(created_at=datetime(2024, 5, 1, tzinfo=timezone.utc), album_group_id="a")
+    assert next_album_cursor(row, limit=2, count=1) is None
+    assert next_album_cursor(None, limit=2, count=0) is None
+    assert decode_album_cursor(next_album_cursor(row, limit=2, count=2)) == (row.created_at, "a")
@@ -0,0 +1,72 @@
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from app.conditional import CatalogConditional, catalog_conditional
+from app.database import get_db
+from app.main import app
+from app.models import AlbumGroup, MapNode
+from app.repositories.albums import ALBUM_FIELD_COLUMNS, album_field_columns
+from app.services.albums import ALBUM_FIELDS, parse_album_fields, project_album_row
+
+
+def test_no_fields_means_the_full_album():
+    assert parse_album_fields(None) is None
+
+
+def test_fields_are_trimmed_and_deduplicated_in_order():
+    assert parse_album_fields(" title,id ,title,,x") == ["title", "id", "x"]
+
+
+@pytest.mark.parametrize("fields, message", [
+    ("title,bogus,nope", "Unknown fields: bogus, nope"),
+    (",", "fields must name at least one field"),
+    ("", "fields must name at least one field"),
+])
+def test_invalid_fields_are_rejected(fields, message):
+    with pytest.raises(ValueError, match=message):
+        parse_album_fields(fields)
+
+
+def test_every_field_has_columns():
+    assert set(ALBUM_FIELDS) == set(ALBUM_FIELD_COLUMNS)
+
+
+def test_columns_always_include_the_list_sort_key():
+    columns = album_field_columns(["genre", "genre_vibe", "x"])
+    assert columns == (AlbumGroup.album_group_id, AlbumGroup.created_at, AlbumGroup.primary_genre, MapNode.x)
+
+
+def test_projection_keeps_the_requested_order_and_defaults():
+    row = SimpleNamespace(
+        album_group_id="a1", title="Blue", primary_genre=None, original_year=None, country_code="UK",
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc), earliest_release_date=date(1971, 6, 22), x=1971.5,
+    )
+    projected = project_album_row(row, ["year", "genre", "region_bucket", "x", "id"])
+    assert list(projected) == ["year", "genre", "region_bucket", "x", "id"]
+    assert projected == {"year": 0, "genre": "Unknown", "region_bucket": "Europe", "x": 1971.5, "id": "a1"}
+
+
+@pytest.fixture
+def client():
+    async def conditional(request: Request):
+        return CatalogConditional(1, None, "json", request)
+
+    async def no_db():
+        yield None
+
+    app.dependency_overrides[catalog_conditional] = conditional
+    app.dependency_overrides[get_db] = no_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("path", ["/albums", "/search?q=blue", "/albums/a1"])
+def test_routes_reject_unknown_fields(client, path):
+    separator = "&" if "?" in path else "?"
+    response = client.get(f"{path}{separator}fields=title,bogus")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: bogus"
@@ -0,0 +1,293 @@
+import asyncio
+import fnmatch
+import json
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.services import response_cache
+from app.services.cache import LRUCache
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def set(self, *args, **kwargs):
+        self.calls.append(self.redis.set(*args, **kwargs))
+
+    def smembers(self, key):
+        self.calls.append(self.redis.smembers(key))
+
+    async def execute(self):
+        return [await call for call in self.calls]
+
+
+class FakeRedis:
+    """The subset of redis.asyncio used by response_cache (decode_responses=True)."""
+
+    def __init__(self):
+        self.data = {}
+        self.sets = {}
+        self.gets = 0
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise RedisConnectionError("redis is down")
+
+    async def get(self, key):
+        self._check()
+        self.gets += 1
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        self._check()
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value)
+        return True
+
+    async def incr(self, key):
+        value = int(self.data.get(key, 0)) + 1
+        self.data[key] = str(value)
+        return value
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += (self.data.pop(key, None) is not None) + (self.sets.pop(key, None) is not None)
+        return removed
+
+    async def scan_iter(self, match, count=None):
+        for key in [*self.data, *self.sets]:
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def eval(self, script, numkeys, *args):
+        """Python versions of the Lua scripts."""
+        self._check()
+        keys, argv = args[:numkeys], args[numkeys:]
+        if script == response_cache._RELEASE_LOCK:
+            if self.data.get(keys[0]) == argv[0]:
+                return await self.delete(keys[0])
+            return 0
+        if script == response_cache._STORE_IF_CURRENT:
+            n = int(argv[3])
+            started = int(argv[0])
+            for key in keys[1:n + 1]:
+                generation = self.data.get(key)
+                if generation is not None and int(generation) > started:
+                    return 0
+            self.data[keys[0]] = argv[1]
+            for key in keys[n + 1:]:
+                self.sets.setdefault(key, set()).add(keys[0])
+            return 1
+        raise AssertionError("unexpected script")
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(response_cache, "redis_client", fake)
+    monkeypatch.setattr(response_cache, "stats", dict.fromkeys(response_cache.stats, 0))
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_POLL_SECONDS", 0.001)
+    return fake
+
+
+class Compute:
+    """compute() stand-in that counts calls and can run a hook while computing."""
+
+    def __init__(self, payload=None, during=None):
+        self.payload = {"id": "a1", "title": "Blue"} if payload is None else payload
+        self.during = during
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.during is not None:
+            await self.during()
+        return self.payload
+
+
+def _data(body):
+    return json.loads(body)["data"]
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_miss_computes_and_stores_then_hits(redis):
+    compute = Compute()
+    body = _run(response_cache.get_or_compute("album:a1", 3, compute))
+    assert _data(body) == compute.payload
+    assert redis.data["resp:3:album:a1"] == body
+    assert _run(response_cache.get_or_compute("album:a1", 3, compute)) == body
+    assert compute.calls == 1
+    assert response_cache.stats["hits"] == 1
+    # Untagged entries are scoped to the catalog version
+    _run(response_cache.get_or_compute("album:a1", 4, compute))
+    assert compute.calls == 2
+
+
+def test_missing_entities_are_not_cached(redis):
+    async def missing():
+        return None
+
+    assert _run(response_cache.get_or_compute("album:x", 3, missing, tags=["album:x"])) is None
+    assert "resp:t:album:x" not in redis.data
+
+
+def test_lock_is_released_after_compute_and_after_errors(redis):
+    _run(response_cache.get_or_compute("album:a1", 3, Compute()))
+    assert "resp-lock:3:album:a1" not in redis.data
+
+    async def failing():
+        raise RuntimeError("db error")
+
+    with pytest.raises(RuntimeError):
+        _run(response_cache.get_or_compute("album:a2", 3, failing))
+    assert "resp-lock:3:album:a2" not in redis.data
+
+
+def test_requests_in_one_worker_share_one_compute(redis):
+    compute = Compute()
+
+    async def burst():
+        return await asyncio.gather(*(response_cache.get_or_compute("album:a1", 3, compute) for _ in range(5)))
+
+    bodies = _run(burst())
+    assert len(set(bodies)) == 1
+    assert compute.calls == 1
+    assert response_cache.stats["coalesced"] == 4
+
+
+def test_lock_held_by_another_worker_waits_for_its_body(redis):
+    redis.data["resp-lock:3:album:a1"] = "other-worker"
+    compute = Compute()
+
+    async def other_worker_finishes():
+        await asyncio.sleep(0.01)
+        redis.data["resp:3:album:a1"] = '{"data":{"from":"other"},"meta":null}'
+
+    async def scenario():
+        other = asyncio.create_task(other_worker_finishes())
+        body = await response_cache.get_or_compute("album:a1", 3, compute)
+        await other
+        return body
+
+    assert _data(_run(scenario())) == {"from": "other"}
+    assert compute.calls == 0
+    assert response_cache.stats["waited"] == 1
+    # The other worker's lock is not released by the waiter
+    assert redis.data["resp-lock:3:album:a1"] == "other-worker"
+
+
+def test_lock_held_too_long_computes_without_storing_over_it(redis, monkeypatch):
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_WAIT_SECONDS", 0.01)
+    redis.data["resp-lock:3:album:a1"] = "other-worker"
+    compute = Compute()
+    body = _run(response_cache.get_or_compute("album:a1", 3, compute))
+    assert _data(body) == compute.payload and compute.calls == 1
+    assert redis.data["resp-lock:3:album:a1"] == "other-worker"
+
+
+def test_tagged_entries_are_evicted_by_tag(redis):
+    _run(response_cache.get_or_compute("album:a1", 3, Compute(), tags=["album:a1"]))
+    _run(response_cache.get_or_compute("album:a2", 3, Compute(), tags=["album:a2"]))
+    assert redis.sets["resp-tag:album:a1"] == {"resp:t:album:a1"}
+
+    assert _run(response_cache.evict_tags(["album:a1"])) == 1
+    assert "resp:t:album:a1" not in redis.data and "resp-tag:album:a1" not in redis.sets
+    assert "resp:t:album:a2" in redis.data
+
+
+def test_tags_can_be_derived_from_the_payload(redis):
+    compute = Compute({"id": "a1", "creators": ["c1", "c2"]})
+    tags = lambda data: [f"creator:{c}" for c in data["creators"]]
+    _run(response_cache.get_or_compute("album:a1", 3, compute, tags=tags))
+    assert set(redis.sets) == {"resp-tag:creator:c1", "resp-tag:creator:c2"}
+
+
+def test_tag_evicted_during_compute_is_not_stored(redis):
+    compute = Compute(during=lambda: response_cache.evict_tags(["album:a1"]))
+    body = _run(response_cache.get_or_compute("album:a1", 3, compute, tags=["album:a1"]))
+    # The caller still gets the body, but the stale copy is not shared
+    assert _data(body) == compute.payload
+    assert "resp:t:album:a1" not in redis.data
+    assert response_cache.stats["stale_skips"] == 1
+
+    compute.during = None
+    _run(response_cache.get_or_compute("album:a1", 3, compute, tags=["album:a1"]))
+    assert "resp:t:album:a1" in redis.data
+
+
+def test_evict_all_during_compute_is_not_stored(redis):
+    compute = Compute(during=response_cache.evict_all_tagged)
+    _run(response_cache.get_or_compute("album:a1", 3, compute, tags=["album:a1"]))
+    assert "resp:t:album:a1" not in redis.data
+
+
+def test_eviction_of_other_tags_during_compute_does_not_block_the_store(redis):
+    compute = Compute(during=lambda: response_cache.evict_tags(["album:a2"]))
+    _run(response_cache.get_or_compute("album:a1", 3, compute, tags=["album:a1"]))
+    assert "resp:t:album:a1" in redis.data
+
+
+def test_eviction_generation_older_than_the_compute_does_not_block_the_store(redis):
+    _run(response_cache.evict_tags(["album:a1"]))
+    assert redis.data["resp-gen:album:a1"] == "1"
+    _run(response_cache.get_or_compute("album:a1", 3, Compute(), tags=["album:a1"]))
+    assert "resp:t:album:a1" in redis.data
+
+
+def test_redis_down_computes_directly(redis):
+    redis.down = True
+    compute = Compute()
+    body = _run(response_cache.get_or_compute("album:a1", 3, compute, tags=["album:a1"]))
+    assert _data(body) == compute.payload
+    assert response_cache.stats["errors"] == 1
+
+
+def test_local_layer_is_checked_before_redis(redis):
+    local = LRUCache("test", max_entries=10, ttl_seconds=60)
+    compute = Compute()
+    body = _run(response_cache.get_or_compute("album:a1", 3, compute, tags=["album:a1"], local=local))
+    gets = redis.gets
+    assert _run(response_cache.get_or_compute("album:a1", 3, compute, tags=["album:a1"], local=local)) == body
+    assert redis.gets == gets and compute.calls == 1
+    assert response_cache.stats["local_hits"] == 1
+
+    # Evicting the tag locally sends the next request back to Redis
+    local.invalidate_tags(["album:a1"])
+    assert _run(response_cache.get_or_compute("album:a1", 3, compute, tags=["album:a1"], local=local)) == body
+    assert redis.gets > gets
+
+
+def test_redis_hits_fill_the_local_layer_with_tags_from_the_body(redis):
+    redis.data["resp:t:album:a1"] = '{"data":{"id":"a1","creators":["c1"]},"meta":null}'
+    local = LRUCache("test", max_entries=10, ttl_seconds=60)
+    tags = lambda data: [f"album:{data['id']}"] + [f"creator:{c}" for c in data["creators"]]
+    _run(response_cache.get_or_compute("album:a1", 3, Compute(), tags=tags, local=local))
+    assert local.invalidate_tags(["creator:c1"]) == 1
+
+
+def test_local_store_is_skipped_when_its_tag_is_evicted_during_the_fetch(redis):
+    local = LRUCache("test", max_entries=10, ttl_seconds=60)
+
+    async def evict_locally():
+        await asyncio.sleep(0.001)
+        local.invalidate_tags(["album:a1"])
+
+    compute = Compute(during=evict_locally)
+    _run(response_cache.get_or_compute("album:a1", 3, compute, tags=["album:a1"], local=local))
+    assert len(local) == 0
@@ -0,0 +1,53 @@
+import json
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.schemas import AlbumResponse, MapPoint
+from app.services import json_encoding
+from app.services.albums import _album_columns_spec, album_row_dict, map_point_row_dict
+
+
+def _album_row(**overrides):
+    row = dict(
+        album_group_id="a1", title="Blue", primary_artist_display="Joni Mitchell", original_year=1971,
+        primary_genre="Folk", country_code="Canada", cover_url="https://example.com/blue.jpg", popularity=0.8,
+        earliest_release_date=date(1971, 6, 22), created_at=datetime(2024, 1, 1, 12, tzinfo=timezone.utc),
+        x=1971.4, y=0.3, size=6.0,
+    )
+    row.update(overrides)
+    return SimpleNamespace(**row)
+
+
+@pytest.mark.parametrize("row", [
+    _album_row(),
+    _album_row(original_year=None, primary_genre=None, country_code=None, popularity=None, earliest_release_date=None),
+])
+def test_album_row_dict_encodes_like_the_response_model(row):
+    fast = json.loads(json_encoding.dumps(album_row_dict(row)))
+    model = AlbumResponse(**album_row_dict(row)).model_dump(mode="json")
+    # Same instant; pydantic writes UTC as "Z", orjson and isoformat() as "+00:00"
+    assert datetime.fromisoformat(fast.pop("created_at")) == datetime.fromisoformat(model.pop("created_at"))
+    assert fast == model
+
+
+def test_map_point_row_dict_matches_the_model():
+    row = _album_row()
+    assert MapPoint(**map_point_row_dict(row)).model_dump() == map_point_row_dict(row)
+
+
+def test_full_columnar_spec_has_the_album_row_fields():
+    assert [name for name, _, _ in _album_columns_spec(None)] == list(album_row_dict(_album_row()))
+
+
+def test_projected_columnar_spec_keeps_the_column_order():
+    assert [name for name, _, _ in _album_columns_spec(["size", "title", "id"])] == ["id", "title", "size"]
+
+
+def test_fallback_encoder_matches_orjson(monkeypatch):
+    payload = {"data": [album_row_dict(_album_row())], "meta": {"catalog_version": 3, "title": "Björk"}}
+    fast = json_encoding.dumps(payload)
+    monkeypatch.setattr(json_encoding, "orjson", None)
+    assert json_encoding.dumps(payload) == fast
+    assert json_encoding.loads(fast) == json.loads(fast)
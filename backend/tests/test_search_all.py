@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.search import SEARCH_RESULT_BUILDERS, get_search_result_rows
+from app.services.search import SEARCH_TYPE_WEIGHTS, parse_search_types, search_all
+
+
+def test_parse_search_types_defaults_to_all():
+    assert parse_search_types(None) == list(SEARCH_TYPE_WEIGHTS)
+
+
+@pytest.mark.parametrize("types, expected", [
+    ("album", ["album"]),
+    ("track, artist", ["track", "artist"]),
+    ("artist,artist,album", ["artist", "album"]),
+    (" album ,, ", ["album"]),
+])
+def test_parse_search_types(types, expected):
+    assert parse_search_types(types) == expected
+
+
+@pytest.mark.parametrize("types", ["", " , ", "albums", "album,playlist"])
+def test_parse_search_types_rejects_unknown_or_empty(types):
+    with pytest.raises(ValueError):
+        parse_search_types(types)
+
+
+@pytest.mark.parametrize("kind", list(SEARCH_RESULT_BUILDERS))
+def test_builders_skip_queries_without_word_characters(kind):
+    assert SEARCH_RESULT_BUILDERS[kind]("!!!", 10, 1.0) is None
+
+
+@pytest.mark.parametrize("kind", list(SEARCH_RESULT_BUILDERS))
+def test_scores_treat_null_name_keys_as_no_match(kind):
+    stmt = SEARCH_RESULT_BUILDERS[kind]("ac/dc", 10, SEARCH_TYPE_WEIGHTS[kind])
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "CAST(coalesce(" in sql
+    assert "DESC NULLS LAST" in sql
+
+
+def test_empty_queries_never_reach_the_database():
+    # db=None: any query would fail
+    assert asyncio.run(search_all(None, "   ")) == []
+    assert asyncio.run(get_search_result_rows(None, "!!!", 10, dict(SEARCH_TYPE_WEIGHTS))) == []
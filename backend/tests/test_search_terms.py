@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.albums import SEARCH_CONFIG, album_search_terms, search_tsquery
+
+
+def _compile(expr):
+    return expr.compile(dialect=postgresql.dialect())
+
+
+@pytest.mark.parametrize("q", ["", "   ", "!!!", "/-/"])
+def test_no_word_characters_means_no_tsquery(q):
+    assert search_tsquery(q) is None
+    assert album_search_terms(q) is None
+
+
+@pytest.mark.parametrize("q", ["AC/DC", "o'neil", "back\\slash", "dark side"])
+def test_query_is_tokenized_by_postgres(q):
+    compiled = _compile(search_tsquery(q))
+    sql = str(compiled)
+    # Lexemes come from the search_vector parser, with no tokenizing in Python
+    assert "to_tsvector(CAST(%(param_1)s AS REGCONFIG), %(to_tsvector_1)s)" in sql
+    assert compiled.params["param_1"] == SEARCH_CONFIG
+    assert compiled.params["to_tsvector_1"] == q
+    assert sql.startswith("CAST(") and sql.endswith("AS TSQUERY)")
+
+
+def test_lexemes_are_quoted_prefix_terms():
+    compiled = _compile(search_tsquery("dark side"))
+    assert "string_agg(concat(" in str(compiled)
+    assert compiled.params["concat_1"] == "'"
+    assert compiled.params["concat_2"] == "':*"
+    assert compiled.params["string_agg_2"] == " & "
+
+
+def test_first_tier_is_never_null():
+    first_tier, _, _ = album_search_terms("AC/DC")
+    assert str(_compile(first_tier)).startswith("coalesce(")
@@ -0,0 +1,106 @@
+import asyncio
+import gzip
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import snapshot
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('"a"', True),
+    ('"b", "a"', True),
+    ("*", True),
+    ('W/"a"', False),
+    ('"b"', False),
+])
+def test_etag_matches_is_strong(header, expected):
+    assert snapshot.etag_matches(header, '"a"') is expected
+
+
+@pytest.mark.parametrize("header, encoding, expected", [
+    (None, "gzip", False),
+    ("gzip, deflate, br", "br", True),
+    ("GZIP", "gzip", True),
+    ("br;q=0, gzip", "br", False),
+    ("br; q=0.0", "br", False),
+    ("br;q=0.5", "br", True),
+    ("*", "br", True),
+    ("deflate", "gzip", False),
+])
+def test_accepts_encoding(header, encoding, expected):
+    assert snapshot.accepts_encoding(header, encoding) is expected
+
+
+def test_each_encoding_has_its_own_etag():
+    manifest = {"etag": '"catalog-3-abc"'}
+    assert snapshot.snapshot_etag(manifest, None) == '"catalog-3-abc"'
+    assert snapshot.snapshot_etag(manifest, "br") == '"catalog-3-abc-br"'
+    assert snapshot.snapshot_etag(manifest, "gzip") == '"catalog-3-abc-gzip"'
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "CATALOG_SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(snapshot, "album_row_dict", lambda r: r)
+    monkeypatch.setattr(snapshot, "_manifest_cache", {"mtime": None, "manifest": None})
+    return tmp_path
+
+
+def _build(monkeypatch, version, albums):
+    async def read_stable_version(db):
+        return version
+
+    async def get_all_album_rows(db, limit, offset):
+        return albums
+
+    monkeypatch.setattr(snapshot, "read_stable_version", read_stable_version)
+    monkeypatch.setattr(snapshot.album_repo, "get_all_album_rows", get_all_album_rows)
+    return asyncio.run(snapshot.build_catalog_snapshot(None))
+
+
+def test_build_writes_compressed_payload_and_manifest(snapshot_dir, monkeypatch):
+    manifest = _build(monkeypatch, 5, [{"id": "a1"}, {"id": "a2"}])
+    assert manifest["version"] == 5 and manifest["albums"] == 2
+    assert set(manifest["files"]) == {"gzip", "br"}
+    with open(snapshot.snapshot_path(manifest, "gzip"), "rb") as f:
+        payload = json.loads(gzip.decompress(f.read()))
+    assert payload == {"data": [{"id": "a1"}, {"id": "a2"}], "meta": {"catalog_version": 5}}
+    assert snapshot.read_manifest() == manifest
+
+
+def test_etag_follows_the_content(snapshot_dir, monkeypatch):
+    first = _build(monkeypatch, 5, [{"id": "a1"}])["etag"]
+    assert _build(monkeypatch, 5, [{"id": "a1"}])["etag"] == first
+    assert _build(monkeypatch, 5, [{"id": "a2"}])["etag"] != first
+
+
+def test_only_the_previous_version_is_kept(snapshot_dir, monkeypatch):
+    for version in (1, 2, 3):
+        _build(monkeypatch, version, [])
+    names = sorted(n for n in os.listdir(snapshot_dir) if n.startswith("catalog-"))
+    assert names == ["catalog-2.json.br", "catalog-2.json.gz", "catalog-3.json.br", "catalog-3.json.gz"]
+
+
+def test_route_serves_the_negotiated_encoding_and_304s(snapshot_dir, monkeypatch):
+    manifest = _build(monkeypatch, 5, [{"id": "a1"}])
+    http = TestClient(app)
+
+    response = http.get("/catalog/snapshot", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == snapshot.snapshot_etag(manifest, "gzip")
+    assert response.json()["meta"] == {"catalog_version": 5}
+
+    etag = response.headers["etag"]
+    assert http.get("/catalog/snapshot", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}).status_code == 304
+    # The gzip validator does not match the brotli representation
+    assert http.get("/catalog/snapshot", headers={"Accept-Encoding": "br", "If-None-Match": etag}).status_code == 200
+
+
+def test_route_without_a_snapshot_is_404(snapshot_dir):
+    assert TestClient(app).get("/catalog/snapshot").status_code == 404
@@ -0,0 +1,99 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import albums as album_service
+from app.services import streaming
+from app.services.pagination import decode_album_cursor
+
+
+class FakeResult:
+    def __init__(self, partitions):
+        self._partitions = partitions
+
+    async def partitions(self):
+        for partition in self._partitions:
+            yield partition
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def session(monkeypatch):
+    monkeypatch.setattr(streaming, "AsyncSessionLocal", FakeSession)
+
+
+def _opener(partitions, calls=None):
+    async def open_stream(db, *args):
+        if calls is not None:
+            calls.append(args)
+        return FakeResult(partitions)
+    return open_stream
+
+
+def _collect(stream):
+    async def run():
+        return [chunk async for chunk in stream]
+    return asyncio.run(run())
+
+
+def _lines(chunks):
+    return [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+
+def test_one_chunk_per_partition():
+    calls = []
+    chunks = _collect(streaming.stream_ndjson(_opener([[1, 2], [3]], calls), lambda n: {"n": n}, "a", 5))
+    assert len(chunks) == 2
+    assert _lines(chunks) == [{"n": 1}, {"n": 2}, {"n": 3}]
+    assert calls == [("a", 5)]
+
+
+def test_meta_line_comes_last_with_the_last_row_and_count():
+    chunks = _collect(streaming.stream_ndjson(
+        _opener([[1, 2], [3]]), lambda n: {"n": n}, meta=lambda last, count: {"last": last, "count": count}
+    ))
+    assert _lines(chunks)[-1] == {"meta": {"last": 3, "count": 3}}
+
+
+def test_meta_line_for_an_empty_stream():
+    chunks = _collect(streaming.stream_ndjson(
+        _opener([]), lambda n: {"n": n}, meta=lambda last, count: {"last": last, "count": count}
+    ))
+    assert _lines(chunks) == [{"meta": {"last": None, "count": 0}}]
+
+
+def test_iter_ndjson():
+    assert _lines(_collect(streaming.iter_ndjson([{"a": 1}, {"b": 2}]))) == [{"a": 1}, {"b": 2}]
+
+
+def _album_row(album_id):
+    return SimpleNamespace(album_group_id=album_id, created_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+
+def _stream_albums(monkeypatch, rows, limit):
+    monkeypatch.setattr(album_service.album_repo, "stream_all_album_rows", _opener([rows]))
+    stream = album_service.stream_albums(limit, 0, fields=["id"], catalog_version=7)
+    return _lines(_collect(stream))
+
+
+def test_album_stream_ends_with_next_cursor_on_a_full_page(monkeypatch):
+    lines = _stream_albums(monkeypatch, [_album_row("a1"), _album_row("a2")], limit=2)
+    assert [line["id"] for line in lines[:-1]] == ["a1", "a2"]
+    meta = lines[-1]["meta"]
+    assert meta["catalog_version"] == 7
+    assert decode_album_cursor(meta["next_cursor"])[1] == "a2"
+
+
+def test_album_stream_has_no_next_cursor_on_the_last_page(monkeypatch):
+    lines = _stream_albums(monkeypatch, [_album_row("a1")], limit=2)
+    assert lines[-1] == {"meta": {"catalog_version": 7, "next_cursor": None}}
@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services.suggest import SuggestIndex
+
+
+def _album(album_id, title, artist="Artist", popularity=0.5):
+    return SimpleNamespace(album_group_id=album_id, title=title, primary_artist_display=artist, popularity=popularity)
+
+
+def _creator(creator_id, name, popularity=0.5):
+    return SimpleNamespace(creator_id=creator_id, display_name=name, popularity=popularity)
+
+
+def _index(albums=(), creators=()):
+    index = SuggestIndex()
+    index.set_albums(albums)
+    index.set_creators(creators)
+    asyncio.run(index.rebuild())
+    return index
+
+
+def _ids(results):
+    return [r.id for r in results]
+
+
+def test_matches_any_word_start():
+    index = _index([_album("a1", "The Dark Side of the Moon", "Pink Floyd")])
+    assert _ids(index.query("moon")) == ["a1"]
+    assert _ids(index.query("side of")) == ["a1"]
+    assert _ids(index.query("dark")) == ["a1"]
+    assert index.query("oon") == []
+
+
+def test_query_is_normalized():
+    index = _index([_album("a1", "Björk: Début")], [_creator("c1", "AC/DC")])
+    assert _ids(index.query("BJORK deb")) == ["a1"]
+    assert _ids(index.query("ac dc")) == ["c1"]
+
+
+def test_most_popular_first_and_limit():
+    index = _index([_album(f"a{i}", f"Blue {i}", popularity=i / 10) for i in range(10)])
+    assert _ids(index.query("blue", limit=3)) == ["a9", "a8", "a7"]
+
+
+def test_entry_matching_several_word_starts_is_listed_once():
+    index = _index([_album("a1", "Love Love Love", popularity=0.9), _album("a2", "Lovesong", popularity=0.1)])
+    assert _ids(index.query("love")) == ["a1", "a2"]
+
+
+def test_albums_and_artists():
+    index = _index([_album("a1", "Abbey Road", "The Beatles", 0.8)], [_creator("c1", "ABBA", 0.9)])
+    results = index.query("ab")
+    assert [(r.type, r.id) for r in results] == [("artist", "c1"), ("album", "a1")]
+    assert results[1].sublabel == "The Beatles"
+
+
+def test_hangul_prefix_and_initials():
+    index = _index([], [_creator("c1", "방탄소년단"), _creator("c2", "아이유")])
+    assert _ids(index.query("방탄")) == ["c1"]
+    # A syllable still being typed is a prefix of the finished one
+    assert _ids(index.query("방ㅌ")) == ["c1"]
+    assert _ids(index.query("ㅂㅌㅅ")) == ["c1"]
+    assert _ids(index.query("ㅇㅇ")) == ["c2"]
+
+
+def test_hangul_initials_per_word_start():
+    index = _index([_album("a1", "봄날 소년단")])
+    assert _ids(index.query("ㅂㄴㅅ")) == ["a1"]
+    assert _ids(index.query("ㅅㄴ")) == ["a1"]
+
+
+def test_remove_albums_and_replace_creators():
+    index = _index([_album("a1", "Nevermind"), _album("a2", "Nevada")], [_creator("c1", "Nena")])
+    index.remove_albums(["a1", "missing"])
+    index.set_creators([_creator("c2", "Neil Young")])
+    asyncio.run(index.rebuild())
+    assert sorted(_ids(index.query("ne"))) == ["a2", "c2"]
+
+
+def test_null_popularity_and_empty_keys():
+    # Titles made only of punctuation have no key and never match
+    index = _index([_album("a1", "...", popularity=None), _album("a2", "Nothing", popularity=None)])
+    assert [r.popularity for r in index.query("no")] == [0.0]
+    assert index.query("") == []
+    assert index.query("...") == []
+    assert index.query("   ") == []
+
+
+def test_empty_index():
+    index = SuggestIndex()
+    assert not index.ready
+    assert index.query("a") == []
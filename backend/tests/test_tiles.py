@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+from app.services.common import MAP_X_MAX, MAP_X_MIN, MAP_Y_MAX, MAP_Y_MIN
+from app.services.tiles import (
+    TILE_MAX_ZOOM,
+    TILE_POINT_LIMIT,
+    build_tile_points,
+    is_valid_tile,
+    tile_bounds,
+    tile_for_point,
+    tile_keys_for_points,
+)
+
+
+def _row(i, x, y, country_code="US"):
+    return SimpleNamespace(album_group_id=f"a{i}", title=f"t{i}", x=x, y=y, size=1.0, country_code=country_code)
+
+
+def test_is_valid_tile():
+    assert is_valid_tile(0, 0, 0)
+    assert is_valid_tile(2, 3, 3)
+    assert not is_valid_tile(2, 4, 0)
+    assert not is_valid_tile(-1, 0, 0)
+    assert not is_valid_tile(TILE_MAX_ZOOM + 1, 0, 0)
+
+
+def test_tile_for_point_lies_inside_its_bounds():
+    x, y = 1987.3, 0.42
+    for z in range(TILE_MAX_ZOOM + 1):
+        _, tx, ty = tile_for_point(z, x, y)
+        x1, x2, y1, y2 = tile_bounds(z, tx, ty)
+        assert x1 <= x < x2 and y1 <= y < y2
+
+
+def test_tile_for_point_clamps_outliers_into_edge_tiles():
+    n = 1 << 3
+    assert tile_for_point(3, MAP_X_MIN - 100, MAP_Y_MIN - 1) == (3, 0, 0)
+    assert tile_for_point(3, MAP_X_MAX + 100, MAP_Y_MAX + 1) == (3, n - 1, n - 1)
+    # Albums without a year sit at x = 0
+    assert tile_for_point(3, 0.0, 0.5)[1] == 0
+
+
+def test_tile_keys_cover_every_zoom():
+    keys = tile_keys_for_points([(1990.0, 0.5)])
+    assert sorted(z for z, _, _ in keys) == list(range(TILE_MAX_ZOOM + 1))
+
+
+def test_sparse_tile_keeps_raw_points():
+    rows = [_row(i, 1990.0 + i * 0.1, 0.5) for i in range(3)]
+    points = build_tile_points(0, rows)
+    assert [p["id"] for p in points] == ["a0", "a1", "a2"]
+    assert not any(p["is_cluster"] for p in points)
+
+
+def test_dense_tile_is_clustered_and_keeps_every_album():
+    rows = [_row(i, 1990.0, 0.5, country_code=None) for i in range(TILE_POINT_LIMIT + 1)]
+    points = build_tile_points(0, rows)
+    assert len(points) == 1
+    assert points[0]["is_cluster"] and points[0]["count"] == TILE_POINT_LIMIT + 1
+    # NULL country codes fall into the "Unknown" region
+    assert points[0]["color"] == "Unknown"
+
+
+def test_deepest_level_never_clusters():
+    rows = [_row(i, 1990.0, 0.5) for i in range(TILE_POINT_LIMIT + 1)]
+    assert len(build_tile_points(TILE_MAX_ZOOM, rows)) == TILE_POINT_LIMIT + 1
@@ -0,0 +1,56 @@
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+from app.repositories import albums as album_repo
+
+
+def _compile(stmt):
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+class RecordingSession:
+    def __init__(self):
+        self.executed = []
+
+    async def execute(self, stmt, params=None):
+        self.executed.append(stmt)
+        return self
+
+    def first(self):
+        return None
+
+
+def test_thresholds_are_set_for_the_transaction_only():
+    db = RecordingSession()
+    asyncio.run(album_repo.set_trigram_thresholds(db, similarity=0.3, word_similarity=0.5))
+    compiled = _compile(db.executed[0])
+    assert str(compiled).count("set_config(") == 2
+    params = list(compiled.params.values())
+    assert ["pg_trgm.similarity_threshold", "0.3", True] == params[:3]
+    assert ["pg_trgm.word_similarity_threshold", "0.5", True] == params[3:]
+
+
+def test_no_thresholds_means_no_round_trip():
+    db = RecordingSession()
+    asyncio.run(album_repo.set_trigram_thresholds(db))
+    assert db.executed == []
+
+
+def test_search_matches_word_similar_titles_and_artists_after_full_text():
+    sql = str(_compile(album_repo._search_album_rows_stmt("beatels", 20)))
+    # The operator form, not word_similarity() > x, so the GIN trigram indexes apply
+    assert "album_groups.title %%> " in sql
+    assert "album_groups.primary_artist_display %%> " in sql
+    order_by = sql.split("ORDER BY", 1)[1]
+    assert order_by.index("@@") < order_by.index("word_similarity(")
+
+
+def test_fuzzy_artist_lookup_orders_by_similarity():
+    db = RecordingSession()
+    asyncio.run(album_repo.get_artist_profile_fuzzy(db, "radiohed", threshold=0.3))
+    set_thresholds, lookup = db.executed
+    assert "pg_trgm.similarity_threshold" in _compile(set_thresholds).params.values()
+    sql = str(_compile(lookup))
+    assert "creators.display_name %% " in sql
+    assert sql.split("ORDER BY", 1)[1].lstrip().startswith("similarity(creators.display_name")
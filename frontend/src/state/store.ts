@@ -137,6 +137,28 @@ const transformAlbumData = (backendAlbum: any): Album => {
   };
 };
 
+/**
+ * 스냅샷 이후의 변경분(/catalog/changes?since=<스냅샷 버전>)을 적용합니다
+ * - 스냅샷은 스크립트 실행 시점에만 갱신되므로 그 사이 변경을 따라잡음
+ * - reset이면 변경 로그로 따라잡을 수 없으므로 null 반환 (/albums로 다시 로드)
+ */
+async function applyCatalogChanges(albums: Album[], since: number): Promise<Album[] | null> {
+  const response = await fetch(`${BACKEND_URL}/catalog/changes?since=${since}`);
+  if (!response.ok) {
+    throw new Error(`Failed to load catalog changes: ${response.status}`);
+  }
+
+  const changes = (await response.json()).data;
+  if (changes.reset) return null;
+  if (changes.upserted.length === 0 && changes.deleted.length === 0) return albums;
+
+  const byId = new Map(albums.map(album => [album.id, album]));
+  for (const id of changes.deleted) byId.delete(id);
+  for (const change of changes.upserted) byId.set(change.id, transformAlbumData(change));
+  console.log(`🔁 Applied catalog changes ${since} → ${changes.version}: ${changes.upserted.length} upserted, ${changes.deleted.length} deleted`);
+  return Array.from(byId.values());
+}
+
 export const useStore = create<AppState>((set, get) => ({
   albums: [],
   filteredAlbums: [],
@@ -161,9 +183,15 @@ export const useStore = create<AppState>((set, get) => ({
         console.warn('⚠️ Dev user initialization failed, but continuing:', err);
       });
       
-      console.log('🔄 Loading albums from:', `${BACKEND_URL}/albums?limit=50000`);
+      // 사전 빌드된 카탈로그 스냅샷 우선 (ETag 재검증), 없으면 /albums로 폴백
+      console.log('🔄 Loading albums from:', `${BACKEND_URL}/catalog/snapshot`);
       
-      const response = await fetch(`${BACKEND_URL}/albums?limit=50000`);
+      let response = await fetch(`${BACKEND_URL}/catalog/snapshot`);
+      const fromSnapshot = response.status !== 404;
+      if (!fromSnapshot) {
+        console.log('🔄 Snapshot not built, loading albums from:', `${BACKEND_URL}/albums?limit=50000`);
+        response = await fetch(`${BACKEND_URL}/albums?limit=50000`);
+      }
       
       if (!response.ok) {
         const errorText = await response.text().catch(() => 'Unknown error');
@@ -181,7 +209,22 @@ export const useStore = create<AppState>((set, get) => ({
       }
       
       // 백엔드 응답을 프론트엔드 타입으로 변환
-      const albums: Album[] = data.data.map(transformAlbumData);
+      let albums: Album[] = data.data.map(transformAlbumData);
+
+      // 스냅샷이면 그 버전 이후의 변경분까지 적용 (따라잡을 수 없으면 /albums로 다시 로드)
+      if (fromSnapshot && typeof data.meta?.catalog_version === 'number') {
+        const caughtUp = await applyCatalogChanges(albums, data.meta.catalog_version);
+        if (caughtUp) {
+          albums = caughtUp;
+        } else {
+          console.log('🔄 Snapshot too old for the change log, loading albums from:', `${BACKEND_URL}/albums?limit=50000`);
+          const fallback = await fetch(`${BACKEND_URL}/albums?limit=50000`);
+          if (!fallback.ok) {
+            throw new Error(`HTTP error! status: ${fallback.status}`);
+          }
+          albums = (await fallback.json()).data.map(transformAlbumData);
+        }
+      }
       console.log(`✅ Loaded ${albums.length} albums`);
       
       const state = get();
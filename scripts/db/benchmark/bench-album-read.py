@@ -0,0 +1,116 @@
+"""
+Compare the /albums read paths in rows per second.
+
+  orm   select(AlbumGroup, MapNode) entities -> AlbumResponse models -> FastAPI
+        jsonable_encoder + json.dumps (the path /albums used before)
+  core  column tuples -> dicts -> json_encoding.dumps (the current path)
+
+Query, hydration and encoding are timed separately; the best of --runs is reported.
+
+Usage:
+  docker exec sonic_backend python scripts/db/benchmark/bench-album-read.py
+  docker exec sonic_backend python scripts/db/benchmark/bench-album-read.py --limit 50000 --runs 5
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from fastapi.encoders import jsonable_encoder
+
+# Docker 컨테이너 내부에서는 /app이 루트
+sys.path.insert(0, "/app")
+
+from app.database import DATABASE_URL
+from app.models import AlbumGroup, MapNode
+from app.repositories import albums as album_repo
+from app.schemas import AlbumResponse, APIResponse
+from app.services import json_encoding
+from app.services.albums import album_row_dict
+from app.services.common import country_to_region, genre_to_vibe
+
+
+async def run_orm(session, limit):
+    t0 = time.perf_counter()
+    stmt = (
+        select(AlbumGroup, MapNode)
+        .join(MapNode, AlbumGroup.album_group_id == MapNode.album_group_id)
+        .order_by(AlbumGroup.created_at.desc(), AlbumGroup.album_group_id.desc())
+        .limit(limit)
+    )
+    rows = (await session.execute(stmt)).all()
+    t1 = time.perf_counter()
+    albums = [
+        AlbumResponse(
+            id=ag.album_group_id,
+            title=ag.title,
+            artist_name=ag.primary_artist_display,
+            year=ag.original_year or 0,
+            genre=ag.primary_genre or "Unknown",
+            genre_vibe=genre_to_vibe(ag.primary_genre),
+            region_bucket=country_to_region(ag.country_code),
+            country=ag.country_code,
+            cover_url=ag.cover_url,
+            popularity=ag.popularity or 0.0,
+            release_date=ag.earliest_release_date,
+            created_at=ag.created_at,
+        )
+        for ag, mn in rows
+    ]
+    t2 = time.perf_counter()
+    body = json.dumps(jsonable_encoder(APIResponse(data=albums, meta={"catalog_version": 0}))).encode("utf-8")
+    t3 = time.perf_counter()
+    # 다음 실행이 identity map 재사용으로 빨라지지 않도록 비움
+    session.expunge_all()
+    return len(rows), len(body), (t1 - t0, t2 - t1, t3 - t2)
+
+
+async def run_core(session, limit):
+    t0 = time.perf_counter()
+    rows = (await album_repo.get_all_album_rows(session, limit, 0)).all()
+    t1 = time.perf_counter()
+    albums = [album_row_dict(r) for r in rows]
+    t2 = time.perf_counter()
+    body = json_encoding.dumps({"data": albums, "meta": {"catalog_version": 0, "next_cursor": None}})
+    t3 = time.perf_counter()
+    return len(rows), len(body), (t1 - t0, t2 - t1, t3 - t2)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_async_engine(DATABASE_URL, echo=False)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    encoder = "orjson" if json_encoding.orjson is not None else "json"
+    print(f"📊 limit={args.limit} runs={args.runs} encoder={encoder}")
+    async with async_session() as session:
+        # 워밍업 (커넥션, 쿼리 컴파일 캐시)
+        await run_core(session, 100)
+        await run_orm(session, 100)
+
+        for name, fn in (("orm", run_orm), ("core", run_core)):
+            best = None
+            for _ in range(args.runs):
+                count, size, timings = await fn(session, args.limit)
+                if best is None or sum(timings) < sum(best):
+                    best = timings
+            total = sum(best)
+            rate = count / total if total else 0.0
+            print(
+                f"  {name:<5} {count} rows, {size / 1024:.0f} KiB | "
+                f"query {best[0] * 1000:.0f} ms, build {best[1] * 1000:.0f} ms, encode {best[2] * 1000:.0f} ms | "
+                f"{rate:,.0f} rows/s"
+            )
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -17,6 +17,9 @@ from sqlalchemy import select, update
 # Docker 컨테이너 내부에서는 /app이 루트
 sys.path.insert(0, '/app')
 from app.models import AlbumGroup
+from app.services import invalidation
+from app.services import snapshot as snapshot_service
+from app.services.cache import album_tag
 
 # DB 연결
 DATABASE_URL = os.getenv(
@@ -44,6 +47,7 @@ async def update_musicbrainz_covers():
         print(f"📊 Found {len(albums)} MusicBrainz albums without covers")
         
         updated_count = 0
+        updated_ids = []
         for album in albums:
             # MusicBrainz Release Group ID 추출
             # 예: "musicbrainz:release-group:abc123" -> "abc123"
@@ -55,12 +59,18 @@ async def update_musicbrainz_covers():
                 # 앨범 업데이트
                 album.cover_url = cover_url
                 updated_count += 1
+                updated_ids.append(album.album_group_id)
                 
                 if updated_count % 50 == 0:
                     print(f"   ✅ Updated: {updated_count}/{len(albums)}")
         
-        # DB에 커밋
+        # DB에 커밋 후 API 캐시에서 해당 앨범 무효화
         await session.commit()
+        await invalidation.publish([album_tag(a) for a in updated_ids])
+        # cover_url은 /catalog/snapshot 페이로드에 포함되므로 스냅샷 재생성
+        if updated_ids:
+            manifest = await snapshot_service.build_catalog_snapshot(session)
+            print(f"   📦 Catalog snapshot rebuilt (version {manifest['version']})")
         print(f"\n✅ Successfully updated {updated_count} MusicBrainz album covers!")
         return updated_count
 
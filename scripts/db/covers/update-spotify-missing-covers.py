@@ -29,6 +29,10 @@ from sqlalchemy import select
 # Docker 컨테이너 내부에서는 /app이 루트
 sys.path.insert(0, "/app")
 from app.models import AlbumGroup
+from app.services import invalidation
+from app.services import snapshot as snapshot_service
+from app.services.cache import album_tag
+from app.services.normalization import normalize_key
 
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
@@ -49,11 +53,10 @@ DISCOGS_RATE_LIMIT_SEC = 1.1
 def normalize_text(text: str) -> str:
     if not text:
         return ""
-    text = text.lower()
+    # 괄호 안 부가 정보 (Remastered, Deluxe 등) 제거 후 공통 매칭 키로 정규화
     text = re.sub(r"\([^)]*\)", " ", text)
     text = re.sub(r"\[[^]]*\]", " ", text)
-    text = re.sub(r"[^a-z0-9]+", " ", text)
-    return re.sub(r"\s+", " ", text).strip()
+    return normalize_key(text)
 
 
 def similarity(a: str, b: str) -> float:
@@ -187,6 +190,7 @@ async def main():
         print(f"🖼️  Missing Spotify covers: {len(albums)} (limit={COVER_LIMIT or 'all'})")
 
         updated = 0
+        updated_ids = []
         async with httpx.AsyncClient(timeout=30) as client:
             for idx, album in enumerate(albums, start=1):
                 album_id = album.album_group_id
@@ -199,6 +203,7 @@ async def main():
                     cover_url = mb_cache[cache_key]["cover_url"]
                     if not DRY_RUN:
                         album.cover_url = cover_url
+                        updated_ids.append(album_id)
                     updated += 1
                     continue
 
@@ -228,6 +233,7 @@ async def main():
                         if cover_url:
                             if not DRY_RUN:
                                 album.cover_url = cover_url
+                                updated_ids.append(album_id)
                             updated += 1
                             continue
                     try:
@@ -253,6 +259,7 @@ async def main():
                 if cover_url:
                     if not DRY_RUN:
                         album.cover_url = cover_url
+                        updated_ids.append(album_id)
                     updated += 1
 
                 if idx % 50 == 0:
@@ -260,6 +267,11 @@ async def main():
 
             if not DRY_RUN:
                 await session.commit()
+                # 커밋 후 API 캐시에서 해당 앨범 무효화
+                await invalidation.publish([album_tag(a) for a in updated_ids])
+                # cover_url은 /catalog/snapshot 페이로드에 포함되므로 스냅샷 재생성
+                if updated_ids:
+                    await snapshot_service.build_catalog_snapshot(session)
 
     await engine.dispose()
     print(f"✅ Done. Updated covers: {updated}")
@@ -25,6 +25,10 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy import select, update
 from app.database import DATABASE_URL
 from app.models import AlbumGroup, Release
+from app.services import catalog as catalog_service
+from app.services import invalidation
+from app.services import snapshot as snapshot_service
+from app.services.cache import album_tag
 
 # Spotify API 설정
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
@@ -185,6 +189,7 @@ async def enrich_spotify_dates():
                 return
             
             updated = 0
+            updated_ids = []
             failed = 0
             cached = 0
             
@@ -213,6 +218,7 @@ async def enrich_spotify_dates():
                             await db.execute(release_stmt)
                             
                             updated += 1
+                            updated_ids.append(album.album_group_id)
                             cached += 1
                             
                             if idx % 50 == 0:
@@ -244,6 +250,7 @@ async def enrich_spotify_dates():
                     await db.execute(release_stmt)
                     
                     updated += 1
+                    updated_ids.append(album.album_group_id)
                     print(f"  ✅ 발매일: {release_date}")
                 else:
                     cache[album_id] = None
@@ -262,6 +269,12 @@ async def enrich_spotify_dates():
             # 최종 커밋 & 캐시 저장
             await db.commit()
             save_cache(cache)
+            # releases는 트리거 대상이 아니므로 카탈로그 버전을 올려 API 캐시/ETag 무효화
+            if updated:
+                await catalog_service.bump_catalog_version(db)
+                await invalidation.publish([album_tag(a) for a in updated_ids])
+                # 발매일은 /catalog/snapshot 페이로드에 포함되므로 스냅샷 재생성
+                await snapshot_service.build_catalog_snapshot(db)
     
     print("\n" + "="*60)
     print(f"✅ 완료!")
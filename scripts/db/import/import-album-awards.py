@@ -9,7 +9,6 @@ import asyncio
 import json
 import re
 import uuid
-import unicodedata
 from pathlib import Path
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
@@ -20,21 +19,16 @@ sys.path.insert(0, "/app")
 
 from app.database import DATABASE_URL, Base
 from app.models import AlbumGroup, AlbumAward
+from app.services import catalog as catalog_service
+from app.services import invalidation
+from app.services.cache import album_tag
+from app.services.normalization import normalize_key
 
 DEFAULT_SEED_FILES = [
     "/app/scripts/fetch/award_seeds.json",
     "/app/scripts/fetch/award_seeds_alltime.json",
 ]
 
-def normalize_text(value: str) -> str:
-    if not value:
-        return ""
-    text = unicodedata.normalize("NFKD", value)
-    text = "".join(ch for ch in text if not unicodedata.combining(ch))
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9]+", " ", text)
-    return " ".join(text.split())
-
 def parse_query(query: str):
     if not query:
         return None, None
@@ -63,8 +57,9 @@ def build_album_index(albums):
     by_album_artist = {}
     by_album_artist_year = {}
     for album in albums:
-        title = normalize_text(album.title)
-        artist = normalize_text(album.primary_artist_display)
+        # 저장된 매칭 키 사용 (백필 전 행은 직접 계산)
+        title = album.title_key or normalize_key(album.title)
+        artist = album.artist_key or normalize_key(album.primary_artist_display)
         if not title or not artist:
             continue
         key = f"{title}|||{artist}"
@@ -75,8 +70,8 @@ def build_album_index(albums):
     return by_album_artist, by_album_artist_year
 
 def find_album_id(by_album_artist, by_album_artist_year, title, artist, year):
-    norm_title = normalize_text(title)
-    norm_artist = normalize_text(artist)
+    norm_title = normalize_key(title)
+    norm_artist = normalize_key(artist)
     if not norm_title or not norm_artist:
         return None
     if year:
@@ -183,8 +178,12 @@ async def main():
     async with async_session() as session:
         session.add_all(new_awards)
         await session.commit()
+        # 수상 정보는 트리거 대상이 아니므로 카탈로그 버전을 직접 올림 (ETag 무효화)
+        version = await catalog_service.bump_catalog_version(session)
+    # 수상 정보가 추가된 앨범의 상세 캐시만 제거
+    await invalidation.publish([album_tag(a.album_group_id) for a in new_awards])
 
-    print("✅ album_awards import complete.")
+    print(f"✅ album_awards import complete. (catalog version {version})")
 
 if __name__ == "__main__":
     asyncio.run(main())
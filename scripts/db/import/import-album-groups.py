@@ -19,6 +19,9 @@ sys.path.insert(0, "/app")
 
 from app.database import DATABASE_URL, Base
 from app.models import AlbumGroup, MapNode, Release
+from app.services import catalog as catalog_service
+from app.services import invalidation
+from app.services.cache import ARTISTS_TAG
 
 JSON_PATH = Path("/out/albums_spotify_v3.json")
 
@@ -99,6 +102,7 @@ async def main():
             album_group_id=album_id,
             x=year or 0,
             y=genre_vibe,
+            vibe=genre_vibe,
             size=(popularity * 10) + 2
         ))
 
@@ -117,6 +121,15 @@ async def main():
         session.add_all(new_releases)
         await session.commit()
 
+    # 맵 레이아웃 / 타일 / 패싯 큐브 등 파생 데이터 갱신 (새 앨범 기준)
+    async with async_session() as session:
+        refreshed = await catalog_service.refresh_derived_data(
+            session, [n.album_group_id for n in new_nodes]
+        )
+        print(f"🗺️  Derived data refreshed: {refreshed}")
+    # 새 앨범은 아티스트 디스코그래피에만 영향 (앨범 캐시는 변경 로그로 정리됨)
+    await invalidation.publish([ARTISTS_TAG])
+
     print(f"✅ Import complete. Skipped: {skipped}")
 
 if __name__ == "__main__":
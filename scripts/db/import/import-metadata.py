@@ -28,6 +28,10 @@ from app.models import (
     AlbumCredit,
     Role,
 )
+from app.services import catalog as catalog_service
+from app.services import invalidation
+from app.services.albums import ALBUM_DETAILS_TAG
+from app.services.cache import ARTISTS_TAG
 
 # JSON 파일 경로
 ARTISTS_FILE = "/out/artists_spotify.json"
@@ -470,6 +474,13 @@ async def main():
     # Phase 3: 크레딧
     credits_count = await import_credits()
 
+    # 크리에이터/크레딧은 트리거 대상이 아니므로 카탈로그 버전을 직접 올림 (ETag 무효화)
+    async with async_session() as session:
+        version = await catalog_service.bump_catalog_version(session)
+    print(f"\n🔖 Catalog version: {version}")
+    # 아티스트 조회와 앨범 상세(크레딧)만 캐시에서 제거 (앨범 요약은 유지)
+    await invalidation.publish([ARTISTS_TAG, ALBUM_DETAILS_TAG])
+
     # 최종 통계
     await show_statistics()
 
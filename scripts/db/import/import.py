@@ -18,6 +18,9 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy import select
 from app.database import Base, DATABASE_URL
 from app.models import AlbumGroup, MapNode, Release
+from app.services import catalog as catalog_service
+from app.services import invalidation
+from app.services.cache import ARTISTS_TAG
 import uuid
 
 # Country to region mapping
@@ -259,6 +262,7 @@ async def import_albums():
             album_group_id=album_id,
             x=album_data.get('year') or 0,
             y=genre_vibe,
+            vibe=genre_vibe,
             size=(popularity * 10) + 2
         )
         release = Release(
@@ -311,6 +315,15 @@ async def import_albums():
     
     print(f"✅ Import complete! Total inserted: {total_inserted}")
     
+    # 맵 레이아웃 / 타일 / 패싯 큐브 등 파생 데이터 갱신 (새 앨범 기준)
+    async with async_session() as session:
+        refreshed = await catalog_service.refresh_derived_data(
+            session, [n.album_group_id for n in new_nodes]
+        )
+        print(f"🗺️  Derived data refreshed: {refreshed}")
+    # 새 앨범은 아티스트 디스코그래피에만 영향 (앨범 캐시는 변경 로그로 정리됨)
+    await invalidation.publish([ARTISTS_TAG])
+    
     # 7. 검증 (최종 카운트)
     async with async_session() as session:
         stmt = select(AlbumGroup)
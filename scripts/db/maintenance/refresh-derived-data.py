@@ -0,0 +1,45 @@
+"""
+Rebuild all data derived from album_groups
+(normalized name keys, map_nodes layout and min_zoom, map_tiles, album_facet_cube).
+
+Import scripts refresh derived data for the albums they touch; run this after
+bulk edits made outside those scripts or after changing layout/tile/cube settings.
+
+Usage:
+  docker exec sonic_backend python scripts/db/maintenance/refresh-derived-data.py
+  docker exec sonic_backend python scripts/db/maintenance/refresh-derived-data.py --changed-only
+  docker exec sonic_backend python scripts/db/maintenance/refresh-derived-data.py --keep-layout
+"""
+
+import asyncio
+import sys
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+# Docker 컨테이너 내부에서는 /app이 루트
+sys.path.insert(0, "/app")
+
+from app.database import DATABASE_URL, Base
+from app.services import catalog as catalog_service
+
+
+async def main():
+    engine = create_async_engine(DATABASE_URL, echo=False)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_session() as session:
+        # --changed-only: 신규/수정된 앨범이 속한 셀만 다시 배치
+        refreshed = await catalog_service.refresh_derived_data(
+            session,
+            layout="--keep-layout" not in sys.argv,
+            changed_only="--changed-only" in sys.argv,
+        )
+        print(f"✅ Derived data rebuilt: {refreshed}")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""
+Add performance indexes and derived columns to an existing database.
+
+Base.metadata.create_all only creates columns and indexes together with new
+tables, so databases created before they were declared in app/models.py need
+this script. Every statement is idempotent.
+
+The normalized name keys are then backfilled (only rows whose keys differ
+are written), since artist lookups and discographies match on them.
+
+Usage:
+  docker exec sonic_backend python scripts/db/migrate/migrate-indexes.py
+"""
+
+import asyncio
+import sys
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy import text
+
+# Docker 컨테이너 내부에서는 /app이 루트
+sys.path.insert(0, "/app")
+
+from app.database import DATABASE_URL
+from app.models import ALBUM_SEARCH_VECTOR_SQL, NAME_KEY_COLUMNS
+from app.services import invalidation
+from app.services import search as search_service
+from app.services.cache import ARTISTS_TAG
+
+MIGRATIONS = [
+    # /map/points viewport queries and map tile rebuilds
+    ("idx_map_nodes_xy", "CREATE INDEX IF NOT EXISTS idx_map_nodes_xy ON map_nodes (x, y)"),
+    # Level-of-detail sampling for /map/points (filled by refresh-derived-data.py)
+    ("map_nodes.min_zoom", "ALTER TABLE map_nodes ADD COLUMN IF NOT EXISTS min_zoom SMALLINT NOT NULL DEFAULT 0"),
+    ("idx_map_nodes_min_zoom", "CREATE INDEX IF NOT EXISTS idx_map_nodes_min_zoom ON map_nodes (min_zoom)"),
+    # Base genre vibe the layout spreads around (filled on the next layout from y)
+    ("map_nodes.vibe", "ALTER TABLE map_nodes ADD COLUMN IF NOT EXISTS vibe DOUBLE PRECISION"),
+    # Keyset pagination of /albums; rows without created_at would fall outside every page
+    ("album_groups.created_at backfill", "UPDATE album_groups SET created_at = now() WHERE created_at IS NULL"),
+    ("idx_album_groups_created_at_id", "CREATE INDEX IF NOT EXISTS idx_album_groups_created_at_id ON album_groups (created_at, album_group_id)"),
+    # Version bumps for catalog data without change triggers (creators, credits, awards)
+    ("catalog_change_type.refresh", "ALTER TYPE catalog_change_type ADD VALUE IF NOT EXISTS 'refresh'"),
+    # Ranked full-text search of albums (generated column; the ADD rewrites the table once)
+    (
+        "album_groups.search_vector",
+        f"ALTER TABLE album_groups ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({ALBUM_SEARCH_VECTOR_SQL}) STORED",
+    ),
+    ("idx_album_groups_search_vector", "CREATE INDEX IF NOT EXISTS idx_album_groups_search_vector ON album_groups USING gin (search_vector)"),
+    # Typo-tolerant artist lookup and album search
+    ("pg_trgm", "CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+    ("idx_creators_display_name_trgm", "CREATE INDEX IF NOT EXISTS idx_creators_display_name_trgm ON creators USING gin (display_name gin_trgm_ops)"),
+    ("idx_album_groups_title_trgm", "CREATE INDEX IF NOT EXISTS idx_album_groups_title_trgm ON album_groups USING gin (title gin_trgm_ops)"),
+    ("idx_album_groups_artist_trgm", "CREATE INDEX IF NOT EXISTS idx_album_groups_artist_trgm ON album_groups USING gin (primary_artist_display gin_trgm_ops)"),
+    ("idx_tracks_title_trgm", "CREATE INDEX IF NOT EXISTS idx_tracks_title_trgm ON tracks USING gin (title gin_trgm_ops)"),
+    # Normalized matching keys (filled by refresh-derived-data.py)
+    *[
+        (f"{table}.{column}", f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} varchar")
+        for table, specs in NAME_KEY_COLUMNS.items()
+        for _, key, initials in specs
+        for column in (key, initials)
+    ],
+    ("idx_creators_name_key", "CREATE INDEX IF NOT EXISTS idx_creators_name_key ON creators (name_key varchar_pattern_ops)"),
+    ("idx_creators_name_initials", "CREATE INDEX IF NOT EXISTS idx_creators_name_initials ON creators (name_initials varchar_pattern_ops)"),
+    ("idx_album_groups_title_key", "CREATE INDEX IF NOT EXISTS idx_album_groups_title_key ON album_groups (title_key varchar_pattern_ops)"),
+    ("idx_album_groups_artist_key", "CREATE INDEX IF NOT EXISTS idx_album_groups_artist_key ON album_groups (artist_key varchar_pattern_ops)"),
+    ("idx_album_groups_title_initials", "CREATE INDEX IF NOT EXISTS idx_album_groups_title_initials ON album_groups (title_initials varchar_pattern_ops)"),
+    ("idx_album_groups_artist_initials", "CREATE INDEX IF NOT EXISTS idx_album_groups_artist_initials ON album_groups (artist_initials varchar_pattern_ops)"),
+]
+
+async def main():
+    engine = create_async_engine(DATABASE_URL, echo=False)
+
+    for name, ddl in MIGRATIONS:
+        async with engine.begin() as conn:
+            await conn.execute(text(ddl))
+        print(f"✅ {name}")
+
+    # 기존 행의 name_key/*_initials 채우기 (NULL이면 아티스트 조회와 디스코그래피가 비어 보임)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_session() as session:
+        updated = await search_service.refresh_name_keys(session)
+    print(f"✅ name keys backfilled ({updated} rows)")
+    if updated:
+        # 빈 디스코그래피로 캐시된 아티스트 조회 제거
+        await invalidation.publish([ARTISTS_TAG])
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())